@@ -1,14 +1,23 @@
 #!/usr/bin/env python3
 import os
 import sys
+import asyncio
 import socket
 import struct
 import random
-import shutil
 import time
 import argparse
+import functools
+import threading
+import math
+import re
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
 
 import holo  # holo.py must be in the same directory
 
@@ -18,11 +27,27 @@ VERSION = 1
 
 PKT_META = 0
 PKT_DATA = 1
+PKT_REPAIR = 2
+PKT_STATUS = 3
 
 # magic(4s), version(1B), pkt_type(1B),
 # transfer_id(4B), total_chunks(4B), chunk_index(4B),
 # segment_index(2B), total_segments(2B)
+# For PKT_REPAIR, segment_index is the repair row and total_segments the
+# chunk's data segment count; the payload is chunk_len(4B) + parity row.
 HEADER_STRUCT = struct.Struct("!4sBBIIIHH")
+REPAIR_STRUCT = struct.Struct("!I")
+
+# PKT_STATUS (RX -> TX, only for senders that set META_FEEDBACK in the
+# META segment_index field): flags(1B), complete_chunks(4B), then zlib of
+# the complete-chunk bitmap followed by STATUS_ENTRY + segment bitmap for
+# partially received chunks.
+META_FEEDBACK = 1
+STATUS_DONE = 1
+STATUS_STRUCT = struct.Struct("!BI")
+STATUS_ENTRY = struct.Struct("!IH")
+STATUS_MAX_PAYLOAD = 1200
+STATUS_INTERVAL = 0.25            # seconds between status datagrams per transfer
 
 # Defaults (all overridable from CLI)
 DEFAULT_TX_MAX_PAYLOAD = 1400     # bytes per UDP datagram (header+data) on TX
@@ -30,88 +55,628 @@ DEFAULT_RX_MAX_PAYLOAD = 65507    # max UDP payload to accept on RX
 DEFAULT_CHUNK_KB = 32             # holographic chunk size in KB
 DEFAULT_LOOPS = 3                 # number of full passes over all chunks
 DEFAULT_PORT = 5000               # UDP port
-DEFAULT_DELAY = 0.0005            # seconds between datagrams on TX
+DEFAULT_DELAY = 0.0005            # seconds between datagrams on TX (if no --rate)
 DEFAULT_IDLE_TIMEOUT = 30.0       # seconds of inactivity on RX before decoding
 DEFAULT_BASE_DIR = "."            # where reconstructed files go
+DEFAULT_COMPRESSION = "default"   # holo.py residual codec preset
+DEFAULT_TRANSFORM = "raw"         # holo.py image/audio residual layout
+DEFAULT_UPDATE_INTERVAL = 1.0     # seconds between live previews on RX
+DEFAULT_UPDATE_FRACTION = 0.0     # also preview every time this share completes
+DEFAULT_FEC = 0.0                 # repair segments per data segment on TX
+DEFAULT_ORDER = "priority"        # TX chunk order: priority or random
+DEFAULT_MAX_TRANSFERS = 64        # concurrent transfers kept on RX
+DEFAULT_MAX_MEMORY_MB = 1024      # buffer budget across those transfers
+DEFAULT_COUNT = 0                 # transfers to finish before RX exits (0 = run on)
+FINISHED_MEMORY = 4096            # finished transfer keys remembered on RX
+
+_PACE_TICK = 0.005                # TX token bucket refill granularity (seconds)
+_UDP_OVERHEAD = 28                # IPv4 + UDP header bytes counted by --rate
+_TX_BATCH = 64                    # datagrams per burst on TX when unlimited
+_RX_BATCH = 256                   # datagrams drained per wakeup on RX
+_RX_SOCKET_BUFFER = 4 << 20       # requested SO_RCVBUF (the kernel may cap it)
+_RX_TICK = 0.25                   # seconds between idle/status checks on RX
+_STATUS_WAIT = 1.0                # TX wait for a fresh status between loops
+_HAVE_SENDMSG = hasattr(socket.socket, "sendmsg")  # missing on Windows
+
+
+# ===================== FORWARD ERROR CORRECTION =====================
+
+
+def _gf_tables() -> Tuple[np.ndarray, np.ndarray]:
+    """Multiplication and inverse tables of GF(256), polynomial 0x11D."""
+    exp = np.zeros(510, dtype=np.int64)
+    log = np.zeros(256, dtype=np.int64)
+    x = 1
+    for i in range(255):
+        exp[i] = x
+        log[x] = i
+        x <<= 1
+        if x & 0x100:
+            x ^= 0x11D
+    exp[255:] = exp[:255]
+    nz = log[1:]
+    mul = np.zeros((256, 256), dtype=np.uint8)
+    mul[1:, 1:] = exp[nz[:, None] + nz[None, :]]
+    inv = np.zeros(256, dtype=np.uint8)
+    inv[1:] = exp[255 - nz]
+    return mul, inv
+
+
+_GF_MUL, _GF_INV = _gf_tables()
+
+
+def _fec_matrix(k: int, r: int) -> np.ndarray:
+    """
+    Cauchy rows 1 / (x_i + y_j) with x_i = k + i, y_j = j. Stacked under
+    the identity they form a systematic code in which any k of the k + r
+    rows are independent, so any k received segments rebuild the chunk.
+    """
+    return _GF_INV[np.arange(k, k + r)[:, None] ^ np.arange(k)[None, :]]
+
+
+def _gf_dot(coeffs: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Sum over j of coeffs[j] * rows[j] in GF(256)."""
+    return np.bitwise_xor.reduce(_GF_MUL[coeffs[:, None], rows], axis=0)
+
+
+def _gf_invert(a: np.ndarray) -> np.ndarray:
+    n = len(a)
+    m = np.concatenate([a, np.eye(n, dtype=np.uint8)], axis=1)
+    for col in range(n):
+        pivot = col + int(np.flatnonzero(m[col:, col])[0])
+        if pivot != col:
+            m[[col, pivot]] = m[[pivot, col]]
+        m[col] = _GF_MUL[_GF_INV[m[col, col]], m[col]]
+        for row in np.flatnonzero(m[:, col]):
+            if row != col:
+                m[row] ^= _GF_MUL[m[row, col], m[col]]
+    return m[:, n:]
+
+
+def fec_repair_count(k: int, ratio: float) -> int:
+    """Repair rows for a chunk of k data segments (k + r stays within GF(256))."""
+    if ratio <= 0:
+        return 0
+    return max(0, min(math.ceil(k * ratio), 256 - k))
+
+
+def fec_capped(k: int, ratio: float) -> bool:
+    """
+    True when fec_repair_count gives a chunk of k segments fewer repair rows
+    than ratio asks for (none at all once k >= 256).
+    """
+    return ratio > 0 and fec_repair_count(k, ratio) < math.ceil(k * ratio)
+
+
+def fec_encode(rows: np.ndarray, r: int) -> np.ndarray:
+    """Parity rows (r, L) for data rows (k, L) of uint8."""
+    c = _fec_matrix(len(rows), r)
+    return np.stack([_gf_dot(c[i], rows) for i in range(r)])
+
+
+def fec_recover(rows: np.ndarray, missing: list, repairs: Dict[int, bytes]) -> None:
+    """
+    Rebuild the missing data rows of rows (k, L) in place from at least
+    len(missing) repair rows, given as {repair index: parity row}.
+    """
+    k = len(rows)
+    use = sorted(repairs)[: len(missing)]
+    c = _fec_matrix(k, use[-1] + 1)[use]
+    present = np.setdiff1d(np.arange(k), missing)
+    syndrome = np.empty((len(use), rows.shape[1]), dtype=np.uint8)
+    for a, i in enumerate(use):
+        parity = np.frombuffer(repairs[i], dtype=np.uint8)
+        syndrome[a] = parity ^ _gf_dot(c[a, present], rows[present])
+    solve = _gf_invert(c[:, missing])
+    for b, j in enumerate(missing):
+        rows[j] = _gf_dot(solve[b], syndrome)
+
+
+# ===================== FEEDBACK =====================
+
+
+def _has_bit(bitmap, i: int) -> bool:
+    return i >> 3 < len(bitmap) and bool(bitmap[i >> 3] & (1 << (i & 7)))
+
+
+def encode_status(transfer: "TransferState") -> bytes:
+    """
+    PKT_STATUS datagram for a transfer: which chunks are complete and, as
+    far as STATUS_MAX_PAYLOAD allows, which segments of the others arrived.
+    """
+    total = transfer.total_chunks or 0
+    complete = bytearray((total + 7) // 8)
+    partial = []
+    for idx, chunk in transfer.chunks.items():
+        if idx >= total:
+            continue
+        if chunk.complete:
+            complete[idx >> 3] |= 1 << (idx & 7)
+        elif chunk.received:
+            entry = STATUS_ENTRY.pack(idx, chunk.total_segments)
+            partial.append(entry + bytes(chunk.bitmap))
+    header = HEADER_STRUCT.pack(
+        MAGIC,
+        VERSION,
+        PKT_STATUS,
+        transfer.transfer_id,
+        total,
+        0,
+        0,
+        0,
+    )
+    flags = STATUS_DONE if transfer.done else 0
+    head = header + STATUS_STRUCT.pack(flags, transfer.complete_chunks)
+    while True:
+        body = zlib.compress(bytes(complete) + b"".join(partial))
+        if len(head) + len(body) <= STATUS_MAX_PAYLOAD or not partial:
+            return head + body
+        partial = partial[: len(partial) // 2]
+
+
+def parse_status(payload, total_chunks: int) -> Tuple[bool, bytes, Dict[int, bytes]]:
+    """Inverse of encode_status: (done, complete bitmap, {chunk: segment bitmap})."""
+    flags, _ = STATUS_STRUCT.unpack_from(payload)
+    n = (total_chunks + 7) // 8
+    body = zlib.decompressobj().decompress(
+        bytes(payload[STATUS_STRUCT.size:]), n + 65536
+    )
+    complete = body[:n]
+    partial = {}
+    pos = n
+    while pos + STATUS_ENTRY.size <= len(body):
+        idx, n_segments = STATUS_ENTRY.unpack_from(body, pos)
+        pos += STATUS_ENTRY.size
+        partial[idx] = body[pos:pos + (n_segments + 7) // 8]
+        pos += (n_segments + 7) // 8
+    return bool(flags & STATUS_DONE), complete, partial
+
+
+class _SenderFeedback:
+    """What the receiver last reported about one outgoing transfer."""
+
+    def __init__(self, transfer_id: int, total_chunks: int) -> None:
+        self.transfer_id = transfer_id
+        self.total_chunks = total_chunks
+        self.complete = bytearray((total_chunks + 7) // 8)
+        self.partial: Dict[int, bytes] = {}
+        self.done = False
+        self.updated = asyncio.Event()
+
+    def datagram_received(self, data, addr: Tuple[str, int]) -> None:
+        if len(data) < HEADER_STRUCT.size + STATUS_STRUCT.size:
+            return
+        magic, version, pkt_type, transfer_id = HEADER_STRUCT.unpack_from(data)[:4]
+        if (magic, version, pkt_type) != (MAGIC, VERSION, PKT_STATUS):
+            return
+        if transfer_id != self.transfer_id:
+            return
+        try:
+            done, complete, partial = parse_status(
+                data[HEADER_STRUCT.size:], self.total_chunks
+            )
+        except (ValueError, struct.error, zlib.error):
+            return
+        self.done = self.done or done
+        for i, byte in enumerate(complete[: len(self.complete)]):
+            self.complete[i] |= byte
+        self.partial = partial
+        self.updated.set()
+
+    async def wait(self, timeout: float) -> None:
+        """Wait up to timeout for the next status datagram."""
+        self.updated.clear()
+        try:
+            await asyncio.wait_for(self.updated.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def pending_frames(self, frames_by_chunk: list, indices: list) -> list:
+        """
+        Frames still worth sending: nothing for complete chunks, only the
+        missing data segments of partial ones, everything for the rest.
+        """
+        frames = []
+        for idx in indices:
+            if _has_bit(self.complete, idx):
+                continue
+            have = self.partial.get(idx)
+            if have is None:
+                frames.extend(frames_by_chunk[idx])
+                continue
+            for frame in frames_by_chunk[idx]:
+                fields = HEADER_STRUCT.unpack(frame[0])
+                if fields[2] == PKT_DATA and not _has_bit(have, fields[6]):
+                    frames.append(frame)
+        return frames
 
 
 # ===================== TX SIDE =====================
 
 
-def encode_to_holo_dir(input_path: str, chunk_kb: int) -> str:
+def encode_to_chunks(
+    input_path: str,
+    chunk_kb: int,
+    compression: str = DEFAULT_COMPRESSION,
+    residual_transform: str = DEFAULT_TRANSFORM,
+    coarse_copies: int = 0,
+    tier_bits: int = 0,
+    pyramid: bool = False,
+) -> list:
     """
-    Use holo.py to create a fresh <file>.holo directory for this transfer.
-    Any previous directory with the same name is removed to avoid mixing chunks.
+    Use holo.py's in-memory encoders to turn a file into a list of chunk
+    payloads for this transfer; nothing is written to disk.
     """
     mode = holo.detect_mode_from_extension(input_path)
-    out_dir = input_path + ".holo"
-
-    if os.path.isdir(out_dir):
-        shutil.rmtree(out_dir)
 
     if mode == "image":
-        holo.encode_image_holo_dir(
-            input_path,
-            out_dir,
+        return holo.encode_image(
+            holo.load_image(input_path),
             target_chunk_kb=chunk_kb,
+            compression=compression,
+            residual_transform=residual_transform,
+            coarse_copies=coarse_copies,
+            tier_bits=tier_bits,
+            pyramid=pyramid,
         )
-    elif mode == "audio":
-        holo.encode_audio_holo_dir(
-            input_path,
-            out_dir,
-            target_chunk_kb=chunk_kb,
-        )
-    else:
-        holo.encode_binary_holo_dir(
-            input_path,
-            out_dir,
+    if mode == "audio":
+        audio, sample_rate = holo.load_wav(input_path)
+        return holo.encode_audio(
+            audio,
+            sample_rate,
             target_chunk_kb=chunk_kb,
+            compression=compression,
+            residual_transform=residual_transform,
+            coarse_copies=coarse_copies,
+            tier_bits=tier_bits,
         )
+    with open(input_path, "rb") as f:
+        data = f.read()
+    return holo.encode_binary(
+        data,
+        target_chunk_kb=chunk_kb,
+        compression=compression,
+        coarse_copies=coarse_copies,
+    )
 
-    return out_dir
 
+_RATE_UNITS = {"": 1, "k": 10**3, "m": 10**6, "g": 10**9}
 
-def iter_chunk_files(holo_dir: str):
-    for fname in sorted(os.listdir(holo_dir)):
-        if fname.startswith("chunk_") and fname.endswith(".holo"):
-            yield os.path.join(holo_dir, fname)
 
+def parse_rate(text: str) -> float:
+    """
+    Parse a bitrate such as '20Mbit', '500k', '9600baud', '9600' (bits/s)
+    or '2MB' / '2MBps' (bytes/s). Returns bits per second; 0 = unlimited.
+    """
+    m = re.fullmatch(
+        r"\s*([0-9]*\.?[0-9]+)\s*([kKmMgG]?)(bit/s|bits|bit|bps|baud|b|B|Bps|byte)?\s*",
+        text,
+    )
+    if m is None:
+        raise ValueError(f"invalid rate {text!r} (try e.g. 20Mbit or 9600baud)")
+    value, prefix, unit = m.groups()
+    bits = float(value) * _RATE_UNITS[prefix.lower()]
+    if unit in ("B", "Bps", "byte"):
+        bits *= 8
+    return bits
 
-def send_file(
-    file_path: str,
-    host: str,
-    port: int,
-    chunk_kb: int,
-    loops: int,
-    max_payload: int,
-    delay: float,
-):
-    if not os.path.isfile(file_path):
-        print(f"[tx] file not found: {file_path}")
-        sys.exit(1)
 
-    holo_dir = encode_to_holo_dir(file_path, chunk_kb)
-    chunk_paths = list(iter_chunk_files(holo_dir))
-    if not chunk_paths:
-        print(f"[tx] no chunk_*.holo files in {holo_dir}")
-        sys.exit(1)
+def format_rate(bits_per_s: float) -> str:
+    for scale, name in ((10**9, "Gbit/s"), (10**6, "Mbit/s"), (10**3, "kbit/s")):
+        if bits_per_s >= scale:
+            return f"{bits_per_s / scale:.2f} {name}"
+    return f"{bits_per_s:.0f} bit/s"
 
-    total_chunks = len(chunk_paths)
-    transfer_id = random.randint(1, 2**32 - 1)
-    file_name = os.path.basename(file_path)
-    name_bytes = file_name.encode("utf-8")
 
+class TokenBucket:
+    """
+    Byte-rate limiter for TX. Tokens accrue at rate bytes/s up to one
+    tick's worth (at least one datagram). A burst may overdraw the bucket;
+    the next one then waits for the debt to be repaid, in whole ticks, so
+    datagrams leave in small bursts per timer tick instead of one sleep
+    each. Datagrams bigger than a tick's budget (slow radio links) simply
+    go out one per wait.
+    """
+
+    def __init__(self, rate: float, burst: int, tick: float = _PACE_TICK) -> None:
+        self.rate = float(rate)
+        self.tick = tick
+        self.capacity = max(float(burst), self.rate * tick)
+        self.tokens = self.capacity
+        self.stamp = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    async def acquire(self) -> float:
+        """Wait until the bucket is out of debt; return the bytes available."""
+        self._refill()
+        if self.tokens <= 0:
+            # repay the debt plus one tick, so there is always something to send
+            await asyncio.sleep(self.tick - self.tokens / self.rate)
+            self._refill()
+        return self.tokens
+
+    def spend(self, nbytes: int) -> None:
+        self.tokens -= nbytes
+
+
+def _watches_sockets(loop: asyncio.AbstractEventLoop, sock: socket.socket) -> bool:
+    """True if loop can wait on a raw socket (selector loops, not Windows' proactor)."""
+    try:
+        loop.add_writer(sock.fileno(), lambda: None)
+    except NotImplementedError:
+        return False
+    loop.remove_writer(sock.fileno())
+    return True
+
+
+class _SenderProtocol(asyncio.DatagramProtocol):
+    """
+    TX endpoint; surfaces the transport's flow control as drain() and
+    hands incoming datagrams (receiver status) to on_datagram.
+    """
+
+    def __init__(self) -> None:
+        self._can_write = asyncio.Event()
+        self._can_write.set()
+        self.on_datagram: Optional[Callable] = None
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        if self.on_datagram is not None:
+            self.on_datagram(data, addr)
+
+    def pause_writing(self) -> None:
+        self._can_write.clear()
+
+    def resume_writing(self) -> None:
+        self._can_write.set()
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self._can_write.set()
+
+    async def drain(self) -> None:
+        await self._can_write.wait()
+
+
+class _DatagramSender:
+    """
+    UDP socket for TX that writes a whole burst in a tight loop; the event
+    loop is only entered between bursts or when the socket buffer is full.
+    Where the loop can wait on the raw socket, each datagram is one
+    sendmsg() of [header, payload view], so nothing is concatenated (or a
+    sendto() of both where sendmsg() is missing). Otherwise, as on the
+    Windows proactor loop, datagrams go through a regular datagram
+    endpoint's transport.sendto(). Use open() to create one.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        sock: socket.socket,
+        transport: Optional[asyncio.DatagramTransport] = None,
+        protocol: Optional[_SenderProtocol] = None,
+    ) -> None:
+        self.loop = loop
+        self.sock = sock
+        self.transport = transport
+        self.protocol = protocol
+        self.listening = False
+
+    @classmethod
+    async def open(cls, loop: asyncio.AbstractEventLoop) -> "_DatagramSender":
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        if _watches_sockets(loop, sock):
+            return cls(loop, sock)
+        transport, protocol = await loop.create_datagram_endpoint(
+            _SenderProtocol, sock=sock
+        )
+        return cls(loop, sock, transport, protocol)
+
+    async def send(
+        self, frames: list, start: int, budget: float, addr: Tuple[str, int]
+    ) -> Tuple[int, int]:
+        """
+        Send frames[start:] until budget wire bytes are used (the last
+        datagram may go over); returns (next index, wire bytes sent).
+        """
+        if self.transport is not None:
+            return await self._send_transport(frames, start, budget, addr)
+        sendmsg = self.sock.sendmsg if _HAVE_SENDMSG else None
+        sendto = self.sock.sendto
+        i = start
+        wire_bytes = 0
+        while i < len(frames) and wire_bytes < budget:
+            header, payload = frames[i]
+            try:
+                if sendmsg is not None:
+                    sendmsg((header, payload), (), 0, addr)
+                else:
+                    sendto(header + payload, addr)
+            except (BlockingIOError, InterruptedError):
+                await self._writable()
+                continue
+            wire_bytes += len(header) + len(payload) + _UDP_OVERHEAD
+            i += 1
+        return i, wire_bytes
+
+    async def _send_transport(
+        self, frames: list, start: int, budget: float, addr: Tuple[str, int]
+    ) -> Tuple[int, int]:
+        sendto = self.transport.sendto
+        i = start
+        wire_bytes = 0
+        while i < len(frames) and wire_bytes < budget:
+            header, payload = frames[i]
+            sendto(header + payload, addr)
+            wire_bytes += len(header) + len(payload) + _UDP_OVERHEAD
+            i += 1
+        await self.protocol.drain()
+        return i, wire_bytes
+
+    async def _writable(self) -> None:
+        fut = self.loop.create_future()
+        fd = self.sock.fileno()
+        self.loop.add_writer(fd, lambda: fut.done() or fut.set_result(None))
+        try:
+            await fut
+        finally:
+            self.loop.remove_writer(fd)
+
+    def listen(self, on_datagram: Callable) -> None:
+        """Deliver datagrams arriving on this socket (receiver status)."""
+        if self.transport is not None:
+            self.protocol.on_datagram = on_datagram
+            return
+
+        def drain() -> None:
+            for _ in range(_RX_BATCH):
+                try:
+                    data, addr = self.sock.recvfrom(STATUS_MAX_PAYLOAD + 1)
+                except (BlockingIOError, InterruptedError):
+                    return
+                except OSError:  # e.g. ICMP port unreachable
+                    return
+                on_datagram(data, addr)
+
+        self.loop.add_reader(self.sock.fileno(), drain)
+        self.listening = True
+
+    def close(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
+            return
+        if self.listening:
+            self.loop.remove_reader(self.sock.fileno())
+        self.sock.close()
+
+
+def _chunk_frames(
+    chunks: list, transfer_id: int, seg_payload_size: int, fec: float = 0.0
+) -> list:
+    """
+    Per chunk, its (header, payload view) datagrams, packed once per
+    transfer, followed by fec_repair_count() repair datagrams when fec > 0.
+    """
+    total_chunks = len(chunks)
+    frames = []
+    for idx, chunk_data in enumerate(chunks):
+        view = memoryview(chunk_data)
+        total_segments = max(
+            1, (len(chunk_data) + seg_payload_size - 1) // seg_payload_size
+        )
+        segments = []
+        for seg_idx in range(total_segments):
+            start = seg_idx * seg_payload_size
+            header = HEADER_STRUCT.pack(
+                MAGIC,
+                VERSION,
+                PKT_DATA,
+                transfer_id,
+                total_chunks,
+                idx,
+                seg_idx,
+                total_segments,
+            )
+            segments.append((header, view[start:start + seg_payload_size]))
+
+        n_repair = fec_repair_count(total_segments, fec)
+        if n_repair:
+            row_len = len(segments[0][1])
+            rows = np.zeros((total_segments, row_len), dtype=np.uint8)
+            for seg_idx, (_, payload) in enumerate(segments):
+                rows[seg_idx, : len(payload)] = np.frombuffer(payload, dtype=np.uint8)
+            prefix = REPAIR_STRUCT.pack(len(chunk_data))
+            for rep_idx, parity in enumerate(fec_encode(rows, n_repair)):
+                header = HEADER_STRUCT.pack(
+                    MAGIC,
+                    VERSION,
+                    PKT_REPAIR,
+                    transfer_id,
+                    total_chunks,
+                    idx,
+                    rep_idx,
+                    total_segments,
+                )
+                segments.append((header, prefix + parity.tobytes()))
+        frames.append(segments)
+    return frames
+
+
+def schedule_chunks(priorities: list, sends: list) -> list:
+    """
+    Chunk order for one loop: fewest transmissions so far first, then
+    highest holo.chunk_priority (dedicated coarse chunks, then residual
+    energy); ties in random order.
+    """
+    jitter = [random.random() for _ in priorities]
+    return sorted(
+        range(len(priorities)), key=lambda i: (sends[i], -priorities[i], jitter[i])
+    )
+
+
+async def send_chunks_async(
+    chunks: list,
+    file_name: str,
+    host: str,
+    port: int,
+    loops: int = DEFAULT_LOOPS,
+    max_payload: int = DEFAULT_TX_MAX_PAYLOAD,
+    rate: float = 0.0,
+    transfer_id: Optional[int] = None,
+    fec: float = DEFAULT_FEC,
+    feedback: bool = False,
+    order: str = DEFAULT_ORDER,
+) -> int:
+    """
+    Send already encoded chunks as one transfer and return its transfer_id.
+
+    rate is the target in bits per second on the wire (IP/UDP headers
+    included), enforced by a TokenBucket; 0 sends as fast as the socket
+    accepts. Datagrams go out in bursts (one bucket budget, or
+    _TX_BATCH datagrams when unlimited) between event-loop turns, so
+    other transfers on the same loop interleave. The achieved rate is
+    reported per loop.
+
+    With fec > 0 every chunk is followed by ceil(fec * segments) repair
+    datagrams (see fec_encode), so a receiver rebuilds it from any
+    `segments` of them; data segments shrink by REPAIR_STRUCT.size so
+    repair datagrams fit max_payload too. Data plus repair datagrams of a
+    chunk cannot exceed 256 (fec_repair_count); a warning is printed when
+    that cuts the repair rows of some chunks.
+
+    With feedback the META packets ask the receiver for PKT_STATUS
+    reports. After the first loop the sender waits briefly for one and
+    then sends only what is still missing, and it stops as soon as the
+    receiver reports every chunk complete. Without any report it falls
+    back to full loops.
+
+    order "priority" sends chunks by schedule_chunks (coarse first, then
+    by residual energy, less often sent chunks first in later loops);
+    "random" shuffles every loop.
+    """
+    total_chunks = len(chunks)
+    if not total_chunks:
+        raise ValueError("no chunks to send")
     seg_payload_size = max_payload - HEADER_STRUCT.size
+    if fec > 0:
+        seg_payload_size -= REPAIR_STRUCT.size
     if seg_payload_size <= 0:
-        print("[tx] max_payload too small for the header")
-        sys.exit(1)
-
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        raise ValueError("max_payload too small for the header")
+    if transfer_id is None:
+        transfer_id = random.randint(1, 2**32 - 1)
+    name_bytes = file_name.encode("utf-8")
 
-    print(f"[tx] sending '{file_name}' to {host}:{port}")
-    print(f"[tx] holographic dir: {holo_dir} ({total_chunks} chunks)")
-    print(f"[tx] transfer_id={transfer_id}, loops={loops}, chunk_kb={chunk_kb}")
-    print(f"[tx] max_payload={max_payload}, delay={delay}s")
+    loop = asyncio.get_running_loop()
+    infos = await loop.getaddrinfo(
+        host, port, family=socket.AF_INET, type=socket.SOCK_DGRAM
+    )
+    addr = infos[0][4]
+    bucket = TokenBucket(rate / 8.0, max_payload + _UDP_OVERHEAD) if rate > 0 else None
+    unlimited_budget = _TX_BATCH * (max_payload + _UDP_OVERHEAD)
 
     meta_header = HEADER_STRUCT.pack(
         MAGIC,
@@ -120,64 +685,218 @@ def send_file(
         transfer_id,
         total_chunks,
         0,
-        0,
+        META_FEEDBACK if feedback else 0,
         0,
     )
-
+    frames_by_chunk = await loop.run_in_executor(
+        None, _chunk_frames, chunks, transfer_id, seg_payload_size, fec
+    )
+    if fec > 0:
+        seg_counts = [max(1, -(-len(c) // seg_payload_size)) for c in chunks]
+        capped = sum(fec_capped(k, fec) for k in seg_counts)
+        if capped:
+            unprotected = sum(k >= 256 for k in seg_counts)
+            print(
+                f"[tx {transfer_id}] warning: --fec {fec} is capped for {capped} "
+                f"of {total_chunks} chunks ({unprotected} get no repair at all): "
+                "a chunk takes at most 256 data + repair datagrams. Use a "
+                "smaller chunk_kb or a larger max_payload."
+            )
+    priorities = [holo.chunk_priority(c) for c in chunks] if order != "random" else []
+    sends = [0] * total_chunks
+
+    sender = await _DatagramSender.open(loop)
+    status = _SenderFeedback(transfer_id, total_chunks) if feedback else None
+    if status is not None:
+        sender.listen(status.datagram_received)
+    sent = 0
+    wire_bytes = 0
+    started = time.monotonic()
     try:
-        loops_left = loops
-        loop_index = 0
-        while loops_left > 0:
-            loops_left -= 1
-            loop_index += 1
-
-            sock.sendto(meta_header + name_bytes, (host, port))
-            print(f"[tx] META sent (loop {loop_index}/{loops})")
-
-            indices = list(range(total_chunks))
-            random.shuffle(indices)
-
+        for loop_index in range(1, loops + 1):
+            if order == "random":
+                indices = list(range(total_chunks))
+                random.shuffle(indices)
+            else:
+                indices = schedule_chunks(priorities, sends)
             for idx in indices:
-                chunk_path = chunk_paths[idx]
-                with open(chunk_path, "rb") as f:
-                    chunk_data = f.read()
+                if status is None or not _has_bit(status.complete, idx):
+                    sends[idx] += 1
+            frames = [(meta_header, name_bytes)]
+            if status is None or loop_index == 1:
+                for idx in indices:
+                    frames.extend(frames_by_chunk[idx])
+            else:
+                frames.extend(status.pending_frames(frames_by_chunk, indices))
+            print(f"[tx {transfer_id}] META sent (loop {loop_index}/{loops})")
+
+            pos = 0
+            while pos < len(frames) and not (status and status.done):
+                if bucket is not None:
+                    budget = await bucket.acquire()
+                else:
+                    budget = unlimited_budget
+                nxt, nbytes = await sender.send(frames, pos, budget, addr)
+                sent += nxt - pos
+                wire_bytes += nbytes
+                pos = nxt
+                if bucket is not None:
+                    bucket.spend(nbytes)
+                else:
+                    await asyncio.sleep(0)
+
+            elapsed = max(time.monotonic() - started, 1e-9)
+            print(
+                f"[tx {transfer_id}] loop completed, "
+                f"remaining loops: {loops - loop_index}, "
+                f"{sent} datagrams at {format_rate(wire_bytes * 8 / elapsed)}"
+            )
+            if status is not None and not status.done and loop_index < loops:
+                await status.wait(_STATUS_WAIT)
+            if status is not None and status.done:
+                print(f"[tx {transfer_id}] receiver has every chunk, stopping early")
+                break
+    finally:
+        sender.close()
+
+    elapsed = max(time.monotonic() - started, 1e-9)
+    target = format_rate(rate) if rate > 0 else "unlimited"
+    print(
+        f"[tx {transfer_id}] transmission finished: {wire_bytes} bytes in "
+        f"{elapsed:.2f}s, achieved {format_rate(wire_bytes * 8 / elapsed)} "
+        f"(target {target})"
+    )
+    return transfer_id
 
-                total_segments = max(
-                    1, (len(chunk_data) + seg_payload_size - 1) // seg_payload_size
-                )
 
-                for seg_idx in range(total_segments):
-                    start = seg_idx * seg_payload_size
-                    end = start + seg_payload_size
-                    payload = chunk_data[start:end]
-
-                    header = HEADER_STRUCT.pack(
-                        MAGIC,
-                        VERSION,
-                        PKT_DATA,
-                        transfer_id,
-                        total_chunks,
-                        idx,
-                        seg_idx,
-                        total_segments,
-                    )
-                    packet = header + payload
-                    sock.sendto(packet, (host, port))
+async def send_file_async(
+    file_path: str,
+    host: str,
+    port: int,
+    chunk_kb: int = DEFAULT_CHUNK_KB,
+    loops: int = DEFAULT_LOOPS,
+    max_payload: int = DEFAULT_TX_MAX_PAYLOAD,
+    rate: float = 0.0,
+    compression: str = DEFAULT_COMPRESSION,
+    residual_transform: str = DEFAULT_TRANSFORM,
+    coarse_copies: int = 0,
+    executor: Optional[ThreadPoolExecutor] = None,
+    fec: float = DEFAULT_FEC,
+    feedback: bool = False,
+    order: str = DEFAULT_ORDER,
+    tier_bits: int = 0,
+    pyramid: bool = False,
+) -> int:
+    """
+    Encode file_path on an executor thread and send it; returns the
+    transfer_id. Several of these can run concurrently on one event loop.
+    """
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(file_path)
+
+    loop = asyncio.get_running_loop()
+    chunks = await loop.run_in_executor(
+        executor,
+        encode_to_chunks,
+        file_path,
+        chunk_kb,
+        compression,
+        residual_transform,
+        coarse_copies,
+        tier_bits,
+        pyramid,
+    )
+    if not chunks:
+        raise ValueError(f"encoder produced no chunks for {file_path}")
 
-                    if delay > 0.0:
-                        time.sleep(delay)
+    file_name = os.path.basename(file_path)
+    transfer_id = random.randint(1, 2**32 - 1)
+    print(f"[tx] sending '{file_name}' to {host}:{port}")
+    print(f"[tx] holographic chunks: {len(chunks)} (in memory)")
+    print(
+        f"[tx] transfer_id={transfer_id}, loops={loops}, chunk_kb={chunk_kb}, "
+        f"compression={compression}, transform={residual_transform}"
+    )
+    print(
+        f"[tx] max_payload={max_payload}, "
+        f"rate={format_rate(rate) if rate > 0 else 'unlimited'}, "
+        f"coarse_copies={coarse_copies}, tier_bits={tier_bits}, "
+        f"pyramid={pyramid}, fec={fec}, order={order}"
+    )
+    return await send_chunks_async(
+        chunks,
+        file_name,
+        host,
+        port,
+        loops=loops,
+        max_payload=max_payload,
+        rate=rate,
+        transfer_id=transfer_id,
+        fec=fec,
+        feedback=feedback,
+        order=order,
+    )
 
-            print(f"[tx] loop completed, remaining loops: {loops_left}")
 
-        print("[tx] transmission finished")
-    finally:
-        sock.close()
-        if os.path.isdir(holo_dir):
-            try:
-                shutil.rmtree(holo_dir)
-                print(f"[tx] removed temporary dir {holo_dir}")
-            except Exception as e:
-                print(f"[tx] warning: could not remove {holo_dir}: {e}")
+def send_file(
+    file_path: str,
+    host: str,
+    port: int,
+    chunk_kb: int,
+    loops: int,
+    max_payload: int,
+    delay: float,
+    compression: str = DEFAULT_COMPRESSION,
+    residual_transform: str = DEFAULT_TRANSFORM,
+    coarse_copies: int = 0,
+    rate: Optional[str] = None,
+    fec: float = DEFAULT_FEC,
+    feedback: bool = False,
+    order: str = DEFAULT_ORDER,
+    tier_bits: int = 0,
+    pyramid: bool = False,
+):
+    """
+    Blocking wrapper around send_file_async for the CLI. rate is a string
+    for parse_rate; without it, delay is turned into the equivalent rate
+    for full-size datagrams.
+    """
+    if not os.path.isfile(file_path):
+        print(f"[tx] file not found: {file_path}")
+        sys.exit(1)
+    if rate is not None:
+        try:
+            bits_per_s = parse_rate(rate)
+        except ValueError as e:
+            print(f"[tx] {e}")
+            sys.exit(1)
+    elif delay > 0:
+        bits_per_s = (max_payload + _UDP_OVERHEAD) * 8 / delay
+    else:
+        bits_per_s = 0.0
+    try:
+        asyncio.run(
+            send_file_async(
+                file_path,
+                host,
+                port,
+                chunk_kb=chunk_kb,
+                loops=loops,
+                max_payload=max_payload,
+                rate=bits_per_s,
+                compression=compression,
+                residual_transform=residual_transform,
+                coarse_copies=coarse_copies,
+                fec=fec,
+                feedback=feedback,
+                order=order,
+                tier_bits=tier_bits,
+                pyramid=pyramid,
+            )
+        )
+    except ValueError as e:
+        print(f"[tx] {e}")
+        sys.exit(1)
 
 
 # ===================== RX SIDE =====================
@@ -185,233 +904,789 @@ def send_file(
 
 @dataclass
 class ChunkAssembly:
+    """
+    Reassembly buffer for one chunk. Segments are copied straight to their
+    final offset in a preallocated bytearray and tracked in a bitmap, so
+    completing a chunk needs no join. The segment size is learned from the
+    first non-final segment (or repair row); a final segment that arrives
+    before any other is held aside until then. With FEC, repair rows are
+    kept until data plus repairs cover every segment, and the missing
+    segments are then rebuilt in place.
+    """
+
     total_segments: int
-    segments: Dict[int, bytes] = field(default_factory=dict)
+    seg_size: int = 0
+    buf: Optional[bytearray] = None
+    bitmap: bytearray = field(default_factory=bytearray)
+    received: int = 0
+    last_len: int = 0
+    tail: Optional[bytes] = None
+    repairs: Dict[int, bytes] = field(default_factory=dict)
     complete: bool = False
 
-    def add_segment(self, seg_idx: int, total_segments: int, data: bytes) -> bool:
-        if self.complete:
+    def __post_init__(self) -> None:
+        self.bitmap = bytearray((self.total_segments + 7) // 8)
+
+    @property
+    def nbytes(self) -> int:
+        total = sum(len(row) for row in self.repairs.values())
+        if self.buf is not None:
+            return total + len(self.buf)
+        return total + (len(self.tail) if self.tail is not None else 0)
+
+    def has_segment(self, seg_idx: int) -> bool:
+        return bool(self.bitmap[seg_idx >> 3] & (1 << (seg_idx & 7)))
+
+    def _mark(self, seg_idx: int) -> None:
+        self.bitmap[seg_idx >> 3] |= 1 << (seg_idx & 7)
+        self.received += 1
+
+    def add_segment(self, seg_idx: int, total_segments: int, data) -> bool:
+        """Copy one segment into place; returns True when it completed the chunk."""
+        if self.complete or total_segments != self.total_segments:
             return False
-        if total_segments != self.total_segments:
+        if seg_idx >= total_segments or self.has_segment(seg_idx):
             return False
-        if seg_idx in self.segments:
+        last = seg_idx == total_segments - 1
+
+        if self.buf is None and (not last or total_segments == 1):
+            self._allocate(len(data))
+
+        if last:
+            if self.buf is None:
+                self.tail = bytes(data)
+            elif len(data) > self.seg_size:
+                return False
+            else:
+                self._place(seg_idx, data)
+            self.last_len = len(data)
+        elif len(data) != self.seg_size:
             return False
-        self.segments[seg_idx] = data
-        if len(self.segments) == self.total_segments:
+        else:
+            self._place(seg_idx, data)
+
+        self._mark(seg_idx)
+        if self.received == self.total_segments:
             self.complete = True
             return True
-        return False
+        return self._recover()
 
-    def build(self) -> bytes:
+    def add_repair(self, rep_idx: int, total_segments: int, data) -> bool:
+        """Store one FEC repair row; returns True when it completed the chunk."""
+        if self.complete or total_segments != self.total_segments:
+            return False
+        if rep_idx in self.repairs or len(data) < REPAIR_STRUCT.size:
+            return False
+        (chunk_len,) = REPAIR_STRUCT.unpack_from(data)
+        row = data[REPAIR_STRUCT.size:]
+        if self.buf is None:
+            self._allocate(len(row))
+        last_len = chunk_len - (total_segments - 1) * self.seg_size
+        if len(row) != self.seg_size or not 0 <= last_len <= self.seg_size:
+            return False
+        self.last_len = last_len
+        self.repairs[rep_idx] = bytes(row)
+        return self._recover()
+
+    def _allocate(self, seg_size: int) -> None:
+        self.seg_size = seg_size
+        self.buf = bytearray(seg_size * self.total_segments)
+        if self.tail is None:
+            return
+        tail, self.tail = self.tail, None
+        last = self.total_segments - 1
+        if len(tail) <= seg_size:
+            self._place(last, tail)
+        else:  # inconsistent with the real segment size: forget it
+            self.bitmap[last >> 3] &= ~(1 << (last & 7))
+            self.received -= 1
+
+    def _recover(self) -> bool:
+        missing = self.total_segments - self.received
+        if not self.repairs or len(self.repairs) < missing:
+            return False
+        gaps = [j for j in range(self.total_segments) if not self.has_segment(j)]
+        rows = np.frombuffer(self.buf, dtype=np.uint8).reshape(
+            self.total_segments, self.seg_size
+        )
+        fec_recover(rows, gaps, self.repairs)
+        del rows  # release the buffer export so build() can trim it
+        for seg_idx in gaps:
+            self._mark(seg_idx)
+        self.repairs.clear()
+        self.complete = True
+        return True
+
+    def _place(self, seg_idx: int, data) -> None:
+        start = seg_idx * self.seg_size
+        self.buf[start:start + len(data)] = data
+
+    def build(self) -> bytearray:
+        """
+        Hand over the reassembled chunk, trimmed in place to its real
+        length; afterwards the assembly keeps only its bitmap.
+        """
         if not self.complete:
             raise RuntimeError("Chunk not complete")
-        return b"".join(self.segments[i] for i in range(self.total_segments))
+        data, self.buf = self.buf, None
+        del data[(self.total_segments - 1) * self.seg_size + self.last_len:]
+        return data
 
 
 @dataclass
 class TransferState:
+    """
+    One transfer in progress. With a decode_executor, completed chunks are
+    decoded there in arrival order (decoding queue) instead of on the
+    caller's thread; decoder_lock serialises that with snapshots taken from
+    other threads.
+    """
+
     transfer_id: int
+    addr: Optional[Tuple[str, int]] = None
     total_chunks: Optional[int] = None
     file_name: Optional[str] = None
     chunks: Dict[int, ChunkAssembly] = field(default_factory=dict)
-    holo_dir: Optional[str] = None
+    decoder: holo.ProgressiveDecoder = field(default_factory=holo.ProgressiveDecoder)
+    complete_chunks: int = 0
+    last_update_time: float = 0.0
+    last_update_fraction: float = 0.0
+    pending_write: Optional[Future] = None
+    last_packet_time: float = 0.0
+    pending_bytes: int = 0
+    feedback: bool = False
+    last_status_time: float = 0.0
+    decode_executor: Optional[ThreadPoolExecutor] = None
+    decoder_lock: threading.Lock = field(default_factory=threading.Lock)
+    decoding: deque = field(default_factory=deque)  # (Future, chunk size)
+
+    @property
+    def tag(self) -> str:
+        return f"[rx {self.transfer_id}]"
+
+    @property
+    def done(self) -> bool:
+        return bool(self.total_chunks) and self.complete_chunks >= self.total_chunks
+
+    @property
+    def nbytes(self) -> int:
+        """Segments waiting for reassembly or decoding plus the decoder's buffers."""
+        while self.decoding and self.decoding[0][0].done():
+            self.decoding.popleft()
+        queued = sum(size for _job, size in self.decoding)
+        return self.pending_bytes + queued + self.decoder.nbytes
+
+    def add_segment(
+        self,
+        chunk_idx: int,
+        seg_idx: int,
+        total_segments: int,
+        payload: bytes,
+        repair: bool = False,
+    ) -> bool:
+        """Store a data segment or repair row; True when it completed its chunk."""
+        chunk = self.chunks.get(chunk_idx)
+        if chunk is None:
+            chunk = ChunkAssembly(total_segments=total_segments)
+            self.chunks[chunk_idx] = chunk
+        if chunk.complete:
+            return False
+        before = chunk.nbytes
+        add = chunk.add_repair if repair else chunk.add_segment
+        completed_now = add(seg_idx, total_segments, payload)
+        self.pending_bytes += chunk.nbytes - before
+        if not completed_now:
+            return False
+        self.pending_bytes -= chunk.nbytes
+        self.add_completed_chunk(chunk_idx, chunk.build())
+        return True
+
+    def add_completed_chunk(self, chunk_idx: int, data: bytes) -> None:
+        """
+        Feed a reassembled chunk into the live decoder: queued on
+        decode_executor if there is one, else decoded right here.
+        """
+        self.complete_chunks += 1
+        if self.decode_executor is None:
+            self._decode_chunk(chunk_idx, data)
+            return
+        job = self.decode_executor.submit(self._decode_chunk, chunk_idx, data)
+        self.decoding.append((job, len(data)))
 
+    def wait_decoded(self) -> None:
+        """Block until every queued chunk has reached the decoder."""
+        for job, _size in list(self.decoding):
+            job.result()
 
-def create_transfer_dir(base_dir: str, transfer_id: int) -> str:
-    dirname = f"transfer_{transfer_id}.holo"
-    holo_dir = os.path.join(base_dir, dirname)
-    if os.path.isdir(holo_dir):
-        shutil.rmtree(holo_dir)
-    os.makedirs(holo_dir, exist_ok=True)
-    return holo_dir
+    def _decode_chunk(self, chunk_idx: int, data: bytes) -> None:
+        try:
+            with self.decoder_lock:
+                self.decoder.add_chunk(data)
+        except Exception as e:
+            print(f"{self.tag} warning: dropping undecodable chunk {chunk_idx}: {e}")
 
 
-def maybe_rename_dir_for_filename(base_dir: str, transfer: TransferState) -> None:
-    if not transfer.file_name or not transfer.holo_dir:
-        return
+def output_path(base_dir: str, transfer: TransferState) -> str:
+    if transfer.file_name:
+        return os.path.join(base_dir, transfer.file_name)
+    ext = {"image": ".png", "audio": ".wav"}.get(transfer.decoder.mode, ".bin")
+    return os.path.join(base_dir, f"transfer_{transfer.transfer_id}{ext}")
 
-    new_dir = os.path.join(base_dir, transfer.file_name + ".holo")
-    if os.path.abspath(new_dir) == os.path.abspath(transfer.holo_dir):
-        return
 
-    if os.path.isdir(new_dir):
-        shutil.rmtree(new_dir)
-    os.rename(transfer.holo_dir, new_dir)
-    transfer.holo_dir = new_dir
+def write_reconstruction(
+    out_path: str, mode: str, result, sample_rate: Optional[int] = None
+) -> None:
+    """
+    Write a decoder snapshot to out_path. The file is written under a
+    temporary name first and then renamed, so viewers never see a
+    half-written preview.
+    """
+    base, ext = os.path.splitext(out_path)
+    tmp_path = base + ".part" + ext
+    if mode == "image":
+        holo.save_image(result, tmp_path)
+    elif mode == "audio":
+        holo.save_wav(result, tmp_path, sample_rate)
+    else:
+        with open(tmp_path, "wb") as f:
+            f.write(result)
+    os.replace(tmp_path, out_path)
+
 
+def write_preview(out_path: str, transfer: TransferState) -> None:
+    """
+    Snapshot the transfer's decoder (serialised with its chunk decoding)
+    and write it to out_path.
+    """
+    decoder = transfer.decoder
+    with transfer.decoder_lock:
+        result = decoder.snapshot()
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    write_reconstruction(out_path, decoder.mode, result, decoder.sample_rate)
 
-def decode_transfer(
+
+def maybe_write_preview(
     base_dir: str,
     transfer: TransferState,
-    decode_mode: str,
+    update_interval: float,
+    update_fraction: float,
+    writer: ThreadPoolExecutor,
 ) -> None:
-    if not transfer.holo_dir:
-        print("[rx] no holographic directory to decode")
+    """
+    Write an intermediate reconstruction when update_interval seconds have
+    passed since the last one, or when another update_fraction of the
+    chunks has completed (0 disables either trigger). Binary objects have
+    no meaningful partial form and are only written at the end.
+
+    Only the decision is taken here. The snapshot, the encoding and the
+    file write all run on writer (see write_preview) so the socket keeps
+    draining. A preview is skipped while the previous one is still busy.
+    """
+    decoder = transfer.decoder
+    if decoder.mode not in ("image", "audio") or transfer.done:
+        return
+    if transfer.pending_write is not None and not transfer.pending_write.done():
         return
 
-    holo_dir = transfer.holo_dir
-    chunk_files = [
-        name for name in os.listdir(holo_dir)
-        if name.startswith("chunk_") and name.endswith(".holo")
-    ]
-    if not chunk_files:
-        print("[rx] no completed chunks, nothing to decode")
+    now = time.time()
+    fraction = (
+        transfer.complete_chunks / float(transfer.total_chunks)
+        if transfer.total_chunks
+        else 0.0
+    )
+    due = update_interval > 0 and now - transfer.last_update_time >= update_interval
+    due = due or (
+        update_fraction > 0
+        and fraction - transfer.last_update_fraction >= update_fraction
+    )
+    if not due:
         return
 
-    mode = holo.detect_mode_from_chunk(holo_dir)
+    out_path = output_path(base_dir, transfer)
+    transfer.pending_write = writer.submit(write_preview, out_path, transfer)
+    transfer.last_update_time = now
+    transfer.last_update_fraction = fraction
+    print(f"{transfer.tag} preview {out_path} ({fraction:.3f} of chunks)")
 
-    if transfer.file_name:
-        out_path = os.path.join(base_dir, transfer.file_name)
-    else:
-        base_name = os.path.basename(holo_dir.rstrip(os.sep))
-        if base_name.endswith(".holo"):
-            base_name = base_name[:-5]
-        if mode == "image":
-            out_path = os.path.join(base_dir, base_name + ".png")
-        elif mode == "audio":
-            out_path = os.path.join(base_dir, base_name + ".wav")
-        else:
-            out_path = os.path.join(base_dir, base_name + ".bin")
 
-    complete_chunks = sum(1 for c in transfer.chunks.values() if c.complete)
+def decode_transfer(
+    base_dir: str,
+    transfer: TransferState,
+    decode_mode: str,
+) -> None:
+    tag = transfer.tag
+    transfer.wait_decoded()
+    if transfer.decoder.mode is None:
+        print(f"{tag} no completed chunks, nothing to decode")
+        return
+
+    complete_chunks = transfer.complete_chunks
     total_chunks = transfer.total_chunks
 
     if total_chunks is not None:
         frac = complete_chunks / float(total_chunks) if total_chunks else 0.0
         print(
-            f"[rx] chunks complete: {complete_chunks}/{total_chunks} "
+            f"{tag} chunks complete: {complete_chunks}/{total_chunks} "
             f"({frac:.3f} fraction)"
         )
         if decode_mode == "strict" and complete_chunks < total_chunks:
-            print("[rx] strict mode: not all chunks present, skipping decode")
+            print(f"{tag} strict mode: not all chunks present, skipping decode")
             return
     else:
-        print("[rx] chunks complete: unknown total_chunks")
+        print(f"{tag} chunks complete: unknown total_chunks")
 
-    success = False
-    try:
-        if mode == "image":
-            holo.decode_image_holo_dir(holo_dir, out_path)
-        elif mode == "audio":
-            holo.decode_audio_holo_dir(holo_dir, out_path)
-        else:
-            holo.decode_binary_holo_dir(holo_dir, out_path)
+    if transfer.pending_write is not None:
+        transfer.pending_write.result()  # let the last preview land first
 
-        print(f"[rx] reconstructed file: {out_path}")
-        success = True
-    finally:
-        if success and os.path.isdir(holo_dir):
-            try:
-                shutil.rmtree(holo_dir)
-                print(f"[rx] removed temporary dir {holo_dir}")
-            except Exception as e:
-                print(f"[rx] warning: could not remove {holo_dir}: {e}")
+    decoder = transfer.decoder
+    os.makedirs(base_dir, exist_ok=True)
+    out_path = output_path(base_dir, transfer)
+    with transfer.decoder_lock:
+        result = decoder.snapshot()
+    write_reconstruction(out_path, decoder.mode, result, decoder.sample_rate)
+    print(f"{tag} reconstructed file: {out_path}")
 
 
-def receive(
-    port: int,
-    base_dir: str,
-    idle_timeout: float,
-    max_payload: int,
-    decode_mode: str,
-) -> None:
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.bind(("0.0.0.0", port))
-    sock.settimeout(1.0)
+def _report_failure(transfer: TransferState):
+    def report(job: Future) -> None:
+        if job.exception() is not None:
+            print(f"{transfer.tag} error: decode failed: {job.exception()}")
 
-    transfer: Optional[TransferState] = None
-    last_packet_time: Optional[float] = None
+    return report
 
-    print(f"[rx] listening on 0.0.0.0:{port} (idle_timeout={idle_timeout}s)")
 
-    try:
-        while True:
-            now = time.time()
-            if last_packet_time is not None and idle_timeout > 0:
-                if now - last_packet_time > idle_timeout:
-                    print("[rx] idle timeout, stopping receive loop")
-                    break
+@dataclass
+class _FinishedTransfer:
+    last_packet_time: float
+    status: Optional[bytes] = None  # final PKT_STATUS, repeated to late packets
+    last_status_time: float = 0.0
 
-            try:
-                data, addr = sock.recvfrom(max_payload)
-            except socket.timeout:
-                continue
 
-            last_packet_time = time.time()
+class TransferTable:
+    """
+    Receiver state for any number of concurrent transfers, keyed by
+    (transfer_id, source address) so senders sharing a port cannot clobber
+    each other. A transfer is finalised (decoded and written) when all its
+    chunks are in, after idle_timeout seconds without packets for it, or
+    when it is evicted: if more than max_transfers are active, or their
+    buffers exceed max_memory_mb, the least recently active transfer is
+    finalised early with what it has. A lone transfer is never evicted
+    for memory.
+
+    Keys of finished transfers are remembered for a while so the sender's
+    remaining loops do not start the transfer over. With accept_new False,
+    packets of transfers not already in progress are ignored.
+
+    Completed chunks are decoded on a single decoder thread, so the
+    caller (the receive loop) only reassembles segments; finishing a
+    transfer waits for its queued chunks before the final decode.
+
+    For senders that ask for feedback, send_status(datagram, addr) is used
+    to report progress (see send_status_updates) and, once a transfer is
+    complete, to answer its late packets with the final status.
+
+    inpaint makes image transfers finalised early or previewed fill the
+    residual of missing chunks (holo.ProgressiveDecoder(inpaint=True)).
+    """
+
+    def __init__(
+        self,
+        base_dir: str,
+        decode_mode: str,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        update_interval: float = DEFAULT_UPDATE_INTERVAL,
+        update_fraction: float = DEFAULT_UPDATE_FRACTION,
+        max_transfers: int = DEFAULT_MAX_TRANSFERS,
+        max_memory_mb: float = DEFAULT_MAX_MEMORY_MB,
+        writer: Optional[ThreadPoolExecutor] = None,
+        send_status: Optional[Callable[[bytes, Tuple[str, int]], None]] = None,
+        inpaint: bool = False,
+    ) -> None:
+        self.base_dir = base_dir
+        self.decode_mode = decode_mode
+        self.inpaint = inpaint
+        self.idle_timeout = idle_timeout
+        self.update_interval = update_interval
+        self.update_fraction = update_fraction
+        self.max_transfers = max(1, max_transfers)
+        self.max_bytes = int(max_memory_mb * 1024 * 1024)
+        self.writer = writer or ThreadPoolExecutor(max_workers=1)
+        self.decode_executor = ThreadPoolExecutor(max_workers=1)
+        self.active: "OrderedDict[tuple, TransferState]" = OrderedDict()
+        self.finished: "OrderedDict[tuple, _FinishedTransfer]" = OrderedDict()
+        self.send_status = send_status
+        self.finished_count = 0
+        self.accept_new = True
+        self.jobs: set = set()
+        self.last_packet_time: Optional[float] = None
+
+    def handle_datagram(
+        self, data: bytes, addr: Tuple[str, int], now: Optional[float] = None
+    ) -> Optional[TransferState]:
+        """
+        Process one datagram; returns the transfer it belonged to, if any.
+        data may be a memoryview over a reused receive buffer: nothing
+        keeps a reference to it after the call.
+        """
+        now = time.time() if now is None else now
+        self.last_packet_time = now
+
+        if len(data) < HEADER_STRUCT.size:
+            return None
+        (
+            magic,
+            version,
+            pkt_type,
+            transfer_id,
+            total_chunks,
+            chunk_idx,
+            seg_idx,
+            total_segments,
+        ) = HEADER_STRUCT.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            return None
+        payload = data[HEADER_STRUCT.size:]
+
+        key = (transfer_id, addr)
+        gone = self.finished.get(key)
+        if gone is not None:
+            gone.last_packet_time = now
+            self.finished.move_to_end(key)
+            resend = gone.status is not None
+            if resend and now - gone.last_status_time >= STATUS_INTERVAL:
+                gone.last_status_time = now
+                self.send_status(gone.status, addr)
+            return None
+
+        transfer = self.active.get(key)
+        if transfer is None:
+            if not self.accept_new:
+                return None
+            transfer = TransferState(
+                transfer_id=transfer_id,
+                addr=addr,
+                total_chunks=total_chunks,
+                decoder=holo.ProgressiveDecoder(inpaint=self.inpaint),
+                decode_executor=self.decode_executor,
+            )
+            self.active[key] = transfer
+            print(
+                f"{transfer.tag} new transfer from {addr}, "
+                f"total_chunks={total_chunks}"
+            )
+            self._evict(keep=key)
+        else:
+            self.active.move_to_end(key)
+        transfer.last_packet_time = now
+
+        if pkt_type == PKT_META:
+            transfer.feedback = bool(seg_idx & META_FEEDBACK)
+            name = bytes(payload).decode("utf-8", errors="ignore").strip()
+            if name and transfer.file_name is None:
+                name = self._claim_name(transfer, os.path.basename(name))
+                transfer.file_name = name
+                print(
+                    f"{transfer.tag} META: file_name='{transfer.file_name}', "
+                    f"total_chunks={total_chunks}"
+                )
+            if total_chunks:
+                transfer.total_chunks = total_chunks
+            return transfer
+
+        if transfer.total_chunks is None and total_chunks:
+            transfer.total_chunks = total_chunks
+
+        if total_segments <= 0 or pkt_type not in (PKT_DATA, PKT_REPAIR):
+            return transfer
+
+        repair = pkt_type == PKT_REPAIR
+        if transfer.add_segment(chunk_idx, seg_idx, total_segments, payload, repair):
+            tot = transfer.total_chunks or "?"
+            print(
+                f"{transfer.tag} completed chunk {chunk_idx}, "
+                f"complete={transfer.complete_chunks}/{tot}"
+            )
+            if transfer.done:
+                self.finish(key, "all chunks complete")
+                return transfer
+            if self.decode_mode == "best":
+                maybe_write_preview(
+                    self.base_dir,
+                    transfer,
+                    self.update_interval,
+                    self.update_fraction,
+                    self.writer,
+                )
+            self._evict(keep=key)
+        return transfer
 
-            if len(data) < HEADER_STRUCT.size:
+    def expire(self, now: Optional[float] = None) -> None:
+        """Finalise transfers that have been silent for idle_timeout seconds."""
+        if self.idle_timeout <= 0:
+            return
+        now = time.time() if now is None else now
+        for key, transfer in list(self.active.items()):
+            if now - transfer.last_packet_time > self.idle_timeout:
+                self.finish(key, "idle timeout")
+        while self.finished:
+            key, gone = next(iter(self.finished.items()))
+            if now - gone.last_packet_time <= self.idle_timeout:
+                break
+            del self.finished[key]
+
+    def send_status_updates(self, now: Optional[float] = None) -> None:
+        """Report progress to every sender that asked for feedback."""
+        if self.send_status is None:
+            return
+        now = time.time() if now is None else now
+        for transfer in self.active.values():
+            if not transfer.feedback or not transfer.total_chunks:
                 continue
+            if now - transfer.last_status_time >= STATUS_INTERVAL:
+                transfer.last_status_time = now
+                self.send_status(encode_status(transfer), transfer.addr)
+
+    def finish(self, key: tuple, reason: str) -> None:
+        """
+        Hand one transfer to the writer pool for its final decode and write;
+        the receive loop keeps serving the others meanwhile.
+        """
+        transfer = self.active.pop(key)
+        print(f"{transfer.tag} {reason}, finishing transfer")
+        job = self.writer.submit(
+            decode_transfer, self.base_dir, transfer, self.decode_mode
+        )
+        job.add_done_callback(_report_failure(transfer))
+        self.jobs.add(job)
+        job.add_done_callback(self.jobs.discard)
+        gone = _FinishedTransfer(transfer.last_packet_time)
+        if transfer.feedback and transfer.done and self.send_status is not None:
+            gone.status = encode_status(transfer)
+            gone.last_status_time = time.time()
+            self.send_status(gone.status, transfer.addr)
+        self.finished[key] = gone
+        while len(self.finished) > FINISHED_MEMORY:
+            self.finished.popitem(last=False)
+        self.finished_count += 1
+
+    def close(self) -> None:
+        """Finalise every transfer still in progress."""
+        for key in list(self.active):
+            self.finish(key, "receiver stopping")
+        self.decode_executor.shutdown(wait=False)  # queued chunks still run
+
+    def _evict(self, keep: tuple) -> None:
+        while len(self.active) > self.max_transfers:
+            self.finish(self._oldest(keep), "evicted (too many transfers)")
+        while len(self.active) > 1:
+            if sum(t.nbytes for t in self.active.values()) <= self.max_bytes:
+                break
+            self.finish(self._oldest(keep), "evicted (memory cap)")
+
+    def _oldest(self, keep: tuple) -> tuple:
+        for key in self.active:
+            if key != keep:
+                return key
+        return keep
+
+    def _claim_name(self, transfer: TransferState, name: str) -> str:
+        """Keep concurrent transfers of equally named files apart."""
+        taken = {t.file_name for t in self.active.values() if t is not transfer}
+        if name not in taken:
+            return name
+        stem, ext = os.path.splitext(name)
+        return f"{stem}_{transfer.transfer_id}{ext}"
+
+
+class ReceiverProtocol(asyncio.DatagramProtocol):
+    """
+    Feeds every datagram into a TransferTable. receive_async drives it
+    from a batched reader (_drain_datagrams) where the loop can wait on
+    the raw socket, and as the protocol of a regular datagram endpoint
+    elsewhere (the Windows proactor loop).
+    """
 
-            header = data[: HEADER_STRUCT.size]
-            payload = data[HEADER_STRUCT.size:]
+    def __init__(
+        self, table: TransferTable, max_payload: int = DEFAULT_RX_MAX_PAYLOAD
+    ) -> None:
+        self.table = table
+        self.max_payload = max_payload
 
-            (
-                magic,
-                version,
-                pkt_type,
-                transfer_id,
-                total_chunks,
-                chunk_idx,
-                seg_idx,
-                total_segments,
-            ) = HEADER_STRUCT.unpack(header)
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        if len(data) <= self.max_payload:
+            self.table.handle_datagram(data, addr)
 
-            if magic != MAGIC or version != VERSION:
-                continue
 
-            if transfer is None or transfer.transfer_id != transfer_id:
-                transfer = TransferState(transfer_id=transfer_id, total_chunks=total_chunks)
-                transfer.holo_dir = create_transfer_dir(base_dir, transfer_id)
-                print(
-                    f"[rx] new transfer_id={transfer_id} from {addr}, "
-                    f"total_chunks={total_chunks}, dir={transfer.holo_dir}"
-                )
+def _send_quietly(sock: socket.socket, data: bytes, addr: Tuple[str, int]) -> None:
+    """Best-effort datagram send; a full buffer just skips this status."""
+    try:
+        sock.sendto(data, addr)
+    except OSError:
+        pass
 
-            if pkt_type == PKT_META:
-                name = payload.decode("utf-8", errors="ignore").strip()
-                if name:
-                    transfer.file_name = os.path.basename(name)
-                if total_chunks:
-                    transfer.total_chunks = total_chunks
-                maybe_rename_dir_for_filename(base_dir, transfer)
-                print(
-                    f"[rx] META: file_name='{transfer.file_name}', "
-                    f"total_chunks={transfer.total_chunks}, "
-                    f"holo_dir={transfer.holo_dir}"
-                )
-                continue
 
-            if transfer.total_chunks is None and total_chunks:
-                transfer.total_chunks = total_chunks
+def _drain_datagrams(
+    sock: socket.socket, protocol: ReceiverProtocol, buf: bytearray
+) -> None:
+    """
+    Reader callback: take up to _RX_BATCH datagrams per wakeup instead of
+    one per event-loop turn. Each lands in the one reusable buf via
+    recvfrom_into and is passed on as a memoryview, so the only copy of
+    the payload is into its chunk's reassembly buffer. buf is one byte
+    longer than max_payload so oversized datagrams are recognised and
+    dropped, not truncated.
+    """
+    recvfrom_into = sock.recvfrom_into
+    view = memoryview(buf)
+    handle = protocol.datagram_received
+    for _ in range(_RX_BATCH):
+        try:
+            nbytes, addr = recvfrom_into(buf)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            protocol.error_received(e)
+            return
+        handle(view[:nbytes], addr)
 
-            if total_segments <= 0:
-                continue
 
-            if chunk_idx not in transfer.chunks:
-                transfer.chunks[chunk_idx] = ChunkAssembly(total_segments=total_segments)
-            chunk = transfer.chunks[chunk_idx]
+async def receive_async(
+    port: int,
+    base_dir: str,
+    idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    max_payload: int = DEFAULT_RX_MAX_PAYLOAD,
+    decode_mode: str = "best",
+    update_interval: float = DEFAULT_UPDATE_INTERVAL,
+    update_fraction: float = DEFAULT_UPDATE_FRACTION,
+    max_transfers: int = DEFAULT_MAX_TRANSFERS,
+    max_memory_mb: float = DEFAULT_MAX_MEMORY_MB,
+    count: int = DEFAULT_COUNT,
+    host: str = "0.0.0.0",
+    executor: Optional[ThreadPoolExecutor] = None,
+    inpaint: bool = False,
+) -> int:
+    """
+    Receive transfers from any number of senders on one port (see
+    TransferTable) and return how many were finished. The event loop only
+    reassembles segments: completed chunks are decoded on the table's
+    decoder thread, previews and final writes run on executor (a private
+    pool if None).
+    Once count transfers have finished (0 = keep going) no new ones are
+    started, and it returns when those still in progress have finished or
+    timed out. It also returns when nothing is in progress and no packet
+    has arrived for idle_timeout seconds. Cancelling the task finalises
+    whatever is in progress. inpaint is passed on to TransferTable.
+    """
+    loop = asyncio.get_running_loop()
+    writer = executor or ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+    table = TransferTable(
+        base_dir,
+        decode_mode,
+        idle_timeout=idle_timeout,
+        update_interval=update_interval,
+        update_fraction=update_fraction,
+        max_transfers=max_transfers,
+        max_memory_mb=max_memory_mb,
+        writer=writer,
+        inpaint=inpaint,
+    )
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    table.send_status = functools.partial(_send_quietly, sock)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _RX_SOCKET_BUFFER)
+    except OSError:
+        pass
+    sock.bind((host, port))
+    sock.setblocking(False)
+    protocol = ReceiverProtocol(table, max_payload)
+    transport = None
+    try:
+        loop.add_reader(
+            sock.fileno(),
+            _drain_datagrams,
+            sock,
+            protocol,
+            bytearray(max_payload + 1),
+        )
+    except NotImplementedError:
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: protocol, sock=sock
+        )
+        table.send_status = transport.sendto
 
-            completed_now = chunk.add_segment(seg_idx, total_segments, payload)
-            if completed_now:
-                holo_dir = transfer.holo_dir or create_transfer_dir(base_dir, transfer_id)
-                fname = os.path.join(holo_dir, f"chunk_{chunk_idx:04d}.holo")
-                with open(fname, "wb") as f:
-                    f.write(chunk.build())
+    print(f"[rx] listening on {host}:{port} (idle_timeout={idle_timeout}s)")
 
-                complete_chunks = sum(1 for c in transfer.chunks.values() if c.complete)
-                tot = transfer.total_chunks or "?"
-                print(
-                    f"[rx] completed chunk {chunk_idx}, "
-                    f"complete={complete_chunks}/{tot}"
-                )
+    try:
+        while True:
+            if count and table.finished_count >= count and table.accept_new:
+                table.accept_new = False
+                if table.active:
+                    print(
+                        f"[rx] {table.finished_count} transfer(s) finished, "
+                        f"waiting for {len(table.active)} still in progress"
+                    )
+            if not table.accept_new and not table.active:
+                break
+            await asyncio.sleep(_RX_TICK)
+            now = time.time()
+            table.expire(now)
+            table.send_status_updates(now)
+            if (
+                idle_timeout > 0
+                and not table.active
+                and table.last_packet_time is not None
+                and now - table.last_packet_time > idle_timeout
+            ):
+                print("[rx] idle timeout, stopping receive loop")
+                break
     finally:
-        sock.close()
+        if transport is not None:
+            transport.close()
+        else:
+            loop.remove_reader(sock.fileno())
+            sock.close()
+        table.close()
+        await asyncio.gather(
+            *(asyncio.wrap_future(job) for job in table.jobs),
+            return_exceptions=True,
+        )
+        if executor is None:
+            writer.shutdown(wait=False)
 
-    if transfer is None:
-        print("[rx] no transfer received")
-        return
+    return table.finished_count
 
-    decode_transfer(base_dir, transfer, decode_mode)
+
+def receive(
+    port: int,
+    base_dir: str,
+    idle_timeout: float,
+    max_payload: int,
+    decode_mode: str,
+    update_interval: float = DEFAULT_UPDATE_INTERVAL,
+    update_fraction: float = DEFAULT_UPDATE_FRACTION,
+    max_transfers: int = DEFAULT_MAX_TRANSFERS,
+    max_memory_mb: float = DEFAULT_MAX_MEMORY_MB,
+    count: int = DEFAULT_COUNT,
+    inpaint: bool = False,
+) -> None:
+    """Blocking wrapper around receive_async for the CLI."""
+    finished = asyncio.run(
+        receive_async(
+            port,
+            base_dir,
+            idle_timeout=idle_timeout,
+            max_payload=max_payload,
+            decode_mode=decode_mode,
+            update_interval=update_interval,
+            update_fraction=update_fraction,
+            max_transfers=max_transfers,
+            max_memory_mb=max_memory_mb,
+            count=count,
+            inpaint=inpaint,
+        )
+    )
+    if finished == 0:
+        print("[rx] no transfer received")
 
 
 # ===================== CLI DISPATCH =====================
@@ -456,7 +1731,72 @@ def build_parser() -> argparse.ArgumentParser:
         "--delay",
         type=float,
         default=DEFAULT_DELAY,
-        help="delay between datagrams in seconds",
+        help="delay between datagrams in seconds; only used without --rate, "
+        "as the equivalent rate for full-size datagrams",
+    )
+    tx.add_argument(
+        "--rate",
+        default=None,
+        help="target bitrate on the wire, e.g. 20Mbit, 500k, 9600baud or "
+        "2MB (bytes); 0 = unlimited. Sent in small bursts per 5 ms tick",
+    )
+    tx.add_argument(
+        "--fec",
+        type=float,
+        default=DEFAULT_FEC,
+        help="Reed-Solomon repair datagrams per data datagram of each chunk; "
+        "0.25 lets a chunk survive losing any 1 in 5 of its datagrams "
+        "(0 = off; the receiver must understand repair packets). A chunk "
+        "has at most 256 data + repair datagrams: chunks of 256 or more "
+        "datagrams get no repair",
+    )
+    tx.add_argument(
+        "--feedback",
+        action="store_true",
+        help="ask the receiver for status reports; later loops then resend "
+        "only missing data and the sender stops once the receiver is complete",
+    )
+    tx.add_argument(
+        "--order",
+        choices=("priority", "random"),
+        default=DEFAULT_ORDER,
+        help="chunk order per loop: priority = coarse chunks, then highest "
+        "residual energy, favouring chunks sent least so far; random = shuffle",
+    )
+
+    tx.add_argument(
+        "--compression",
+        default=DEFAULT_COMPRESSION,
+        help="residual codec preset (default, fast, balanced, archive) "
+        "or codec[:level] with codec zlib/lzma/bz2/zstd",
+    )
+    tx.add_argument(
+        "--transform",
+        default=DEFAULT_TRANSFORM,
+        choices=list(holo.RESIDUAL_TRANSFORMS),
+        help="image/audio residual layout; 'planes' (zigzag byte planes) "
+        "gives smaller chunks and fewer datagrams",
+    )
+    tx.add_argument(
+        "--coarse-copies",
+        type=int,
+        default=0,
+        help="send the coarse part in N dedicated chunks instead of "
+        "repeating it in every chunk (0 = repeat, the default)",
+    )
+    tx.add_argument(
+        "--tier-bits",
+        type=int,
+        default=0,
+        help="image/audio: first chunks carry the residual >> N and later "
+        "ones the low N bits, so early chunks cover the whole signal (0 = off); "
+        "the default compression is then zlib 6",
+    )
+    tx.add_argument(
+        "--pyramid",
+        action="store_true",
+        help="image: add intermediate resolution levels whose residuals are "
+        "sent first; the default compression is then zlib 6",
     )
 
     rx = sub.add_parser("rx", help="receive and reconstruct")
@@ -489,6 +1829,47 @@ def build_parser() -> argparse.ArgumentParser:
         default="best",
         help="best = always decode with available chunks; strict = decode only if all chunks are present",
     )
+    rx.add_argument(
+        "--update-interval",
+        type=float,
+        default=DEFAULT_UPDATE_INTERVAL,
+        help="best mode: rewrite the live reconstruction at most every N "
+        "seconds while chunks arrive (0 = off)",
+    )
+    rx.add_argument(
+        "--update-fraction",
+        type=float,
+        default=DEFAULT_UPDATE_FRACTION,
+        help="best mode: also rewrite it each time another FRACTION of the "
+        "chunks has completed, e.g. 0.1 (0 = off)",
+    )
+    rx.add_argument(
+        "--max-transfers",
+        type=int,
+        default=DEFAULT_MAX_TRANSFERS,
+        help="concurrent transfers to keep; beyond that the least recently "
+        "active one is finalised early",
+    )
+    rx.add_argument(
+        "--max-memory-mb",
+        type=float,
+        default=DEFAULT_MAX_MEMORY_MB,
+        help="buffer budget across concurrent transfers before the least "
+        "recently active one is finalised early",
+    )
+    rx.add_argument(
+        "--count",
+        type=int,
+        default=DEFAULT_COUNT,
+        help="stop starting new transfers after this many have finished and "
+        "exit once those in progress are done (0 = keep receiving until idle)",
+    )
+    rx.add_argument(
+        "--inpaint",
+        action="store_true",
+        help="images: estimate the residual of missing chunks from the "
+        "received ones instead of leaving it at zero",
+    )
 
     return p
 
@@ -506,6 +1887,15 @@ def main():
             loops=args.loops,
             max_payload=args.payload,
             delay=args.delay,
+            rate=args.rate,
+            fec=args.fec,
+            feedback=args.feedback,
+            order=args.order,
+            compression=args.compression,
+            residual_transform=args.transform,
+            coarse_copies=args.coarse_copies,
+            tier_bits=args.tier_bits,
+            pyramid=args.pyramid,
         )
     elif args.mode == "rx":
         receive(
@@ -514,6 +1904,12 @@ def main():
             idle_timeout=args.idle_timeout,
             max_payload=args.payload,
             decode_mode=args.decode_mode,
+            update_interval=args.update_interval,
+            update_fraction=args.update_fraction,
+            max_transfers=args.max_transfers,
+            max_memory_mb=args.max_memory_mb,
+            count=args.count,
+            inpaint=args.inpaint,
         )
     else:
         parser.error("mode must be 'tx' or 'rx'")
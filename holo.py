@@ -10,23 +10,37 @@
 import os
 import sys
 import glob
+import hashlib
 import struct
 import zlib
+import lzma
+import bz2
 import math
+import mmap
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 
 import numpy as np
 from PIL import Image
 import wave
 
+try:
+    import zstandard  # optional: enables the "zstd" residual codec
+except ImportError:
+    zstandard = None
+
+# v2: golden permutation for residual splitting
+# v3: residual codec id + tagged header extension fields
 MAGIC_IMG = b"HOCH"
-VERSION_IMG = 2  # v2: golden permutation for residual splitting
+VERSION_IMG = 3
 
 MAGIC_AUD = b"HOAU"
-VERSION_AUD = 2  # v2: golden permutation for residual splitting
+VERSION_AUD = 3
 
 MAGIC_BIN = b"HOBI"
-VERSION_BIN = 2  # v2: golden permutation for residual splitting
+VERSION_BIN = 3
 
 # Golden ratio constants for holographic residual distribution
 PHI = (1.0 + 5.0 ** 0.5) / 2.0
@@ -63,22 +77,1105 @@ def _golden_step(n: int) -> int:
     return step
 
 
-def _golden_permutation(n: int) -> np.ndarray:
+def _mulmod(a: np.ndarray, b: int, n: int) -> np.ndarray:
     """
-    Golden-ratio-based permutation of indices 0..n-1.
+    Elementwise (a * b) mod n for int64 a in [0, n) and 0 <= b < n.
 
-    perm[i] = (i * step) mod n  with step coprime to n and
-    step ≈ (phi - 1) * n. This produces a single cycle that
-    spreads neighbors very uniformly: ideal per-chunk sampling
-    of residual energy.
+    Small moduli use the direct product. Larger ones (n > ~3e9, where a * b
+    could overflow int64) multiply by b in 16-bit limbs, Horner style.
     """
-    if n <= 1:
-        return np.zeros(max(n, 0), dtype=np.int64)
+    if (n - 1) * (n - 1) <= np.iinfo(np.int64).max:
+        return (a * b) % n
+
+    limbs = []
+    while b:
+        limbs.append(b & 0xFFFF)
+        b >>= 16
+    r = np.zeros_like(a)
+    for limb in reversed(limbs):
+        r = (r * 0x10000 + a * limb) % n
+    return r
+
+
+def _golden_block_size(n: int, block_id: int, block_count: int) -> int:
+    """Number of residual samples carried by block_id out of block_count."""
+    if block_id >= n:
+        return 0
+    return (n - block_id + block_count - 1) // block_count
+
+
+def _golden_block_indices(
+    n: int,
+    block_id: int,
+    block_count: int,
+    start: int = 0,
+    stop: int | None = None,
+    step: int | None = None,
+) -> np.ndarray:
+    """
+    Residual indices of one block, without materializing the permutation.
+
+    Equal to perm[block_id::block_count][start:stop] for the golden
+    permutation perm[i] = (i * step) mod n, using the closed form
+    ((block_id + k * block_count) * step) mod n. Memory is
+    proportional to the requested slice only. Pass step (from _golden_step)
+    to avoid recomputing it for every block.
+    """
+    size = _golden_block_size(n, block_id, block_count)
+    stop = size if stop is None else min(stop, size)
+    if start >= stop:
+        return np.zeros(0, dtype=np.int64)
+    if step is None:
+        step = _golden_step(n)
+
+    base = (block_id * step) % n
+    inc = (block_count * step) % n
+    k = np.arange(start, stop, dtype=np.int64)
+    return (base + _mulmod(k, inc, n)) % n
+
+
+def _golden_block_lookup(
+    positions: np.ndarray, n: int, block_count: int, step: int | None
+):
+    """
+    Inverse of _golden_block_indices for a set of residual positions.
+
+    Position i sits at offset k of block b where i = ((b + k * block_count)
+    * step) mod n, so b and k follow from i * step^-1 mod n. Returns
+    block_id -> (indices into positions held by that block, their offsets
+    in its slice). step None is the unpermuted v1 / single-block layout.
+    Cost is proportional to len(positions), not n.
+    """
+    j = positions if step is None else _mulmod(positions, pow(step, -1, n), n)
+    blocks = j % block_count
+    order = np.argsort(blocks, kind="stable")
+    bounds = np.searchsorted(blocks[order], np.arange(block_count + 1))
+    offsets = j // block_count
+
+    def lookup(block_id: int) -> tuple[np.ndarray, np.ndarray]:
+        sel = order[bounds[block_id]: bounds[block_id + 1]]
+        return sel, offsets[sel]
+
+    return lookup
+
+
+# ===================== WORKER POOL =====================
+
+
+def _resolve_workers(workers: int | None) -> int:
+    """Normalize a workers= argument: None/1 -> serial, <= 0 -> one per CPU."""
+    if workers is None:
+        return 1
+    workers = int(workers)
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def _run_parallel(fn, items, workers: int | None = 1) -> list:
+    """
+    Apply fn to every item and return the results in input order.
+
+    With workers > 1 the calls are spread over a thread pool. zlib, the
+    NumPy gathers and the file writes all release the GIL, so threads
+    scale without the pickling cost of a process pool.
+    """
+    items = list(items)
+    n_workers = min(_resolve_workers(workers), len(items))
+    if n_workers <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+        return list(pool.map(fn, items))
+
+
+def _release_memmap(arr: np.memmap | None) -> None:
+    """
+    Flush a writable np.memmap and unmap it now rather than at collection.
+
+    Only call this once nothing touches the array any more: any access
+    after the unmap is invalid.
+    """
+    if arr is None:
+        return
+    if arr.mode != "r":
+        arr.flush()
+    mm = getattr(arr, "_mmap", None)
+    if mm is not None:
+        mm.close()
+
+
+# ===================== RESIDUAL CODECS =====================
+
+# Codec ids stored in v3+ chunk headers (v1/v2 chunks are always zlib).
+CODEC_ZLIB = 0
+CODEC_LZMA = 1
+CODEC_BZ2 = 2
+CODEC_ZSTD = 3
+
+# name -> (codec id, default level, compressor factory taking a level)
+_CODECS = {
+    "zlib": (CODEC_ZLIB, 9, lambda level: zlib.compressobj(level)),
+    "lzma": (CODEC_LZMA, 6, lambda level: lzma.LZMACompressor(preset=level)),
+    "bz2": (CODEC_BZ2, 9, lambda level: bz2.BZ2Compressor(level)),
+}
+if zstandard is not None:
+    _CODECS["zstd"] = (
+        CODEC_ZSTD,
+        10,
+        lambda level: zstandard.ZstdCompressor(level=level).compressobj(),
+    )
+
+# codec id -> decompressor factory
+_DECOMPRESSORS = {
+    CODEC_ZLIB: zlib.decompressobj,
+    CODEC_LZMA: lzma.LZMADecompressor,
+    CODEC_BZ2: bz2.BZ2Decompressor,
+}
+if zstandard is not None:
+    _DECOMPRESSORS[CODEC_ZSTD] = lambda: zstandard.ZstdDecompressor().decompressobj()
+
+# Speed/ratio presets for the encoders' compression= argument (and the
+# --compression CLI flag). Plain codec names and "codec:level" also work.
+COMPRESSION_PRESETS = {
+    "default": ("zlib", 9),
+    "fast": ("zlib", 1),
+    "balanced": ("zlib", 6),
+    "archive": ("lzma", 9),
+}
+# What "default" stands for in tiered (tier_bits > 0) and pyramid encodes.
+# Their residual pieces are low-entropy, and zlib 9's long match search is
+# several times slower on them than on a plain residual while saving only
+# a few percent.
+_TIERED_DEFAULT_COMPRESSION = "balanced"
+
+
+def _resolve_compression(compression: str) -> tuple[int, int]:
+    """Map a preset, codec name or 'codec:level' to (codec id, level)."""
+    spec = COMPRESSION_PRESETS.get(compression)
+    if spec is None:
+        name, _, level_str = compression.partition(":")
+        if name not in _CODECS:
+            if name == "zstd":
+                raise ValueError("zstd compression needs the 'zstandard' package")
+            choices = sorted(COMPRESSION_PRESETS) + sorted(_CODECS)
+            raise ValueError(
+                f"Unknown compression {compression!r}, expected one of {choices}"
+            )
+        level = int(level_str) if level_str else _CODECS[name][1]
+        spec = (name, level)
+    name, level = spec
+    return _CODECS[name][0], level
+
+
+def _compressor(codec_id: int, level: int):
+    for cid, _default, factory in _CODECS.values():
+        if cid == codec_id:
+            return factory(level)
+    raise ValueError(f"Unsupported residual codec id {codec_id}")
+
+
+def _decompressor(codec_id: int):
+    factory = _DECOMPRESSORS.get(codec_id)
+    if factory is None:
+        if codec_id == CODEC_ZSTD:
+            raise ValueError("zstd-compressed chunk needs the 'zstandard' package")
+        raise ValueError(f"Unsupported residual codec id {codec_id}")
+    return factory()
+
+
+def _compress(data: bytes, codec_id: int = CODEC_ZLIB, level: int = 9) -> bytes:
+    if codec_id == CODEC_ZLIB:
+        return zlib.compress(data, level=level)
+    comp = _compressor(codec_id, level)
+    return comp.compress(data) + comp.flush()
+
+
+def _decompress(data: bytes, codec_id: int = CODEC_ZLIB) -> bytes:
+    if codec_id == CODEC_ZLIB:
+        return zlib.decompress(data)
+    d = _decompressor(codec_id)
+    out = d.decompress(data)
+    if hasattr(d, "flush"):
+        out += d.flush()
+    return out
+
+
+def _compress_pieces(pieces, codec_id: int = CODEC_ZLIB, level: int = 9) -> bytes:
+    """Compress a sequence of arrays; same bytes as _compress of their join."""
+    comp = _compressor(codec_id, level)
+    out = [comp.compress(np.ascontiguousarray(p).tobytes()) for p in pieces]
+    out.append(comp.flush())
+    return b"".join(out)
+
+
+def _inflate_pieces(comp: bytes, piece_bytes: int, codec_id: int):
+    d = _decompressor(codec_id)
+    if codec_id == CODEC_ZLIB:
+        buf = comp
+        while True:
+            piece = d.decompress(buf, piece_bytes)
+            buf = d.unconsumed_tail
+            if piece:
+                yield piece
+            elif not buf:
+                break
+        yield d.flush()
+    elif codec_id in (CODEC_LZMA, CODEC_BZ2):
+        buf = comp
+        while not d.eof:
+            piece = d.decompress(buf, piece_bytes)
+            buf = b""
+            if piece:
+                yield piece
+            elif d.needs_input:
+                break  # truncated stream
+    else:
+        # no bounded-output API: inflate in one go
+        yield d.decompress(comp) + d.flush()
+
+
+def _decompress_pieces(comp: bytes, piece_bytes: int, codec_id: int = CODEC_ZLIB):
+    """
+    Decompress a residual stream incrementally, yielding pieces of at most
+    piece_bytes. Pieces always hold a whole number of int16 samples.
+    """
+    piece_bytes = max(2, piece_bytes - piece_bytes % 2)
+    carry = b""
+    for piece in _inflate_pieces(comp, piece_bytes, codec_id):
+        piece = carry + piece
+        cut = len(piece) - len(piece) % 2
+        carry = piece[cut:]
+        if cut:
+            yield piece[:cut]
+    if carry:
+        yield carry
+
+
+# ===================== RESIDUAL TRANSFORMS =====================
+
+# Header extension tag holding the residual layout (absent = raw int16).
+EXT_TRANSFORM = 1
+# RMS of the chunk's residual values (float32); senders use it to put the
+# most informative chunks first. Absent for binary chunks.
+EXT_ENERGY = 4
+
+TRANSFORM_RAW = 0  # little-endian int16
+TRANSFORM_PLANES = 1  # zigzag uint16 split into a low-byte then a high-byte plane
+TRANSFORM_PLANES8 = 2  # zigzag values all < 256: low-byte plane only
+
+# Values for the encoders' residual_transform= argument (and --transform).
+RESIDUAL_TRANSFORMS = ("raw", "planes")
+
+
+def _zigzag(vals: np.ndarray) -> np.ndarray:
+    """Map int16 0, -1, 1, -2, ... to uint16 0, 1, 2, 3, ..."""
+    v = vals.astype(np.int32)
+    return ((v << 1) ^ (v >> 15)).astype(np.uint16)
+
+
+def _unzigzag(z: np.ndarray) -> np.ndarray:
+    z = z.astype(np.int32)
+    return ((z >> 1) ^ -(z & 1)).astype(np.int16)
+
+
+def _check_transform(residual_transform: str) -> None:
+    if residual_transform not in RESIDUAL_TRANSFORMS:
+        raise ValueError(
+            f"Unknown residual transform {residual_transform!r}, "
+            f"expected one of {list(RESIDUAL_TRANSFORMS)}"
+        )
+
+
+def _transform_ext(layout: int) -> dict[int, bytes]:
+    if layout == TRANSFORM_RAW:
+        return {}
+    return {EXT_TRANSFORM: bytes([layout])}
+
+
+def _energy_ext(sum_sq: float, count: int) -> dict[int, bytes]:
+    if not count:
+        return {}
+    return {EXT_ENERGY: struct.pack(">f", math.sqrt(sum_sq / count))}
+
+
+def _sum_sq(vals: np.ndarray) -> float:
+    v = vals.astype(np.int64)
+    return float(v @ v)
+
+
+def _transform_layout(ext: dict[int, bytes], path: str) -> int:
+    value = ext.get(EXT_TRANSFORM, b"\x00")
+    layout = value[0] if value else TRANSFORM_RAW
+    if layout not in (TRANSFORM_RAW, TRANSFORM_PLANES, TRANSFORM_PLANES8):
+        raise ValueError(f"Unsupported residual transform {layout} in {path}")
+    return layout
+
 
-    step = _golden_step(n)
-    idx = np.arange(n, dtype=np.int64)
-    perm = (idx * step) % n
-    return perm
+def _plane_layout(lo: int, hi: int) -> int:
+    """Narrowest byte-plane layout for residual values in [lo, hi]."""
+    return TRANSFORM_PLANES8 if -128 <= lo and hi <= 127 else TRANSFORM_PLANES
+
+
+def _encode_residual(
+    vals: np.ndarray, residual_transform: str, codec_id: int, level: int
+) -> tuple[bytes, dict[int, bytes]]:
+    """Compress one residual slice; returns (payload, header ext fields)."""
+    energy = _energy_ext(_sum_sq(vals), vals.size)
+    if residual_transform == "raw":
+        return _compress(vals.astype("<i2").tobytes(), codec_id, level), energy
+
+    layout = TRANSFORM_PLANES8
+    if vals.size:
+        layout = _plane_layout(int(vals.min()), int(vals.max()))
+    z = _zigzag(vals)
+    planes = [(z & 0xFF).astype(np.uint8)]
+    if layout == TRANSFORM_PLANES:
+        planes.append((z >> 8).astype(np.uint8))
+    payload = _compress_pieces(planes, codec_id, level)
+    return payload, {**_transform_ext(layout), **energy}
+
+
+def _encode_residual_pieces(
+    pieces, residual_transform: str, codec_id: int, level: int
+) -> tuple[bytes, dict[int, bytes]]:
+    """
+    Like _encode_residual for a slice given as pieces.
+
+    pieces is a callable returning a fresh iterator over the int16 pieces;
+    the byte-plane layout reads them up to three times (range, low plane,
+    high plane) so that no more than one piece is in memory at a time.
+    """
+    sum_sq, count = 0.0, 0
+
+    def measured():
+        nonlocal sum_sq, count
+        for p in pieces():
+            sum_sq += _sum_sq(p)
+            count += len(p)
+            yield p
+
+    if residual_transform == "raw":
+        payload = _compress_pieces(measured(), codec_id, level)
+        return payload, _energy_ext(sum_sq, count)
+
+    lo, hi = 0, 0
+    for p in measured():
+        if len(p):
+            lo, hi = min(lo, int(p.min())), max(hi, int(p.max()))
+    layout = _plane_layout(lo, hi)
+
+    def plane(shift: int):
+        for p in pieces():
+            yield ((_zigzag(p) >> shift) & 0xFF).astype(np.uint8)
+
+    planes = [plane(0)]
+    if layout == TRANSFORM_PLANES:
+        planes.append(plane(8))
+    comp = _compressor(codec_id, level)
+    out = [comp.compress(p.tobytes()) for gen in planes for p in gen]
+    out.append(comp.flush())
+    return b"".join(out), {**_transform_ext(layout), **_energy_ext(sum_sq, count)}
+
+
+def _decode_residual(data: bytes, layout: int) -> np.ndarray:
+    """Decompressed residual bytes -> int16 values, undoing the transform."""
+    if layout == TRANSFORM_RAW:
+        return np.frombuffer(data, dtype="<i2").astype(np.int16)
+    planes = np.frombuffer(data, dtype=np.uint8)
+    if layout == TRANSFORM_PLANES8:
+        return _unzigzag(planes)
+    n = len(planes) // 2
+    z = planes[:n].astype(np.uint16) | (planes[n: 2 * n].astype(np.uint16) << 8)
+    return _unzigzag(z)
+
+
+def _scatter_residual_pieces(
+    out: np.ndarray,
+    comp: bytes,
+    codec_id: int,
+    layout: int,
+    n_vals: int,
+    piece_bytes: int,
+    positions_for,
+) -> None:
+    """
+    Decompress a residual slice piece by piece into out (an int16 array).
+
+    positions_for(k0, k1) returns the positions in out of slice values
+    k0..k1 (it may return fewer near the end of out). With the byte-plane
+    layout the low plane is stored first and completed in place when the
+    high plane arrives, so memory stays bounded by piece_bytes.
+    """
+    if layout == TRANSFORM_RAW:
+        k = 0
+        for piece in _decompress_pieces(comp, piece_bytes, codec_id):
+            vals = np.frombuffer(piece, dtype="<i2")
+            positions = positions_for(k, k + len(vals))
+            out[positions] = vals[: len(positions)]
+            k += len(vals)
+        return
+
+    pos = 0  # byte offset into the plane stream
+    for piece in _inflate_pieces(comp, max(1, piece_bytes), codec_id):
+        b = np.frombuffer(piece, dtype=np.uint8)
+        start, pos = pos, pos + len(b)
+        # split the piece at the low/high plane boundary (n_vals)
+        spans = ((start, min(pos, n_vals), 0), (max(start, n_vals), pos, 1))
+        for p0, p1, plane in spans:
+            if p1 <= p0:
+                continue
+            if plane == 1 and layout == TRANSFORM_PLANES8:
+                break
+            seg = b[p0 - start: p1 - start]
+            k0 = p0 - plane * n_vals
+            positions = positions_for(k0, k0 + len(seg))
+            seg = seg[: len(positions)]
+            if layout == TRANSFORM_PLANES8:
+                out[positions] = _unzigzag(seg)
+            elif plane == 0:
+                out[positions] = seg
+            else:
+                z = out[positions].astype(np.uint16) | (seg.astype(np.uint16) << 8)
+                out[positions] = _unzigzag(z)
+
+
+# ===================== RESIDUAL TIERS =====================
+
+# Tiered residuals (encoders' tier_bits > 0): each residual value r is split
+# into a coarse tier, r / 2**tier_bits truncated toward zero, and a refinement
+# tier holding the remainder (same sign as r). The coarse tier takes the first
+# block ids and the refinement tier the rest, each spread over its own blocks
+# by the golden permutation. Chunks carry EXT_TIER: tier (B), tier_bits (B),
+# first block (I) and block count (I) of their tier.
+EXT_TIER = 5
+MAX_TIER_BITS = 15
+
+
+def _check_tier_bits(tier_bits: int) -> None:
+    if not 0 <= tier_bits <= MAX_TIER_BITS:
+        raise ValueError(f"tier_bits must be in 0..{MAX_TIER_BITS}, got {tier_bits}")
+
+
+def _split_tiers(vals: np.ndarray, tier_bits: int) -> tuple[np.ndarray, np.ndarray]:
+    """int16 residual -> (coarse tier, refinement tier), both int16."""
+    v = vals.astype(np.int32)
+    hi = np.sign(v) * (np.abs(v) >> tier_bits)
+    lo = v - (hi << tier_bits)
+    return hi.astype(np.int16), lo.astype(np.int16)
+
+
+def _tier_estimate(hi: np.ndarray, tier_bits: int) -> np.ndarray:
+    """Residual guess (int32) from the coarse tier alone: middle of its bucket."""
+    hi = hi.astype(np.int32)
+    return (hi << tier_bits) + np.sign(hi) * (((1 << tier_bits) - 1) >> 1)
+
+
+def _entropy_bits(vals: np.ndarray) -> float:
+    """Zeroth-order entropy of vals in bits, a cheap compressed size estimate."""
+    if not vals.size:
+        return 0.0
+    counts = np.bincount(_zigzag(vals))
+    p = counts[counts > 0] / float(vals.size)
+    return float(-(p * np.log2(p)).sum()) * vals.size
+
+
+def _layer_spans(layers, block_count: int, option: str) -> list[tuple[int, int]]:
+    """
+    (first block, block count) of each residual layer (tier or pyramid
+    level), in order: at least one block each, the rest shared in
+    proportion to the layers' estimated compressed sizes.
+    """
+    if block_count < len(layers):
+        raise ValueError(f"{option} needs at least {len(layers)} blocks")
+    sizes = [_entropy_bits(v) for v in layers]
+    total = sum(sizes) or 1.0
+    ideal = [block_count * s / total for s in sizes]
+    counts = [max(1, int(round(x))) for x in ideal]
+    while sum(counts) > block_count:
+        counts[counts.index(max(counts))] -= 1
+    while sum(counts) < block_count:
+        i = max(range(len(counts)), key=lambda i: ideal[i] - counts[i])
+        counts[i] += 1
+    spans, first = [], 0
+    for count in counts:
+        spans.append((first, count))
+        first += count
+    return spans
+
+
+def _residual_slicer(residual_flat: np.ndarray, block_count: int, tier_bits: int):
+    """
+    block_id -> (residual slice, extra header ext fields) for the encoders.
+
+    Without tiers this is the plain golden-permutation slice. With tiers the
+    slice comes from the block's tier, and its EXT_ENERGY is the RMS of what
+    the slice adds to the reconstruction, so coarse-tier chunks rank first.
+    """
+    N = residual_flat.size
+    step = _golden_step(N)
+
+    if not tier_bits:
+
+        def plain(block_id: int):
+            if block_count == 1:
+                return residual_flat, {}
+            idx = _golden_block_indices(N, block_id, block_count, step=step)
+            return residual_flat[idx], {}
+
+        return plain
+
+    tiers = _split_tiers(residual_flat, tier_bits)
+    spans = _layer_spans(tiers, block_count, "tier_bits")
+
+    def tiered(block_id: int):
+        tier = 0 if block_id < spans[1][0] else 1
+        first, count = spans[tier]
+        idx = _golden_block_indices(N, block_id - first, count, step=step)
+        vals = tiers[tier][idx]
+        added = _tier_estimate(vals, tier_bits) if tier == 0 else vals
+        ext = {EXT_TIER: struct.pack(">BBII", tier, tier_bits, first, count)}
+        ext.update(_energy_ext(_sum_sq(added), vals.size))
+        return vals, ext
+
+    return tiered
+
+
+def _tier_fields(info: dict, path: str) -> tuple[int, int, int, int] | None:
+    """(tier, tier_bits, first block, block count) of a chunk, None if untiered."""
+    value = info["ext"].get(EXT_TIER)
+    if value is None:
+        return None
+    if len(value) != 10:
+        raise ValueError(f"Invalid residual tier field in {path}")
+    tier, bits, first, count = struct.unpack(">BBII", value)
+    if (
+        tier > 1
+        or not 1 <= bits <= MAX_TIER_BITS
+        or count < 1
+        or first + count > info["block_count"]
+        or not first <= info["block_id"] < first + count
+    ):
+        raise ValueError(f"Invalid residual tier field in {path}")
+    return tier, bits, first, count
+
+
+def _first_residual(chunk_files: list[str], read_chunk, parse) -> dict | None:
+    """Parsed first chunk that carries a residual slice, None if there is none."""
+    for path in chunk_files:
+        info = parse(read_chunk(path), path)
+        if info is not None and not _is_coarse_copy(info):
+            return info
+    return None
+
+
+def _first_tier_bits(chunk_files: list[str], read_chunk, parse) -> int:
+    """tier_bits of the first residual chunk (0: untiered)."""
+    info = _first_residual(chunk_files, read_chunk, parse)
+    fields = _tier_fields(info, "<first residual chunk>") if info else None
+    return fields[1] if fields else 0
+
+
+class _TieredResidual:
+    """
+    Residual assembled from tiered chunks. Where only the coarse tier of a
+    value arrived it counts as the middle of its bucket, where only the
+    refinement arrived as the refinement alone.
+    """
+
+    def __init__(self, n: int, tier_bits: int) -> None:
+        self.n = n
+        self.tier_bits = tier_bits
+        self.step = _golden_step(n)
+        self.hi = np.zeros(n, dtype=np.int16)
+        self.lo = np.zeros(n, dtype=np.int16)
+        self.lo_known = np.zeros(n, dtype=bool)
+
+    def add(self, info: dict, vals: np.ndarray, path: str) -> np.ndarray:
+        """Place one chunk's residual slice; returns the positions it covers."""
+        fields = _tier_fields(info, path)
+        if fields is None or fields[1] != self.tier_bits:
+            raise ValueError(f"Mixed residual tiers in {path}")
+        tier, _bits, first, count = fields
+        positions = _golden_block_indices(
+            self.n, info["block_id"] - first, count, stop=len(vals), step=self.step
+        )
+        vals = vals[: len(positions)]
+        if tier == 0:
+            self.hi[positions] = vals
+        else:
+            self.lo[positions] = vals
+            self.lo_known[positions] = True
+        return positions
+
+    def values(self, positions: np.ndarray | None = None) -> np.ndarray:
+        """Current int16 residual, at positions or everywhere."""
+        sel = slice(None) if positions is None else positions
+        hi = self.hi[sel]
+        guess = _tier_estimate(hi, self.tier_bits)
+        exact = (hi.astype(np.int32) << self.tier_bits) + self.lo[sel]
+        return np.where(self.lo_known[sel], exact, guess).astype(np.int16)
+
+
+# ===================== CHUNK HELPERS =====================
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _list_chunk_files(in_dir: str, max_chunks: int | None = None) -> list[str]:
+    """Sorted chunk_*.holo paths of a .holo directory, optionally truncated."""
+    chunk_files = sorted(glob.glob(os.path.join(in_dir, "chunk_*.holo")))
+    if not chunk_files:
+        raise FileNotFoundError(f"No chunk_*.holo found in {in_dir}")
+    if max_chunks is not None:
+        chunk_files = chunk_files[:max_chunks]
+    return chunk_files
+
+
+def _pack_v3_fields(codec_id: int, ext: dict[int, bytes] | None = None) -> bytes:
+    """
+    v3 header tail: codec id (B), extension length (H), extension fields.
+
+    Extension fields are tag (B), length (H), value; decoders skip tags
+    they do not know, so per-chunk metadata can be added without a new
+    header version.
+    """
+    fields = bytearray()
+    for tag, value in sorted((ext or {}).items()):
+        fields += struct.pack(">BH", tag, len(value))
+        fields += value
+    return struct.pack(">BH", codec_id, len(fields)) + bytes(fields)
+
+
+def _parse_v3_fields(data: bytes, off: int) -> tuple[int, dict[int, bytes], int]:
+    """
+    Inverse of _pack_v3_fields: returns (codec id, ext fields, new offset).
+
+    Raises ValueError when the extension area, or a field in it, runs past
+    the end of the chunk.
+    """
+    if off + 3 > len(data):
+        raise ValueError("Truncated v3 chunk header")
+    codec_id, ext_len = struct.unpack_from(">BH", data, off)
+    off += 3
+    end = off + ext_len
+    if end > len(data):
+        raise ValueError(
+            f"v3 extension area of {ext_len} bytes runs past the end of the chunk"
+        )
+    ext = {}
+    while off + 3 <= end:
+        tag, length = struct.unpack_from(">BH", data, off)
+        off += 3
+        if off + length > end:
+            raise ValueError(
+                f"v3 extension field {tag} of {length} bytes runs past its area"
+            )
+        ext[tag] = bytes(data[off: off + length])
+        off += length
+    return codec_id, ext, end
+
+
+def _write_chunk(out_dir: str, block_id: int, data: bytes) -> None:
+    fname = os.path.join(out_dir, f"chunk_{block_id:04d}.holo")
+    with open(fname, "wb") as f:
+        f.write(data)
+
+
+# Dedicated coarse chunks (encoders' coarse_copies > 0): residual chunks
+# carry an empty coarse payload plus EXT_CONTENT_ID, a short hash of the
+# coarse payload; the payload itself travels in coarse_copies extra chunks
+# tagged EXT_COARSE_COPY (value: copy index) that have no residual.
+EXT_CONTENT_ID = 2
+EXT_COARSE_COPY = 3
+
+
+def _content_id(coarse_payload: bytes) -> bytes:
+    return hashlib.blake2b(coarse_payload, digest_size=8).digest()
+
+
+def _residual_ext(
+    ext: dict[int, bytes] | None, content_id: bytes | None
+) -> dict[int, bytes]:
+    """Header ext fields of a residual chunk, with its coarse content id if any."""
+    ext = dict(ext or {})
+    if content_id is not None:
+        ext[EXT_CONTENT_ID] = content_id
+    return ext
+
+
+def _coarse_layout(
+    coarse_payload: bytes, coarse_copies: int
+) -> tuple[bytes, bytes | None]:
+    """(coarse payload embedded in residual chunks, content id) for coarse_copies."""
+    if coarse_copies < 0:
+        raise ValueError(f"coarse_copies must be >= 0, got {coarse_copies}")
+    if coarse_copies == 0:
+        return coarse_payload, None
+    return b"", _content_id(coarse_payload)
+
+
+def _coarse_copy_ext(content_id: bytes, copy_index: int) -> dict[int, bytes]:
+    return {EXT_CONTENT_ID: content_id, EXT_COARSE_COPY: struct.pack(">H", copy_index)}
+
+
+def _is_coarse_copy(info: dict) -> bool:
+    return EXT_COARSE_COPY in info["ext"]
+
+
+def _find_coarse(
+    first: dict, chunk_files: list[str], read_chunk, parse
+) -> bytes | None:
+    """
+    Coarse payload for a decode: embedded in the first chunk, else taken
+    from any surviving coarse chunk with the matching content id. None when
+    no copy survived.
+    """
+    if first["coarse"]:
+        return first["coarse"]
+    content_id = first["ext"].get(EXT_CONTENT_ID)
+    for path in chunk_files:
+        info = parse(read_chunk(path), path)
+        if (
+            info is not None
+            and info["coarse"]
+            and info["ext"].get(EXT_CONTENT_ID) == content_id
+        ):
+            return info["coarse"]
+    return None
+
+
+def chunk_priority(data: bytes) -> float:
+    """
+    Send priority of one chunk, higher first: dedicated coarse chunks come
+    before everything, residual chunks rank by their EXT_ENERGY, and
+    chunks without one (binary, older encoders) get 0.
+    """
+    for parse in (_parse_image_chunk, _parse_audio_chunk, _parse_binary_chunk):
+        info = parse(data, "<chunk>")
+        if info is None:
+            continue
+        if _is_coarse_copy(info):
+            return math.inf
+        value = info["ext"].get(EXT_ENERGY, b"")
+        return struct.unpack(">f", value)[0] if len(value) == 4 else 0.0
+    raise ValueError("Unknown chunk type (unexpected magic bytes)")
+
+
+def _block_count_for_target(
+    block_count: int,
+    target_chunk_kb: int | None,
+    residual_bytes_total: int,
+    overhead_bytes: int,
+    max_blocks: int,
+) -> int:
+    """
+    Pick the block count so that each chunk is about target_chunk_kb.
+
+    overhead_bytes is the per-chunk payload that does not shrink with more
+    blocks (the coarse part). Returns block_count unchanged when no target
+    is given.
+    """
+    if target_chunk_kb is None:
+        return block_count
+    try:
+        target_bytes = max(1, int(target_chunk_kb) * 1024)
+    except ValueError:
+        return block_count
+
+    header_overhead = 64  # header + margin
+    overhead_approx = overhead_bytes + header_overhead
+    if target_bytes <= overhead_approx + 1:
+        return 1
+    useful_per_chunk = target_bytes - overhead_approx
+    block_count = int(np.ceil(residual_bytes_total / useful_per_chunk))
+    return max(1, min(block_count, max_blocks))
+
+
+# Rough working set per residual sample while a streaming encoder or decoder
+# handles one strip or window: source and coarse copies, the int16 residual
+# and the int64 index arithmetic of the golden scatter.
+_STREAM_BYTES_PER_SAMPLE = 64
+
+
+class _BlockSpill:
+    """
+    Disk-backed per-block residual buffers for the streaming encoders.
+
+    Block b owns a contiguous region of one temporary memmap, holding its
+    samples in chunk order. Residual values can therefore be scattered in
+    from their natural positions as they are produced, and each block is
+    later read back sequentially for compression.
+    """
+
+    def __init__(self, out_dir: str, n: int, block_count: int, dtype: str) -> None:
+        self.n = n
+        self.block_count = block_count
+        b = np.arange(block_count, dtype=np.int64)
+        sizes = np.where(b < n, (n - b + block_count - 1) // block_count, 0)
+        self.offsets = np.concatenate(([0], np.cumsum(sizes))).astype(np.int64)
+        self.inv_step = pow(_golden_step(n), -1, n) if n > 0 else 0
+
+        fd, self.path = tempfile.mkstemp(prefix=".spill_", dir=out_dir)
+        os.close(fd)
+        self.data = np.memmap(self.path, dtype=dtype, mode="w+", shape=(max(n, 1),))
+
+    def scatter(self, positions: np.ndarray, values: np.ndarray) -> None:
+        """Store values whose natural (unpermuted) flat positions are given."""
+        if self.block_count == 1:
+            dest = positions
+        else:
+            # invert perm[i] = i * step mod n to find (block, k) for each sample
+            i = _mulmod(positions, self.inv_step, self.n)
+            dest = self.offsets[i % self.block_count] + i // self.block_count
+        self.data[dest] = values
+
+    def block_pieces(self, block_id: int, piece_len: int):
+        """Yield the samples of one block in chunk order, piece_len at a time."""
+        start = int(self.offsets[block_id])
+        stop = int(self.offsets[block_id + 1])
+        for s in range(start, stop, piece_len):
+            yield self.data[s: min(stop, s + piece_len)]
+
+    def close(self) -> None:
+        del self.data
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+# ===================== PACKED CONTAINER =====================
+
+# A .holopack holds all chunks of one object in a single file:
+#
+#   header  ">4sBIQIQ"  magic, version, chunk count, coarse offset,
+#                       coarse size, table offset
+#   coarse payload (stored once), chunk bodies
+#   table   count x ">IQII"  block id, body offset, body length, coarse_at
+#
+# Chunk bodies are the chunk files with their coarse payload cut out;
+# coarse_at is where it goes back in (_PACK_NO_COARSE: body is complete).
+# The table is sorted by block id and written last, so a pack with a zero
+# table offset was never finished.
+PACK_MAGIC = b"HOPK"
+PACK_VERSION = 1
+PACK_SUFFIX = ".holopack"
+
+_PACK_HEADER = struct.Struct(">4sBIQIQ")
+_PACK_ENTRY = struct.Struct(">IQII")
+_PACK_NO_COARSE = 0xFFFFFFFF
+
+
+def _coarse_span(data: bytes) -> tuple[int, int] | None:
+    """(offset, size) of the coarse payload inside a chunk, if recognized."""
+    for parse in (_parse_image_chunk, _parse_audio_chunk, _parse_binary_chunk):
+        info = parse(data, "<chunk>")
+        if info is not None:
+            return info["coarse_off"], len(info["coarse"])
+    return None
+
+
+def is_holo_pack(path: str) -> bool:
+    """True if path is a .holopack file (checked by magic, not by name)."""
+    if not os.path.isfile(path):
+        return False
+    with open(path, "rb") as f:
+        return f.read(4) == PACK_MAGIC
+
+
+class HoloPack:
+    """
+    Memory-mapped reader for a .holopack file.
+
+    Chunks are addressed by index (0..len-1, in block id order) and come
+    back as the exact bytes of the corresponding chunk_XXXX.holo file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < _PACK_HEADER.size:
+            self.close()
+            raise ValueError(f"Truncated pack header in {path}")
+        magic, version, count, coarse_off, coarse_size, table_off = (
+            _PACK_HEADER.unpack_from(self._mm, 0)
+        )
+        if magic != PACK_MAGIC:
+            self.close()
+            raise ValueError(f"Not a holo pack: {path}")
+        if version != PACK_VERSION or table_off == 0:
+            self.close()
+            raise ValueError(f"Unsupported or incomplete pack (v{version}): {path}")
+        table_end = table_off + count * _PACK_ENTRY.size
+        if coarse_off + coarse_size > len(self._mm) or table_end > len(self._mm):
+            self.close()
+            raise ValueError(f"Truncated pack: {path}")
+        self.coarse = self._mm[coarse_off: coarse_off + coarse_size]
+        self.entries = [
+            _PACK_ENTRY.unpack_from(self._mm, table_off + i * _PACK_ENTRY.size)
+            for i in range(count)
+        ]
+        if any(offset + length > table_off for _b, offset, length, _c in self.entries):
+            self.close()
+            raise ValueError(f"Pack entry past the chunk area: {path}")
+        self.block_ids = [e[0] for e in self.entries]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __enter__(self) -> "HoloPack":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def chunk(self, index: int) -> bytes:
+        _block_id, offset, length, coarse_at = self.entries[index]
+        body = self._mm[offset: offset + length]
+        if coarse_at == _PACK_NO_COARSE:
+            return body
+        return body[:coarse_at] + self.coarse + body[coarse_at:]
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+class _ChunkSink:
+    """
+    Where encoders put their chunks: a .holo directory of chunk files, a
+    single .holopack file when out_path ends with PACK_SUFFIX, or memory
+    when out_path is None (see chunk_list()).
+
+    write() may be called from several worker threads. close() must be
+    called once all blocks are written.
+    """
+
+    def __init__(self, out_path: str | None) -> None:
+        self.path = out_path
+        self.memory = None
+        self.pack = out_path is not None and out_path.endswith(PACK_SUFFIX)
+        if out_path is None:
+            self.memory = {}
+            self.work_dir = tempfile.gettempdir()
+            return
+        if not self.pack:
+            os.makedirs(out_path, exist_ok=True)
+            self.work_dir = out_path  # scratch files (e.g. _BlockSpill)
+            return
+
+        self.work_dir = os.path.dirname(os.path.abspath(out_path))
+        os.makedirs(self.work_dir, exist_ok=True)
+        self._f = open(out_path, "wb")
+        self._f.write(bytes(_PACK_HEADER.size))
+        self._lock = threading.Lock()
+        self._entries = []
+        self._coarse = None
+        self._coarse_off = 0
+
+    def write(self, block_id: int, data: bytes) -> None:
+        if self.memory is not None:
+            self.memory[block_id] = data
+            return
+        if not self.pack:
+            _write_chunk(self.path, block_id, data)
+            return
+
+        span = _coarse_span(data)
+        if span is not None and span[1] == 0:
+            span = None  # residual-only chunk (dedicated coarse chunks)
+        with self._lock:
+            if span is not None and self._coarse is None:
+                off, size = span
+                self._coarse = data[off: off + size]
+                self._coarse_off = self._f.tell()
+                self._f.write(self._coarse)
+            coarse_at = _PACK_NO_COARSE
+            body = data
+            if span is not None:
+                off, size = span
+                if data[off: off + size] == self._coarse:
+                    coarse_at = off
+                    body = data[:off] + data[off + size:]
+            self._entries.append((block_id, self._f.tell(), len(body), coarse_at))
+            self._f.write(body)
+
+    def chunk_list(self) -> list[bytes]:
+        """Chunks of an in-memory sink, in chunk order."""
+        return [self.memory[i] for i in sorted(self.memory)]
+
+    def close(self) -> None:
+        if not self.pack:
+            return
+        table_off = self._f.tell()
+        for entry in sorted(self._entries):
+            self._f.write(_PACK_ENTRY.pack(*entry))
+        self._f.seek(0)
+        self._f.write(
+            _PACK_HEADER.pack(
+                PACK_MAGIC,
+                PACK_VERSION,
+                len(self._entries),
+                self._coarse_off,
+                len(self._coarse or b""),
+                table_off,
+            )
+        )
+        self._f.close()
+
+
+def _memory_reader(chunks, max_chunks: int | None = None):
+    """(names, read) like _chunk_reader, for chunk payloads already in memory."""
+    chunks = list(chunks)
+    if max_chunks is not None:
+        chunks = chunks[:max_chunks]
+    if not chunks:
+        raise ValueError("No chunks given")
+    by_name = {f"<chunk {i}>": data for i, data in enumerate(chunks)}
+    return list(by_name), by_name.__getitem__
+
+
+def _chunk_reader(in_path: str, max_chunks: int | None = None):
+    """
+    Chunk names and a thread-safe read(name) -> bytes for a .holo directory
+    or a .holopack file. Names sort in block order; max_chunks keeps the
+    first ones, like _list_chunk_files.
+    """
+    if not is_holo_pack(in_path):
+        return _list_chunk_files(in_path, max_chunks), _read_file
+
+    pack = HoloPack(in_path)
+    if len(pack) == 0:
+        pack.close()
+        raise FileNotFoundError(f"No chunks found in {in_path}")
+    count = len(pack) if max_chunks is None else min(len(pack), max_chunks)
+    names = {f"{in_path}[{i}]": i for i in range(count)}
+    # the mapping stays open for the caller's lifetime; CPython closes it
+    # when the reader is garbage collected
+    return list(names), lambda name: pack.chunk(names[name])
+
+
+def pack_holo_dir(in_dir: str, pack_path: str) -> None:
+    """Convert a .holo chunk directory into a single .holopack file."""
+    if not pack_path.endswith(PACK_SUFFIX):
+        raise ValueError(f"Pack path must end with {PACK_SUFFIX}: {pack_path}")
+    sink = _ChunkSink(pack_path)
+    for path in _list_chunk_files(in_dir):
+        data = _read_file(path)
+        block_id = int(os.path.basename(path)[len("chunk_"): -len(".holo")])
+        sink.write(block_id, data)
+    sink.close()
+
+
+def unpack_holo_pack(pack_path: str, out_dir: str) -> None:
+    """Convert a .holopack file back into a .holo chunk directory."""
+    os.makedirs(out_dir, exist_ok=True)
+    with HoloPack(pack_path) as pack:
+        for i, block_id in enumerate(pack.block_ids):
+            _write_chunk(out_dir, block_id, pack.chunk(i))
 
 
 # ===================== IMAGES =====================
@@ -130,12 +1227,398 @@ def stack_images_average(input_paths: list[str], output_path: str) -> None:
     print(f"[Holo] Stacked {len(imgs)} images -> {output_path}")
 
 
+def _coarse_thumbnail(
+    img_pil: Image.Image,
+    coarse_max_side: int,
+    size: tuple[int, int] | None = None,
+) -> tuple[Image.Image, bytes]:
+    """
+    BICUBIC thumbnail with longest side coarse_max_side, plus its PNG bytes.
+
+    size is the (w, h) of the full image when img_pil already went through
+    the horizontal resize pass (it is then only resized vertically).
+    """
+    w, h = size or img_pil.size
+    max_side = max(h, w)
+    scale = min(1.0, float(coarse_max_side) / float(max_side))
+    cw = max(1, int(round(w * scale)))
+    ch = max(1, int(round(h * scale)))
+
+    coarse_img = img_pil.resize((cw, ch), Image.BICUBIC)
+
+    buf = BytesIO()
+    coarse_img.save(buf, format="PNG")
+    return coarse_img, buf.getvalue()
+
+
+# Pyramid images (encoders' pyramid=True): between the thumbnail (level 0)
+# and the full resolution there are intermediate levels whose longest side
+# grows by PYRAMID_FACTOR. Level i stores its image minus the bicubic
+# upsampling of level i - 1; the last level is the full image. Each level
+# has its own block range, coarse levels first. Residual chunks carry
+# EXT_LEVEL: their level (B), the level count (B), then height, width,
+# first block and block count (4 x I) of every level.
+EXT_LEVEL = 6
+PYRAMID_FACTOR = 4
+
+
+def _pyramid_sizes(h: int, w: int, coarse_max_side: int) -> list[tuple[int, int]]:
+    """(height, width) of the residual levels 1..L; the last one is (h, w)."""
+    sizes = []
+    side = coarse_max_side * PYRAMID_FACTOR
+    while side < max(h, w):
+        scale = float(side) / float(max(h, w))
+        sizes.append((max(1, int(round(h * scale))), max(1, int(round(w * scale)))))
+        side *= PYRAMID_FACTOR
+    sizes.append((h, w))
+    return sizes
+
+
+def _pyramid_predict(
+    coarse_img: Image.Image | None,
+    sizes: list[tuple[int, int]],
+    residuals: list[np.ndarray],
+) -> np.ndarray:
+    """
+    int16 prediction of the last level in sizes: the thumbnail upsampled
+    level by level, adding at each level below the last its residual
+    (residuals has one entry fewer than sizes). Without a thumbnail the
+    first level starts from black.
+    """
+    cur = coarse_img
+    if cur is None:
+        cur = Image.new("RGB", (sizes[0][1], sizes[0][0]))
+    for size, res in zip(sizes, residuals):
+        cur = _pyramid_level(cur, size, res)
+    h, w = sizes[-1]
+    return np.asarray(cur.resize((w, h), Image.BICUBIC), dtype=np.int16)
+
+
+def _pyramid_level(
+    prev: Image.Image, size: tuple[int, int], residual: np.ndarray
+) -> Image.Image:
+    """One pyramid level: prev upsampled to size (h, w) plus its residual."""
+    lh, lw = size
+    up = np.asarray(prev.resize((lw, lh), Image.BICUBIC), dtype=np.int16)
+    level = np.clip(up + residual.reshape(lh, lw, 3), 0, 255).astype(np.uint8)
+    return Image.fromarray(level, "RGB")
+
+
+def _pyramid_residuals(
+    img_pil: Image.Image, coarse_img: Image.Image, sizes: list[tuple[int, int]]
+) -> list[np.ndarray]:
+    """Flat int16 residual of every level, coarse to fine."""
+    residuals = []
+    prev = coarse_img
+    for i, (lh, lw) in enumerate(sizes):
+        last = i == len(sizes) - 1
+        level = img_pil if last else img_pil.resize((lw, lh), Image.BICUBIC)
+        up = np.asarray(prev.resize((lw, lh), Image.BICUBIC), dtype=np.int16)
+        residuals.append((np.asarray(level, dtype=np.int16) - up).reshape(-1))
+        prev = level
+    return residuals
+
+
+def _pyramid_slicer(residuals: list[np.ndarray], sizes, block_count: int):
+    """
+    block_id -> (residual slice, extra header ext fields) for a pyramid.
+
+    EXT_ENERGY is scaled by the upsampling area of the level, so that it
+    reflects how much of the output a slice affects.
+    """
+    spans = _layer_spans(residuals, block_count, "pyramid")
+    table = struct.pack(">B", len(sizes))
+    for (lh, lw), (first, count) in zip(sizes, spans):
+        table += struct.pack(">IIII", lh, lw, first, count)
+    steps = [_golden_step(r.size) for r in residuals]
+    h, w = sizes[-1]
+
+    def level_slice(block_id: int):
+        level = max(i for i, (first, _c) in enumerate(spans) if first <= block_id)
+        first, count = spans[level]
+        res = residuals[level]
+        idx = _golden_block_indices(
+            res.size, block_id - first, count, step=steps[level]
+        )
+        vals = res[idx]
+        lh, lw = sizes[level]
+        area = float(h * w) / float(lh * lw)
+        ext = {EXT_LEVEL: struct.pack(">B", level + 1) + table}
+        ext.update(_energy_ext(_sum_sq(vals) * area, vals.size))
+        return vals, ext
+
+    return level_slice
+
+
+def _level_fields(info: dict, path: str) -> tuple[int, list] | None:
+    """
+    (level, [(height, width, first block, block count) per level]) of a
+    pyramid chunk, None for a single-level one. Levels count from 1.
+    """
+    value = info["ext"].get(EXT_LEVEL)
+    if value is None:
+        return None
+    if len(value) < 2 or len(value) != 2 + 16 * value[1]:
+        raise ValueError(f"Invalid pyramid level field in {path}")
+    level, count = value[0], value[1]
+    table = [struct.unpack_from(">IIII", value, 2 + 16 * i) for i in range(count)]
+    next_block = 0
+    for lh, lw, first, n_blocks in table:
+        if first != next_block or n_blocks < 1 or lh < 1 or lw < 1:
+            raise ValueError(f"Invalid pyramid level field in {path}")
+        next_block += n_blocks
+    if (
+        not 1 <= level <= count
+        or next_block != info["block_count"]
+        or table[-1][:2] != (info["h"], info["w"])
+    ):
+        raise ValueError(f"Invalid pyramid level field in {path}")
+    first, n_blocks = table[level - 1][2:]
+    if not first <= info["block_id"] < first + n_blocks:
+        raise ValueError(f"Invalid pyramid level field in {path}")
+    return level, table
+
+
+# Inpainting (decoders' inpaint=True): residual samples of missing chunks are
+# estimated from the known ones around them instead of counting as zero. The
+# golden permutation leaves the known samples evenly spread, so a normalized
+# 3x3 box filter (sum of known values / number of known values) fills most
+# of them; where a 3x3 window has no known sample, the same estimate from a
+# 2x coarser grid of sums is used, recursively (pull-push).
+
+
+def _box3(a: np.ndarray, dtype) -> np.ndarray:
+    """3x3 box sum over the first two axes, zero outside, computed in dtype."""
+    rows = a.astype(dtype)
+    rows[1:] += a[:-1]
+    rows[:-1] += a[1:]
+    out = rows.copy()
+    out[:, 1:] += rows[:, :-1]
+    out[:, :-1] += rows[:, 1:]
+    return out
+
+
+def _halve(a: np.ndarray) -> np.ndarray:
+    """2x2 sums over the first two axes (odd sizes padded with zeros) as float32."""
+    h, w = a.shape[:2]
+    if h % 2 or w % 2:
+        a = np.pad(a, ((0, h % 2), (0, w % 2)) + ((0, 0),) * (a.ndim - 2))
+        h, w = a.shape[:2]
+    rows = a.reshape(h // 2, 2, *a.shape[1:])
+    rows = rows[:, 0] + rows[:, 1]
+    rows = rows.reshape(h // 2, w // 2, 2, *a.shape[2:])
+    return (rows[:, :, 0] + rows[:, :, 1]).astype(np.float32)
+
+
+def _fill_holes(est: np.ndarray, holes: np.ndarray, coarse: np.ndarray) -> None:
+    """Add to est (zero where holes) the 2x2-cell value of coarse at the holes."""
+    up = np.repeat(np.repeat(coarse, 2, axis=1), 2, axis=0)
+    up = up[: est.shape[0], : est.shape[1]]
+    up *= holes
+    est += up
+
+
+def _fill_estimate(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """Normalized 3x3 estimate (float32) of num / den, holes filled from coarser."""
+    n, d = _box3(num, np.float32), _box3(den, np.float32)
+    holes = d == 0
+    n /= np.maximum(d, 1)
+    if max(n.shape[:2]) > 1 and holes.any():
+        _fill_holes(n, holes, _fill_estimate(_halve(num), _halve(den)))
+    return n
+
+
+def _inpaint_residual(
+    residual: np.ndarray, known: np.ndarray, workers: int | None = 1
+) -> np.ndarray:
+    """
+    Residual (h, w, c) int16 with every sample where known is False replaced
+    by an estimate from the known samples of the same channel around it.
+    workers > 1 handles the channels on a thread pool, unless there is only
+    one CPU: the NumPy passes are memory-bound, so threads then only add
+    overhead.
+    """
+    if known.all() or not known.any():
+        return residual
+    parallel = _resolve_workers(workers) > 1 and (os.cpu_count() or 1) > 1
+    if residual.ndim == 3 and parallel:
+        planes = _run_parallel(
+            lambda ch: _inpaint_residual(residual[..., ch], known[..., ch]),
+            range(residual.shape[2]),
+            workers,
+        )
+        return np.stack(planes, axis=2)
+    num = residual * known
+    den = known.view(np.uint8)
+    n0 = _box3(num, np.int16)  # |values| <= 510, so 9 of them fit in int16
+    d0 = _box3(den, np.uint8)
+    est = n0.astype(np.float32)
+    est /= np.maximum(d0, 1)
+    holes = d0 == 0
+    if max(residual.shape[:2]) > 1 and holes.any():
+        _fill_holes(est, holes, _fill_estimate(_halve(num), _halve(den)))
+    np.rint(est, out=est)
+    out = est.astype(np.int16)
+    out *= ~known
+    out += num
+    return out
+
+
+def _pack_image_chunk(
+    h: int,
+    w: int,
+    c: int,
+    block_count: int,
+    block_id: int,
+    coarse_bytes: bytes,
+    comp_vals: bytes,
+    codec_id: int = CODEC_ZLIB,
+    ext: dict[int, bytes] | None = None,
+) -> bytes:
+    header = bytearray()
+    header += MAGIC_IMG
+    header += struct.pack("B", VERSION_IMG)
+    header += struct.pack(">I", h)
+    header += struct.pack(">I", w)
+    header += struct.pack("B", c)
+    header += struct.pack(">I", block_count)
+    header += struct.pack(">I", block_id)
+    header += struct.pack(">I", len(coarse_bytes))
+    header += struct.pack(">I", len(comp_vals))
+    header += _pack_v3_fields(codec_id, ext)
+    return bytes(header) + coarse_bytes + comp_vals
+
+
+def _encode_image_chunks(
+    img: np.ndarray,
+    out_path: str | None,
+    block_count: int = 32,
+    coarse_max_side: int = 64,
+    target_chunk_kb: int | None = None,
+    compression: str = "default",
+    workers: int | None = 1,
+    residual_transform: str = "raw",
+    coarse_copies: int = 0,
+    tier_bits: int = 0,
+    pyramid: bool = False,
+) -> _ChunkSink:
+    """Encode an RGB array into out_path (None: memory); see encode_image_holo_dir."""
+    _check_tier_bits(tier_bits)
+    if pyramid and tier_bits:
+        raise ValueError("pyramid and tier_bits cannot be combined")
+    if (tier_bits or pyramid) and compression == "default":
+        compression = _TIERED_DEFAULT_COMPRESSION
+    codec_id, level = _resolve_compression(compression)
+    _check_transform(residual_transform)
+
+    h, w, c = img.shape
+
+    img_pil = Image.fromarray(img, "RGB")
+    coarse_img, coarse_bytes = _coarse_thumbnail(img_pil, coarse_max_side)
+    chunk_coarse, content_id = _coarse_layout(coarse_bytes, coarse_copies)
+
+    if pyramid:
+        sizes = _pyramid_sizes(h, w, coarse_max_side)
+        residuals = _pyramid_residuals(img_pil, coarse_img, sizes)
+    else:
+        coarse_up = coarse_img.resize((w, h), Image.BICUBIC)
+        coarse_up_arr = np.asarray(coarse_up, dtype=np.uint8)
+
+        residual = img.astype(np.int16) - coarse_up_arr.astype(np.int16)
+        residuals = [residual.reshape(-1)]
+    n_values = sum(r.size for r in residuals)
+
+    block_count = _block_count_for_target(
+        block_count,
+        target_chunk_kb,
+        residual_bytes_total=n_values * 2,  # int16 -> 2 bytes
+        overhead_bytes=len(chunk_coarse),
+        max_blocks=n_values,
+    )
+
+    if pyramid:
+        residual_slice = _pyramid_slicer(residuals, sizes, block_count)
+    else:
+        residual_slice = _residual_slicer(residuals[0], block_count, tier_bits)
+    sink = _ChunkSink(out_path)
+
+    def write_block(block_id: int) -> None:
+        vals, tier_ext = residual_slice(block_id)
+        comp_vals, ext = _encode_residual(vals, residual_transform, codec_id, level)
+        ext.update(tier_ext)
+        data = _pack_image_chunk(
+            h,
+            w,
+            c,
+            block_count,
+            block_id,
+            chunk_coarse,
+            comp_vals,
+            codec_id,
+            _residual_ext(ext, content_id),
+        )
+        sink.write(coarse_copies + block_id, data)
+
+    _run_parallel(write_block, range(block_count), workers)
+    for i in range(coarse_copies):
+        copy_ext = _coarse_copy_ext(content_id, i)
+        data = _pack_image_chunk(
+            h, w, c, block_count, i, coarse_bytes, b"", codec_id, copy_ext
+        )
+        sink.write(i, data)
+    sink.close()
+    return sink
+
+
+def encode_image(
+    img: np.ndarray,
+    block_count: int = 32,
+    coarse_max_side: int = 64,
+    target_chunk_kb: int | None = None,
+    compression: str = "default",
+    workers: int | None = 1,
+    residual_transform: str = "raw",
+    coarse_copies: int = 0,
+    tier_bits: int = 0,
+    pyramid: bool = False,
+) -> list[bytes]:
+    """
+    Encode an RGB uint8 array of shape (h, w, 3) into chunks held in memory.
+
+    Returns the chunk payloads in chunk order, byte-identical to the files
+    that encode_image_holo_dir writes; the options are the same.
+    """
+    img = np.asarray(img)
+    if img.ndim != 3 or img.shape[2] != 3 or img.dtype != np.uint8:
+        raise ValueError("Expected an RGB uint8 array of shape (h, w, 3)")
+    sink = _encode_image_chunks(
+        np.ascontiguousarray(img),
+        None,
+        block_count=block_count,
+        coarse_max_side=coarse_max_side,
+        target_chunk_kb=target_chunk_kb,
+        compression=compression,
+        workers=workers,
+        residual_transform=residual_transform,
+        coarse_copies=coarse_copies,
+        tier_bits=tier_bits,
+        pyramid=pyramid,
+    )
+    return sink.chunk_list()
+
+
 def encode_image_holo_dir(
     input_path: str,
     out_dir: str,
     block_count: int = 32,
     coarse_max_side: int = 64,
     target_chunk_kb: int | None = None,
+    compression: str = "default",
+    workers: int | None = 1,
+    residual_transform: str = "raw",
+    coarse_copies: int = 0,
+    tier_bits: int = 0,
+    pyramid: bool = False,
 ) -> None:
     """
     Encode an image into a holographic directory of chunks.
@@ -144,81 +1627,549 @@ def encode_image_holo_dir(
     of the residual (detail) information. In v2 the residual slice
     is chosen via a golden-ratio permutation to maximize
     informational spread across chunks.
+
+    compression picks the residual codec: a COMPRESSION_PRESETS name
+    ("default" = zlib 9, "fast" = zlib 1, "archive" = lzma) or
+    "codec[:level]" with codec one of zlib, lzma, bz2 and, when the
+    zstandard package is installed, zstd.
+
+    residual_transform="planes" stores each residual slice zigzag-mapped
+    and split into a low-byte and a high-byte plane (only the low plane
+    when the slice fits in int8), which usually compresses much better
+    than interleaved int16. The layout is recorded per chunk header.
+
+    coarse_copies > 0 leaves the thumbnail out of the residual chunks,
+    which then carry only its content id, and writes it instead into that
+    many dedicated coarse chunks (numbered first). Decoding needs any one
+    of them; chunk size targets then budget for the residual alone.
+
+    tier_bits > 0 orders the residual by significance: the first blocks
+    carry every value divided by 2**tier_bits (toward zero) and the later
+    blocks the remainders, each tier golden-spread over its own blocks.
+    The first chunks then give a coarsely quantized residual of the whole
+    image, which beats a full-precision sparse one at low chunk counts.
+    Needs at least 2 blocks. With tiers, compression="default" means the
+    "balanced" preset (zlib 6): zlib 9 is several times slower on tiered
+    residuals for about 3% less output. residual_transform="planes" suits
+    tiers well, as both are mostly small values.
+
+    pyramid=True adds intermediate levels between the thumbnail and the
+    full resolution (longest side coarse_max_side * 4, * 16, ...). Each
+    level stores its difference from the upsampled level below, with its
+    own blocks, coarsest first. The first chunks then complete the small
+    levels, which costs fewer bytes than a sparse full-resolution residual
+    for the same quality, and decode_image(pyramid_level=...) can stop at
+    an intermediate resolution. Not combinable with tier_bits. As with
+    tiers, compression="default" means the "balanced" preset here.
+
+    workers > 1 compresses and writes blocks on a thread pool
+    (workers <= 0 uses one thread per CPU); the output is identical
+    to the serial path.
     """
-    img = load_image(input_path)
-    h, w, c = img.shape
+    _encode_image_chunks(
+        load_image(input_path),
+        out_dir,
+        block_count=block_count,
+        coarse_max_side=coarse_max_side,
+        target_chunk_kb=target_chunk_kb,
+        compression=compression,
+        workers=workers,
+        residual_transform=residual_transform,
+        coarse_copies=coarse_copies,
+        tier_bits=tier_bits,
+        pyramid=pyramid,
+    )
+
+
+# Bytes per pixel of the raw row layouts _RawImageRows reads directly.
+_RAW_ROW_BYTES = {"L": 1, "RGB": 3, "BGR": 3, "RGBA": 4, "RGBX": 4, "BGRA": 4, "BGRX": 4}
+
+# Working set per sample of one row band: the raw rows, Pillow's 4-byte
+# pixels for the unpack and the RGB conversion, and the uint8 RGB array.
+_BAND_BYTES_PER_SAMPLE = 8
+
+
+class _RawImageRows:
+    """
+    Row-band reader for images stored as uncompressed rows (binary PPM/PGM,
+    uncompressed BMP and TIFF).
 
-    max_side = max(h, w)
-    scale = min(1.0, float(coarse_max_side) / float(max_side))
-    cw = max(1, int(round(w * scale)))
-    ch = max(1, int(round(h * scale)))
+    Pillow only parses the header; rows(y0, y1) reads just those rows from
+    the file and converts them to RGB, so the image is never decoded in
+    full. open() returns None for any other layout (PNG, JPEG, palette
+    images, ...), which must be decoded whole.
+    """
 
-    img_pil = Image.fromarray(img, "RGB")
-    coarse_img = img_pil.resize((cw, ch), Image.BICUBIC)
+    def __init__(self, path: str, mode: str, size: tuple[int, int], spans: list) -> None:
+        self.path = path
+        self.mode = mode
+        self.w, self.h = size
+        self.spans = spans  # (y0, y1, offset, rawmode, stride, orientation)
+        self._f = open(path, "rb")
+
+    @classmethod
+    def open(cls, path: str) -> "_RawImageRows | None":
+        # Nothing larger than a row band is ever held, so Pillow's
+        # decompression-bomb limit (which guards full decodes) is lifted
+        # while the header is parsed.
+        limit = Image.MAX_IMAGE_PIXELS
+        Image.MAX_IMAGE_PIXELS = None
+        try:
+            img = Image.open(path)
+        finally:
+            Image.MAX_IMAGE_PIXELS = limit
+        with img:
+            w, h = img.size
+            mode = img.mode
+            tiles = list(img.tile)
+        if mode not in ("L", "RGB", "RGBA", "RGBX") or not tiles:
+            return None
+
+        spans = []
+        for name, extents, offset, args in tiles:
+            if isinstance(args, str):
+                args = (args,)
+            rawmode = args[0]
+            stride = args[1] if len(args) > 1 else 0
+            orientation = args[2] if len(args) > 2 else 1
+            x0, y0, x1, y1 = extents
+            if (
+                name != "raw"
+                or rawmode not in _RAW_ROW_BYTES
+                or orientation not in (1, -1)
+                or (x0, x1) != (0, w)
+            ):
+                return None
+            stride = stride or w * _RAW_ROW_BYTES[rawmode]
+            spans.append((y0, y1, offset, rawmode, stride, orientation))
+        spans.sort()
+        if spans[0][0] != 0 or spans[-1][1] != h or any(
+            a[1] != b[0] for a, b in zip(spans, spans[1:])
+        ):
+            return None
+        return cls(path, mode, (w, h), spans)
+
+    def rows(self, y0: int, y1: int) -> np.ndarray:
+        """Rows y0..y1-1 as an RGB uint8 array of shape (y1 - y0, w, 3)."""
+        parts = []
+        for t0, t1, offset, rawmode, stride, orientation in self.spans:
+            a, b = max(y0, t0), min(y1, t1)
+            if a >= b:
+                continue
+            if orientation == 1:
+                first = a - t0
+            else:  # bottom-up: rows b-1..a are contiguous
+                first = t1 - b
+            self._f.seek(offset + first * stride)
+            raw = self._f.read((b - a) * stride)
+            if len(raw) != (b - a) * stride:
+                raise ValueError(f"Truncated image data in {self.path}")
+            band = Image.frombuffer(
+                self.mode, (self.w, b - a), raw, "raw", rawmode, stride, orientation
+            )
+            parts.append(np.asarray(band.convert("RGB"), dtype=np.uint8))
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
 
-    buf = BytesIO()
-    coarse_img.save(buf, format="PNG")
-    coarse_bytes = buf.getvalue()
+    def close(self) -> None:
+        self._f.close()
 
-    coarse_up = coarse_img.resize((w, h), Image.BICUBIC)
-    coarse_up_arr = np.asarray(coarse_up, dtype=np.uint8)
 
-    residual = img.astype(np.int16) - coarse_up_arr.astype(np.int16)
-    residual_flat = residual.reshape(-1)
+class _StripSpool:
+    """
+    Image rows regrouped into column strips through a scratch file.
 
-    if target_chunk_kb is not None:
-        residual_bytes_total = residual_flat.size * 2  # int16 -> 2 bytes
+    add_band() takes row bands top to bottom and appends each one as its
+    strip tiles, left to right; strip() then reads a full-height column
+    strip back with one read per band. This turns a row-by-row source into
+    the column strips the streaming image encoder works on.
+    """
+
+    def __init__(self, work_dir: str, h: int, w: int, strip_w: int) -> None:
+        self.h, self.w, self.strip_w = h, w, strip_w
+        self.bands = []  # (y0, y1, file offset)
+        fd, self.path = tempfile.mkstemp(prefix=".strips_", dir=work_dir)
+        self._f = os.fdopen(fd, "w+b")
+        self._end = 0
+
+    def add_band(self, y0: int, band: np.ndarray) -> None:
+        n = band.shape[0]
+        self.bands.append((y0, y0 + n, self._end))
+        self._f.seek(self._end)
+        for x0 in range(0, self.w, self.strip_w):
+            self._f.write(np.ascontiguousarray(band[:, x0: x0 + self.strip_w]))
+        self._end += band.nbytes
+
+    def strip(self, x0: int, x1: int) -> np.ndarray:
+        """Columns x0..x1-1 (x0 on the strip grid) as a (h, x1 - x0, 3) array."""
+        out = np.empty((self.h, x1 - x0, 3), dtype=np.uint8)
+        for y0, y1, offset in self.bands:
+            self._f.seek(offset + (y1 - y0) * x0 * 3)
+            self._f.readinto(memoryview(out[y0:y1]).cast("B"))
+        return out
+
+    def close(self) -> None:
+        self._f.close()
         try:
-            target_bytes = max(1, int(target_chunk_kb) * 1024)
-        except ValueError:
-            target_bytes = None
+            os.remove(self.path)
+        except OSError:
+            pass
 
-        if target_bytes is not None:
-            header_overhead = 64  # header + margin
-            overhead_approx = len(coarse_bytes) + header_overhead
-            if target_bytes <= overhead_approx + 1:
-                block_count = 1
+
+def encode_image_holo_dir_streaming(
+    input_path: str,
+    out_dir: str,
+    block_count: int = 32,
+    coarse_max_side: int = 64,
+    target_chunk_kb: int | None = None,
+    memory_budget_mb: int = 256,
+    compression: str = "default",
+    workers: int | None = 1,
+    residual_transform: str = "raw",
+    coarse_copies: int = 0,
+) -> None:
+    """
+    Encode an image like encode_image_holo_dir within memory_budget_mb.
+
+    The coarse upsample and the residual are produced one column strip at a
+    time, with strips sized to fit memory_budget_mb, and scattered straight
+    into per-block buffers in a disk-backed spill file next to the chunks.
+    Blocks are then compressed from the spill piece by piece. The chunks
+    are byte-identical to encode_image_holo_dir.
+
+    Strips are vertical because Pillow's BICUBIC upsample is separable
+    (horizontal pass, then vertical): running the vertical pass on a column
+    strip reproduces the full-size coarse_up exactly, which row bands with
+    a resize box do not.
+
+    Sources stored as uncompressed rows (binary PPM/PGM, uncompressed BMP
+    and TIFF) are never decoded in full: they are read in row bands, which
+    build the thumbnail by the same separable passes and are regrouped into
+    column strips through a scratch file. Pillow's pixel limit does not
+    apply to them. Other formats (PNG, JPEG, ...) cannot be read by rows;
+    they are decoded whole first, and the budget then excludes the source.
+
+    The budget bounds the working set in memory. The spill (two bytes per
+    sample) is memory-mapped, so the pages touched by the scatter also show
+    up in RSS, as file-backed page cache the kernel can write back and drop.
+    """
+    codec_id, level = _resolve_compression(compression)
+    _check_transform(residual_transform)
+
+    raw = _RawImageRows.open(input_path)
+    if raw is None:
+        print(
+            f"[Holo] Note: {input_path} is not stored as raw rows; "
+            "decoding it in full (outside the memory budget)"
+        )
+        img_pil = Image.open(input_path).convert("RGB")
+        w, h = img_pil.size
+    else:
+        w, h = raw.w, raw.h
+    c = 3
+
+    N = h * w * c
+    budget = max(1, int(memory_budget_mb)) * 1024 * 1024
+    strip_w = max(1, min(w, budget // (h * c * _STREAM_BYTES_PER_SAMPLE)))
+    n_workers = _resolve_workers(workers)
+    piece_len = max(1 << 16, budget // (4 * n_workers * 2))
+
+    sink = None
+    spool = None
+    spill = None
+    try:
+        if raw is None:
+            coarse_img, coarse_bytes = _coarse_thumbnail(img_pil, coarse_max_side)
+        else:
+            # Work files go next to the chunks, so the sink exists early.
+            sink = _ChunkSink(out_dir)
+            spool = _StripSpool(sink.work_dir, h, w, strip_w)
+            scale = min(1.0, float(coarse_max_side) / float(max(h, w)))
+            cw = max(1, int(round(w * scale)))
+            band_h = max(1, min(h, budget // (w * c * _BAND_BYTES_PER_SAMPLE)))
+            narrow = np.empty((h, cw, c), dtype=np.uint8)
+            for y0 in range(0, h, band_h):
+                band = raw.rows(y0, min(h, y0 + band_h))
+                # horizontal thumbnail pass per band, vertical pass below
+                narrow[y0: y0 + band.shape[0]] = np.asarray(
+                    Image.fromarray(band, "RGB").resize(
+                        (cw, band.shape[0]), Image.BICUBIC
+                    )
+                )
+                spool.add_band(y0, band)
+            coarse_img, coarse_bytes = _coarse_thumbnail(
+                Image.fromarray(narrow, "RGB"), coarse_max_side, size=(w, h)
+            )
+            del narrow
+
+        chunk_coarse, content_id = _coarse_layout(coarse_bytes, coarse_copies)
+        ch = coarse_img.height
+        block_count = _block_count_for_target(
+            block_count,
+            target_chunk_kb,
+            residual_bytes_total=N * 2,
+            overhead_bytes=len(chunk_coarse),
+            max_blocks=N,
+        )
+        if sink is None:
+            sink = _ChunkSink(out_dir)
+
+        # Horizontal pass once at coarse height; the vertical pass runs per strip.
+        coarse_wide = coarse_img.resize((w, ch), Image.BICUBIC)
+        rows = np.arange(h, dtype=np.int64)[:, None] * w
+        chans = np.arange(c, dtype=np.int64)
+
+        spill = _BlockSpill(sink.work_dir, N, block_count, "<i2")
+        for x0 in range(0, w, strip_w):
+            x1 = min(w, x0 + strip_w)
+            if spool is None:
+                src = np.asarray(img_pil.crop((x0, 0, x1, h)), dtype=np.int16)
             else:
-                useful_per_chunk = target_bytes - overhead_approx
-                block_count = int(np.ceil(residual_bytes_total / useful_per_chunk))
-                block_count = max(1, min(block_count, residual_flat.size))
+                src = spool.strip(x0, x1).astype(np.int16)
+            up = coarse_wide.crop((x0, 0, x1, ch)).resize((x1 - x0, h), Image.BICUBIC)
+            resid = src - np.asarray(up, dtype=np.int16)
+
+            cols = np.arange(x0, x1, dtype=np.int64)[None, :]
+            positions = ((rows + cols) * c)[:, :, None] + chans
+            spill.scatter(positions.reshape(-1), resid.reshape(-1))
+        if spool is not None:
+            spool.close()
+            spool = None
+
+        def write_block(block_id: int) -> None:
+            comp_vals, ext = _encode_residual_pieces(
+                lambda: spill.block_pieces(block_id, piece_len),
+                residual_transform,
+                codec_id,
+                level,
+            )
+            data = _pack_image_chunk(
+                h,
+                w,
+                c,
+                block_count,
+                block_id,
+                chunk_coarse,
+                comp_vals,
+                codec_id,
+                _residual_ext(ext, content_id),
+            )
+            sink.write(coarse_copies + block_id, data)
 
-    os.makedirs(out_dir, exist_ok=True)
+        _run_parallel(write_block, range(block_count), workers)
+        for i in range(coarse_copies):
+            copy_ext = _coarse_copy_ext(content_id, i)
+            data = _pack_image_chunk(
+                h, w, c, block_count, i, coarse_bytes, b"", codec_id, copy_ext
+            )
+            sink.write(i, data)
+        sink.close()
+    finally:
+        if raw is not None:
+            raw.close()
+        if spool is not None:
+            spool.close()
+        if spill is not None:
+            spill.close()
+
+
+def _parse_image_chunk(data: bytes, path: str) -> dict | None:
+    """
+    Parse an image chunk.
 
+    Returns None when the magic does not match (not an image chunk), else a
+    dict with the header fields plus the raw 'coarse' and 'resid' payloads
+    ('coarse_off' is where the coarse payload starts in data).
+    """
+    if data[:4] != MAGIC_IMG:
+        return None
+    version = data[4]
+    if version not in (1, 2, VERSION_IMG):
+        raise ValueError(f"Unsupported image chunk version {version} in {path}")
+
+    h, w, c, block_count, block_id, coarse_len, resid_len = struct.unpack_from(
+        ">IIBIIII", data, 5
+    )
+    off = 5 + 25
+    codec_id, ext = CODEC_ZLIB, {}
+    if version >= 3:
+        codec_id, ext, off = _parse_v3_fields(data, off)
+    coarse_off = off
+    coarse = data[off: off + coarse_len]
+    off += coarse_len
+    resid = data[off: off + resid_len]
+    return {
+        "version": version,
+        "h": h,
+        "w": w,
+        "c": c,
+        "block_count": block_count,
+        "block_id": block_id,
+        "coarse": coarse,
+        "coarse_off": coarse_off,
+        "resid": resid,
+        "codec": codec_id,
+        "ext": ext,
+    }
+
+
+def _decode_image_chunks(
+    chunk_files: list[str],
+    read_chunk,
+    source: str,
+    workers: int | None = 1,
+    pyramid_level: int | None = None,
+    inpaint: bool = False,
+) -> np.ndarray:
+    """Decode chunks (names + reader) to an RGB array; source labels messages."""
+    if pyramid_level is not None and pyramid_level < 0:
+        raise ValueError(f"pyramid_level must be >= 0, got {pyramid_level}")
+    first = None
+    for path in chunk_files:
+        first = _parse_image_chunk(read_chunk(path), path)
+        if first is not None:
+            break
+    if first is None:
+        raise ValueError(f"No image chunk found in {source}")
+
+    h, w, c = first["h"], first["w"], first["c"]
+    block_count = first["block_count"]
+    version_used = first["version"]
+
+    coarse_img = None
+    coarse_payload = _find_coarse(first, chunk_files, read_chunk, _parse_image_chunk)
+    if coarse_payload is not None:
+        coarse_img = Image.open(BytesIO(coarse_payload)).convert("RGB")
+    if pyramid_level == 0:
+        if coarse_img is None:
+            raise ValueError(f"No coarse chunk survived in {source}")
+        return np.asarray(coarse_img, dtype=np.uint8)
+    if coarse_img is None:
+        print(f"[Holo] Warning: no coarse chunk survived in {source}, residual only")
+
+    resid_info = _first_residual(chunk_files, read_chunk, _parse_image_chunk)
+    tier = _tier_fields(resid_info, source) if resid_info else None
+    pyramid = _level_fields(resid_info, source) if resid_info else None
+    table = pyramid[1] if pyramid else [(h, w, 0, block_count)]
+    if pyramid_level is not None:
+        table = table[:pyramid_level]
+    sizes = [(lh, lw) for lh, lw, _first, _count in table]
+    levels = [np.zeros(lh * lw * c, dtype=np.int16) for lh, lw in sizes]
+    steps = [_golden_step(level.size) for level in levels]
+    residual_flat = levels[-1]
     N = residual_flat.size
-    perm = _golden_permutation(N) if block_count > 1 else None
-
-    for block_id in range(block_count):
-        if block_count > 1:
-            idx = perm[block_id::block_count]
-            vals = residual_flat[idx]
+    step = steps[-1]
+    tiered = _TieredResidual(N, tier[1]) if tier else None
+    known = [np.zeros(level.size, dtype=bool) for level in levels] if inpaint else None
+
+    def scatter_chunk(path: str) -> None:
+        info = _parse_image_chunk(read_chunk(path), path)
+        if info is None:
+            return
+        if (info["h"], info["w"], info["c"], info["block_count"]) != (
+            h,
+            w,
+            c,
+            block_count,
+        ):
+            raise ValueError(f"Inconsistent image chunk: {path}")
+        if info["version"] != version_used:
+            raise ValueError(f"Mixed image chunk versions in {source}")
+        if _is_coarse_copy(info):
+            return
+        fields = _level_fields(info, path)
+        if (fields is None) != (pyramid is None):
+            raise ValueError(f"Mixed pyramid and single-level chunks in {source}")
+        if fields is not None and fields[1] != pyramid[1]:
+            raise ValueError(f"Inconsistent pyramid levels: {path}")
+        if fields is not None and fields[0] > len(levels):
+            return  # finer than the requested level
+
+        block_id = info["block_id"]
+        layout = _transform_layout(info["ext"], path)
+        vals = _decode_residual(_decompress(info["resid"], info["codec"]), layout)
+
+        # Different blocks never share a residual index, so concurrent
+        # scatters from the pool need no locking.
+        if fields is not None:
+            level = fields[0] - 1
+            out = levels[level]
+            _lh, _lw, first, count = table[level]
+            idx = _golden_block_indices(
+                out.size, block_id - first, count, stop=len(vals), step=steps[level]
+            )
+            out[idx] = vals[: len(idx)]
+        elif tiered is not None:
+            idx = tiered.add(info, vals, path)
+            level = -1
+        elif EXT_TIER in info["ext"]:
+            raise ValueError(f"Mixed residual tiers in {source}")
+        elif version_used == 1 or block_count == 1:
+            # legacy v1 layout: simple modular stride
+            idx = np.arange(block_id, N, block_count, dtype=np.int64)[: len(vals)]
+            residual_flat[idx] = vals[: len(idx)]
+            level = -1
         else:
-            vals = residual_flat
+            # v2: golden permutation layout
+            idx = _golden_block_indices(
+                N, block_id, block_count, stop=len(vals), step=step
+            )
+            residual_flat[idx] = vals[: len(idx)]
+            level = -1
+        if known is not None:
+            known[level][idx] = True
+
+    _run_parallel(scatter_chunk, chunk_files, workers)
+    if tiered is not None:
+        levels[-1] = tiered.values()
+    if known is not None:
+        # The finest level of a pyramid only holds detail the box estimate
+        # cannot predict; filling it measurably lowers PSNR, so it stays zero.
+        if pyramid is not None and len(sizes) == len(pyramid[1]):
+            known[-1] = None
+        levels = [
+            level
+            if mask is None
+            else _inpaint_residual(
+                level.reshape(lh, lw, c), mask.reshape(lh, lw, c), workers
+            )
+            for level, mask, (lh, lw) in zip(levels, known, sizes)
+        ]
 
-        vals_bytes = vals.astype("<i2").tobytes()
-        comp_vals = zlib.compress(vals_bytes, level=9)
+    lh, lw = sizes[-1]
+    residual = levels[-1].reshape(lh, lw, c)
+    recon_int = _pyramid_predict(coarse_img, sizes, levels[:-1]) + residual
+    recon_int = np.clip(recon_int, 0, 255)
+    return recon_int.astype(np.uint8)
 
-        header = bytearray()
-        header += MAGIC_IMG
-        header += struct.pack("B", VERSION_IMG)
-        header += struct.pack(">I", h)
-        header += struct.pack(">I", w)
-        header += struct.pack("B", c)
-        header += struct.pack(">I", block_count)
-        header += struct.pack(">I", block_id)
-        header += struct.pack(">I", len(coarse_bytes))
-        header += struct.pack(">I", len(comp_vals))
 
-        data = bytes(header) + coarse_bytes + comp_vals
-        fname = os.path.join(out_dir, f"chunk_{block_id:04d}.holo")
-        with open(fname, "wb") as f:
-            f.write(data)
+def decode_image(
+    chunks,
+    max_chunks: int | None = None,
+    workers: int | None = 1,
+    pyramid_level: int | None = None,
+    inpaint: bool = False,
+) -> np.ndarray:
+    """
+    Decode an image from chunk payloads held in memory (any iterable of
+    bytes, e.g. the list from encode_image or chunks off the network).
+
+    Returns the RGB uint8 array; missing chunks degrade it gracefully.
+    max_chunks, workers, pyramid_level and inpaint are as in
+    decode_image_holo_dir.
+    """
+    chunk_files, read_chunk = _memory_reader(chunks, max_chunks)
+    return _decode_image_chunks(
+        chunk_files, read_chunk, "chunk list", workers, pyramid_level, inpaint
+    )
 
 
 def decode_image_holo_dir(
     in_dir: str,
     output_path: str,
     max_chunks: int | None = None,
+    workers: int | None = 1,
+    pyramid_level: int | None = None,
+    inpaint: bool = False,
 ) -> None:
     """
     Decode an image from a holographic directory of chunks.
@@ -226,113 +2177,250 @@ def decode_image_holo_dir(
     If max_chunks is provided, only the first max_chunks chunks are used,
     producing a more degraded but still globally coherent reconstruction.
 
-    Supports both v1 (modular stride) and v2 (golden permutation) layouts.
+    workers > 1 reads, decompresses and scatters chunks on a thread pool.
+
+    pyramid_level stops at that level of a pyramid encoding (0 is the
+    thumbnail) and writes it at its own, smaller size; chunks of finer
+    levels are not decompressed. Images encoded without pyramid have the
+    thumbnail and level 1, the full image.
+
+    inpaint=True estimates the residual samples of missing chunks from the
+    received ones around them (normalized box filtering, coarser where
+    needed) instead of leaving them at zero, which turns the scattered
+    sharp pixels of a partial decode into a smooth image. It has no effect
+    when all chunks are present.
+
+    in_dir may also be a .holopack file.
+
+    Supports v1 (modular stride) and v2/v3 (golden permutation) layouts.
     """
-    chunk_files = sorted(glob.glob(os.path.join(in_dir, "chunk_*.holo")))
-    if not chunk_files:
-        raise FileNotFoundError(f"No chunk_*.holo found in {in_dir}")
+    chunk_files, read_chunk = _chunk_reader(in_dir, max_chunks)
+    recon = _decode_image_chunks(
+        chunk_files, read_chunk, in_dir, workers, pyramid_level, inpaint
+    )
+    save_image(recon, output_path)
 
-    if max_chunks is not None:
-        chunk_files = chunk_files[:max_chunks]
 
-    first = True
-    h = w = c = block_count = None
-    coarse_up_arr = None
-    residual_flat = None
-    perm = None
-    version_used = None
+def _region_grid(box, scale: float, h: int, w: int) -> tuple[tuple, int, int]:
+    """Validated (left, top, right, bottom) box and the output height, width."""
+    if not 0.0 < scale <= 1.0:
+        raise ValueError(f"scale must be in (0, 1], got {scale}")
+    left, top, right, bottom = (0, 0, w, h) if box is None else map(int, box)
+    if not (0 <= left < right <= w and 0 <= top < bottom <= h):
+        raise ValueError(f"box {box} is not inside the {w}x{h} image")
+    out_h = max(1, int(round((bottom - top) * scale)))
+    out_w = max(1, int(round((right - left) * scale)))
+    return (left, top, right, bottom), out_h, out_w
 
+
+def _region_samples(out_len: int, lo: int, hi: int, full: int, n: int) -> np.ndarray:
+    """
+    Nearest pixel, on an axis of n pixels, to the center of each of out_len
+    output pixels spanning lo..hi of the same axis at full resolution.
+    """
+    centers = lo + (np.arange(out_len) + 0.5) * ((hi - lo) / out_len)
+    return np.minimum((centers * n / full).astype(np.int64), n - 1)
+
+
+def _decode_image_region(
+    chunk_files: list[str],
+    read_chunk,
+    source: str,
+    box=None,
+    scale: float = 1.0,
+    workers: int | None = 1,
+) -> np.ndarray:
+    """Region of chunks (names + reader) as an RGB array; see decode_image_region."""
+    first = None
     for path in chunk_files:
-        with open(path, "rb") as f:
-            data = f.read()
+        first = _parse_image_chunk(read_chunk(path), path)
+        if first is not None:
+            break
+    if first is None:
+        raise ValueError(f"No image chunk found in {source}")
+
+    h, w, c = first["h"], first["w"], first["c"]
+    block_count = first["block_count"]
+    version_used = first["version"]
+    box, out_h, out_w = _region_grid(box, scale, h, w)
+    left, top, right, bottom = box
+
+    coarse_img = None
+    coarse_payload = _find_coarse(first, chunk_files, read_chunk, _parse_image_chunk)
+    if coarse_payload is not None:
+        coarse_img = Image.open(BytesIO(coarse_payload)).convert("RGB")
+
+    def resize_region(img: Image.Image) -> np.ndarray:
+        bw, bh = img.size
+        src = (left * bw / w, top * bh / h, right * bw / w, bottom * bh / h)
+        region = img.resize((out_w, out_h), Image.BICUBIC, box=src)
+        return np.asarray(region, dtype=np.int16)
+
+    need_h, need_w = round(h * scale), round(w * scale)
+    if coarse_img is not None and min(
+        coarse_img.height - need_h, coarse_img.width - need_w
+    ) >= 0:
+        return resize_region(coarse_img).astype(np.uint8)
+
+    resid_info = _first_residual(chunk_files, read_chunk, _parse_image_chunk)
+    tier = _tier_fields(resid_info, source) if resid_info else None
+    pyramid = _level_fields(resid_info, source) if resid_info else None
+    table = pyramid[1] if pyramid else [(h, w, 0, block_count)]
+    # the coarsest level that still has the output's resolution; the levels
+    # below it are decoded whole (they are at most 1/16 of its size)
+    level = next(
+        i for i, (lh, lw, _f, _n) in enumerate(table) if lh >= need_h and lw >= need_w
+    )
+    if level > 0:
+        lower = _decode_image_chunks(chunk_files, read_chunk, source, workers, level)
+        base = Image.fromarray(lower, "RGB")
+    elif coarse_img is not None:
+        base = coarse_img
+    else:
+        print(f"[Holo] Warning: no coarse chunk survived in {source}, residual only")
+        base = Image.new("RGB", (1, 1))
+    base_up = resize_region(base)
+
+    lh, lw, first_block, count = table[level]
+    ys = _region_samples(out_h, top, bottom, h, lh)
+    xs = _region_samples(out_w, left, right, w, lw)
+    positions = (ys[:, None] * lw + xs[None, :])[:, :, None] * c + np.arange(c)
+    positions = positions.reshape(-1)
+    n = lh * lw * c
+    if pyramid is None and (version_used == 1 or block_count == 1):
+        step = None  # legacy v1 layout: simple modular stride
+    else:
+        step = _golden_step(n)
 
-        off = 0
-        magic = data[off: off + 4]
-        off += 4
-        if magic != MAGIC_IMG:
-            continue
-        version = data[off]
-        off += 1
-        if version not in (1, VERSION_IMG):
-            raise ValueError(f"Unsupported image chunk version {version} in {path}")
-
-        h_i = struct.unpack(">I", data[off: off + 4])[0]
-        off += 4
-        w_i = struct.unpack(">I", data[off: off + 4])[0]
-        off += 4
-        c_i = data[off]
-        off += 1
-        B_i = struct.unpack(">I", data[off: off + 4])[0]
-        off += 4
-        block_id = struct.unpack(">I", data[off: off + 4])[0]
-        off += 4
-        coarse_len = struct.unpack(">I", data[off: off + 4])[0]
-        off += 4
-        resid_len = struct.unpack(">I", data[off: off + 4])[0]
-        off += 4
-
-        coarse_bytes = data[off: off + coarse_len]
-        off += coarse_len
-        resid_comp = data[off: off + resid_len]
-
-        if first:
-            h, w, c = h_i, w_i, c_i
-            block_count = B_i
-            coarse_img = Image.open(BytesIO(coarse_bytes)).convert("RGB")
-            coarse_up = coarse_img.resize((w, h), Image.BICUBIC)
-            coarse_up_arr = np.asarray(coarse_up, dtype=np.int16)
-            residual_flat = np.zeros(h * w * c, dtype=np.int16)
-            version_used = version
-            if version_used == VERSION_IMG and block_count > 1:
-                perm = _golden_permutation(residual_flat.size)
-            first = False
-        else:
-            if (h_i, w_i, c_i, B_i) != (h, w, c, block_count):
-                raise ValueError(f"Inconsistent image chunk: {path}")
-            if version != version_used:
-                raise ValueError(f"Mixed image chunk versions in {in_dir}")
+    if tier is None:
+        spans = [(first_block, count)]
+    else:
+        tier0_count = tier[3] if tier[0] == 0 else tier[2]
+        spans = [(0, tier0_count), (tier0_count, block_count - tier0_count)]
+    lookups = [
+        _golden_block_lookup(positions, n, span_count, step)
+        for _first, span_count in spans
+    ]
+    layers = [np.zeros(positions.size, dtype=np.int16) for _span in spans]
+    lo_known = np.zeros(positions.size, dtype=bool)
+
+    def gather_chunk(path: str) -> None:
+        info = _parse_image_chunk(read_chunk(path), path)
+        if info is None:
+            return
+        if (info["h"], info["w"], info["c"], info["block_count"]) != (
+            h,
+            w,
+            c,
+            block_count,
+        ):
+            raise ValueError(f"Inconsistent image chunk: {path}")
+        if info["version"] != version_used:
+            raise ValueError(f"Mixed image chunk versions in {source}")
+        if _is_coarse_copy(info):
+            return
+        fields = _level_fields(info, path)
+        if (fields is None) != (pyramid is None):
+            raise ValueError(f"Mixed pyramid and single-level chunks in {source}")
+        if fields is not None and fields[1] != pyramid[1]:
+            raise ValueError(f"Inconsistent pyramid levels: {path}")
+        if fields is not None and fields[0] - 1 != level:
+            return
+        tier_fields = _tier_fields(info, path)
+        if (tier_fields is None) != (tier is None):
+            raise ValueError(f"Mixed residual tiers in {source}")
+        layer = 0
+        if tier_fields is not None:
+            layer = tier_fields[0]
+            if tier_fields[1] != tier[1] or tier_fields[2:] != spans[layer]:
+                raise ValueError(f"Mixed residual tiers in {source}")
+
+        sel, offsets = lookups[layer](info["block_id"] - spans[layer][0])
+        if not len(sel):
+            return  # none of this block's samples fall in the region
+        layout = _transform_layout(info["ext"], path)
+        vals = _decode_residual(_decompress(info["resid"], info["codec"]), layout)
+        ok = offsets < len(vals)
+        # Different blocks never share a sample, so no locking is needed.
+        layers[layer][sel[ok]] = vals[offsets[ok]]
+        if layer == 1:
+            lo_known[sel[ok]] = True
+
+    _run_parallel(gather_chunk, chunk_files, workers)
+    if tier is None:
+        residual = layers[0]
+    else:
+        bits = tier[1]
+        exact = (layers[0].astype(np.int32) << bits) + layers[1]
+        residual = np.where(lo_known, exact, _tier_estimate(layers[0], bits))
+    recon = base_up + residual.reshape(out_h, out_w, c)
+    return np.clip(recon, 0, 255).astype(np.uint8)
 
-        vals_bytes = zlib.decompress(resid_comp)
-        vals = np.frombuffer(vals_bytes, dtype="<i2")
 
-        if version_used == 1 or block_count == 1:
-            # legacy v1 layout: simple modular stride
-            residual_flat[block_id::block_count][: len(vals)] = vals
-        else:
-            # v2: golden permutation layout
-            idx = perm[block_id::block_count]
-            residual_flat[idx[: len(vals)]] = vals
+def decode_image_region(
+    chunks,
+    box=None,
+    scale: float = 1.0,
+    max_chunks: int | None = None,
+    workers: int | None = 1,
+) -> np.ndarray:
+    """
+    Decode part of an image, or all of it at reduced size, from chunk
+    payloads held in memory. Arguments are as in decode_image_region_holo_dir.
+    """
+    chunk_files, read_chunk = _memory_reader(chunks, max_chunks)
+    return _decode_image_region(
+        chunk_files, read_chunk, "chunk list", box, scale, workers
+    )
 
-    residual = residual_flat.reshape(h, w, c)
-    recon_int = coarse_up_arr + residual
-    recon_int = np.clip(recon_int, 0, 255)
-    recon = recon_int.astype(np.uint8)
+
+def decode_image_region_holo_dir(
+    in_dir: str,
+    output_path: str,
+    box=None,
+    scale: float = 1.0,
+    max_chunks: int | None = None,
+    workers: int | None = 1,
+) -> None:
+    """
+    Decode the region box = (left, top, right, bottom) of an image (the
+    whole image if None), in full-resolution pixels, and write it scaled
+    by scale (0 < scale <= 1), e.g. a 512 px preview with scale =
+    512 / max(h, w).
+
+    The coarse part is upsampled for the region only, and only the
+    residual samples under the output pixels are gathered, found by
+    inverting the golden permutation; chunks holding none of them are not
+    decompressed. Reduced sizes sample the nearest source pixel. When the
+    thumbnail or a pyramid level already has the output's resolution, the
+    region is taken from it and the chunks of finer levels are skipped;
+    previews of large images then cost in proportion to the output.
+    Otherwise decompressing the chunks remains the main cost. At
+    scale 1 the result equals the full decode cropped to box, up to
+    rounding in the bicubic upsampling (a few values off by 1 or 2).
+
+    max_chunks and workers are as in decode_image_holo_dir; in_dir may also
+    be a .holopack file.
+    """
+    chunk_files, read_chunk = _chunk_reader(in_dir, max_chunks)
+    recon = _decode_image_region(chunk_files, read_chunk, in_dir, box, scale, workers)
     save_image(recon, output_path)
 
 
 # ===================== WAV AUDIO =====================
 
 
-def _read_wav_int16(path: str) -> tuple[np.ndarray, int, int]:
+def _pcm_to_int16(raw: bytes, sampwidth: int, n_channels: int) -> np.ndarray:
     """
-    Read a WAV file and return (samples_int16, sample_rate, channels).
+    Convert raw little-endian PCM frames to an int16 array (frames, channels).
 
     Supports PCM 16-bit or PCM 24-bit (the latter is down-converted to 16-bit).
     """
-    with wave.open(path, "rb") as wf:
-        n_channels = wf.getnchannels()
-        sampwidth = wf.getsampwidth()
-        framerate = wf.getframerate()
-        n_frames = wf.getnframes()
-        raw = wf.readframes(n_frames)
-
-    total_samples = n_frames * n_channels
-
     if sampwidth == 2:
         data = np.frombuffer(raw, dtype="<i2").astype(np.int16)
     elif sampwidth == 3:
         b = np.frombuffer(raw, dtype=np.uint8)
-        if b.size != total_samples * 3:
+        if b.size % (3 * n_channels) != 0:
             raise ValueError("Inconsistent 24-bit WAV data size")
         b = b.reshape(-1, 3)
         vals = (
@@ -348,7 +2436,25 @@ def _read_wav_int16(path: str) -> tuple[np.ndarray, int, int]:
             f"Only PCM 16-bit or 24-bit WAV is supported, got sampwidth={sampwidth}"
         )
 
-    data = data.reshape(-1, n_channels)
+    return data.reshape(-1, n_channels)
+
+
+def _read_wav_int16(path: str) -> tuple[np.ndarray, int, int]:
+    """
+    Read a WAV file and return (samples_int16, sample_rate, channels).
+
+    Supports PCM 16-bit or PCM 24-bit (the latter is down-converted to 16-bit).
+    """
+    with wave.open(path, "rb") as wf:
+        n_channels = wf.getnchannels()
+        sampwidth = wf.getsampwidth()
+        framerate = wf.getframerate()
+        n_frames = wf.getnframes()
+        raw = wf.readframes(n_frames)
+
+    if sampwidth == 3 and len(raw) != n_frames * n_channels * 3:
+        raise ValueError("Inconsistent 24-bit WAV data size")
+    data = _pcm_to_int16(raw, sampwidth, n_channels)
     return data, framerate, n_channels
 
 
@@ -363,226 +2469,777 @@ def _write_wav_int16(path: str, data: np.ndarray, framerate: int) -> None:
         wf.writeframes(data.astype("<i2").tobytes())
 
 
+def load_wav(path: str) -> tuple[np.ndarray, int]:
+    """Load a PCM WAV as (int16 samples of shape (n_frames, channels), rate)."""
+    audio, sr, _ch = _read_wav_int16(path)
+    return audio, sr
+
+
+def save_wav(audio: np.ndarray, path: str, sample_rate: int) -> None:
+    """Save int16 samples of shape (n_frames, channels) as 16-bit PCM WAV."""
+    _write_wav_int16(path, audio, sample_rate)
+
+
+def _audio_coarse_len(n_frames: int, coarse_max_frames: int) -> int:
+    coarse_len = min(coarse_max_frames, n_frames)
+    if coarse_len < 2:
+        coarse_len = 2
+    return coarse_len
+
+
+def _audio_coarse_up(
+    coarse: np.ndarray,
+    n_frames: int,
+    f0: int = 0,
+    f1: int | None = None,
+) -> np.ndarray:
+    """
+    Linear interpolation of the coarse track back to full length, frames f0..f1.
+
+    Any window gives exactly the same values as the corresponding slice of
+    the full-length interpolation, so encoders and decoders can work on
+    fixed-size windows without changing the chunk contents.
+    """
+    coarse_len = coarse.shape[0]
+    if f1 is None:
+        f1 = n_frames
+
+    # Same values as np.linspace(0, coarse_len - 1, n_frames)[f0:f1]
+    if n_frames > 1:
+        t = np.arange(f0, f1, dtype=np.float64) * ((coarse_len - 1) / (n_frames - 1))
+        if f1 == n_frames and f1 > f0:
+            t[-1] = coarse_len - 1
+    else:
+        t = np.zeros(f1 - f0, dtype=np.float64)
+
+    k0 = np.floor(t).astype(np.int64)
+    k1 = np.clip(k0 + 1, 0, coarse_len - 1)
+    alpha = (t - k0).astype(np.float64)
+    coarse_f = coarse.astype(np.float64)
+    coarse_up = (1.0 - alpha)[:, None] * coarse_f[k0] + alpha[:, None] * coarse_f[k1]
+    return np.round(coarse_up).astype(np.int16)
+
+
+def _pack_audio_chunk(
+    ch: int,
+    sr: int,
+    n_frames: int,
+    block_count: int,
+    block_id: int,
+    coarse_len: int,
+    coarse_comp: bytes,
+    resid_comp: bytes,
+    codec_id: int = CODEC_ZLIB,
+    ext: dict[int, bytes] | None = None,
+) -> bytes:
+    header = bytearray()
+    header += MAGIC_AUD
+    header += struct.pack("B", VERSION_AUD)
+    header += struct.pack("B", ch)
+    header += struct.pack("B", 2)  # internal sampwidth
+    header += struct.pack("B", 0)  # padding
+    header += struct.pack(">I", sr)
+    header += struct.pack(">I", n_frames)
+    header += struct.pack(">I", block_count)
+    header += struct.pack(">I", block_id)
+    header += struct.pack(">I", coarse_len)
+    header += struct.pack(">I", len(coarse_comp))
+    header += struct.pack(">I", len(resid_comp))
+    header += _pack_v3_fields(codec_id, ext)
+    return bytes(header) + coarse_comp + resid_comp
+
+
+def _encode_audio_chunks(
+    audio: np.ndarray,
+    sr: int,
+    out_path: str | None,
+    block_count: int = 16,
+    coarse_max_frames: int = 2048,
+    target_chunk_kb: int | None = None,
+    compression: str = "default",
+    workers: int | None = 1,
+    residual_transform: str = "raw",
+    coarse_copies: int = 0,
+    tier_bits: int = 0,
+) -> _ChunkSink:
+    """Encode samples into out_path (None: memory); see encode_audio_holo_dir."""
+    _check_tier_bits(tier_bits)
+    if tier_bits and compression == "default":
+        compression = _TIERED_DEFAULT_COMPRESSION
+    codec_id, level = _resolve_compression(compression)
+    _check_transform(residual_transform)
+
+    n_frames, ch = audio.shape
+
+    coarse_len = _audio_coarse_len(n_frames, coarse_max_frames)
+    idx = np.linspace(0, n_frames - 1, coarse_len, dtype=np.int64)
+    coarse = audio[idx]
+
+    coarse_up = _audio_coarse_up(coarse, n_frames)
+
+    residual = (audio.astype(np.int32) - coarse_up.astype(np.int32)).astype(np.int16)
+    residual_flat = residual.reshape(-1)
+
+    coarse_bytes = coarse.astype("<i2").tobytes()
+    coarse_comp = zlib.compress(coarse_bytes, level=9)
+    chunk_coarse, content_id = _coarse_layout(coarse_comp, coarse_copies)
+
+    block_count = _block_count_for_target(
+        block_count,
+        target_chunk_kb,
+        residual_bytes_total=residual_flat.size * 2,  # int16
+        overhead_bytes=len(chunk_coarse),
+        max_blocks=residual_flat.size,
+    )
+
+    residual_slice = _residual_slicer(residual_flat, block_count, tier_bits)
+    sink = _ChunkSink(out_path)
+
+    def write_block(block_id: int) -> None:
+        vals, tier_ext = residual_slice(block_id)
+        resid_comp, ext = _encode_residual(vals, residual_transform, codec_id, level)
+        ext.update(tier_ext)
+        data = _pack_audio_chunk(
+            ch,
+            sr,
+            n_frames,
+            block_count,
+            block_id,
+            coarse_len,
+            chunk_coarse,
+            resid_comp,
+            codec_id,
+            _residual_ext(ext, content_id),
+        )
+        sink.write(coarse_copies + block_id, data)
+
+    _run_parallel(write_block, range(block_count), workers)
+    for i in range(coarse_copies):
+        copy_ext = _coarse_copy_ext(content_id, i)
+        data = _pack_audio_chunk(
+            ch,
+            sr,
+            n_frames,
+            block_count,
+            i,
+            coarse_len,
+            coarse_comp,
+            b"",
+            codec_id,
+            copy_ext,
+        )
+        sink.write(i, data)
+    sink.close()
+    return sink
+
+
+def encode_audio(
+    audio: np.ndarray,
+    sample_rate: int,
+    block_count: int = 16,
+    coarse_max_frames: int = 2048,
+    target_chunk_kb: int | None = None,
+    compression: str = "default",
+    workers: int | None = 1,
+    residual_transform: str = "raw",
+    coarse_copies: int = 0,
+    tier_bits: int = 0,
+) -> list[bytes]:
+    """
+    Encode int16 PCM samples, shape (n_frames, channels) or (n_frames,) for
+    mono, into chunks held in memory.
+
+    Returns the chunk payloads in chunk order, byte-identical to the files
+    that encode_audio_holo_dir writes; the options are the same.
+    """
+    audio = np.asarray(audio)
+    if audio.ndim == 1:
+        audio = audio[:, None]
+    if audio.ndim != 2 or audio.dtype != np.int16:
+        raise ValueError("Expected int16 samples of shape (n_frames, channels)")
+    sink = _encode_audio_chunks(
+        audio,
+        sample_rate,
+        None,
+        block_count=block_count,
+        coarse_max_frames=coarse_max_frames,
+        target_chunk_kb=target_chunk_kb,
+        compression=compression,
+        workers=workers,
+        residual_transform=residual_transform,
+        coarse_copies=coarse_copies,
+        tier_bits=tier_bits,
+    )
+    return sink.chunk_list()
+
+
 def encode_audio_holo_dir(
     input_wav: str,
     out_dir: str,
     block_count: int = 16,
     coarse_max_frames: int = 2048,
     target_chunk_kb: int | None = None,
+    compression: str = "default",
+    workers: int | None = 1,
+    residual_transform: str = "raw",
+    coarse_copies: int = 0,
+    tier_bits: int = 0,
 ) -> None:
     """
     Encode a WAV file into a holographic directory of chunks.
 
-    Each chunk carries a coarse downsampled version of the track and a slice
-    of the residual information, distributed via a golden permutation in v2.
-    """
-    audio, sr, ch = _read_wav_int16(input_wav)
-    n_frames = audio.shape[0]
+    Each chunk carries a coarse downsampled version of the track and a slice
+    of the residual information, distributed via a golden permutation in v2.
+
+    compression, workers, residual_transform, coarse_copies and tier_bits
+    have the same meaning as in encode_image_holo_dir.
+    """
+    audio, sr, _ch = _read_wav_int16(input_wav)
+    _encode_audio_chunks(
+        audio,
+        sr,
+        out_dir,
+        block_count=block_count,
+        coarse_max_frames=coarse_max_frames,
+        target_chunk_kb=target_chunk_kb,
+        compression=compression,
+        workers=workers,
+        residual_transform=residual_transform,
+        coarse_copies=coarse_copies,
+        tier_bits=tier_bits,
+    )
+
+
+def _stream_window_frames(memory_budget_mb: int, ch: int) -> int:
+    budget = max(1, int(memory_budget_mb)) * 1024 * 1024
+    return max(1024, budget // (max(1, ch) * _STREAM_BYTES_PER_SAMPLE))
+
+
+def encode_audio_holo_dir_streaming(
+    input_wav: str,
+    out_dir: str,
+    block_count: int = 16,
+    coarse_max_frames: int = 2048,
+    target_chunk_kb: int | None = None,
+    memory_budget_mb: int = 64,
+    compression: str = "default",
+    workers: int | None = 1,
+    residual_transform: str = "raw",
+    coarse_copies: int = 0,
+) -> None:
+    """
+    Encode a WAV file like encode_audio_holo_dir in fixed-size frame windows.
+
+    The track is read, interpolated and turned into residual one window at
+    a time (window length derived from memory_budget_mb). Each window is
+    scattered into per-block buffers in a disk-backed spill file, and the
+    blocks are compressed from the spill piece by piece. Peak memory does not
+    depend on track length. The chunks are byte-identical to
+    encode_audio_holo_dir.
+    """
+    codec_id, level = _resolve_compression(compression)
+    _check_transform(residual_transform)
+
+    with wave.open(input_wav, "rb") as wf:
+        ch = wf.getnchannels()
+        sampwidth = wf.getsampwidth()
+        sr = wf.getframerate()
+        n_frames = wf.getnframes()
+
+        coarse_len = _audio_coarse_len(n_frames, coarse_max_frames)
+        idx = np.linspace(0, n_frames - 1, coarse_len, dtype=np.int64)
+        coarse = np.zeros((coarse_len, ch), dtype=np.int16)
+        for j, frame in enumerate(idx):
+            wf.setpos(int(frame))
+            coarse[j] = _pcm_to_int16(wf.readframes(1), sampwidth, ch)[0]
+
+        coarse_bytes = coarse.astype("<i2").tobytes()
+        coarse_comp = zlib.compress(coarse_bytes, level=9)
+        chunk_coarse, content_id = _coarse_layout(coarse_comp, coarse_copies)
+
+        N = n_frames * ch
+        block_count = _block_count_for_target(
+            block_count,
+            target_chunk_kb,
+            residual_bytes_total=N * 2,  # int16
+            overhead_bytes=len(chunk_coarse),
+            max_blocks=N,
+        )
+
+        sink = _ChunkSink(out_dir)
 
-    coarse_len = min(coarse_max_frames, n_frames)
-    if coarse_len < 2:
-        coarse_len = 2
+        window = _stream_window_frames(memory_budget_mb, ch)
+        piece_len = window * ch
+        spill = _BlockSpill(sink.work_dir, N, block_count, "<i2")
+        try:
+            wf.rewind()
+            for f0 in range(0, n_frames, window):
+                f1 = min(n_frames, f0 + window)
+                audio = _pcm_to_int16(wf.readframes(f1 - f0), sampwidth, ch)
+                if audio.shape[0] != f1 - f0:
+                    raise ValueError(f"Truncated WAV data in {input_wav}")
+                coarse_up = _audio_coarse_up(coarse, n_frames, f0, f1)
+                residual = (
+                    audio.astype(np.int32) - coarse_up.astype(np.int32)
+                ).astype(np.int16)
+                positions = np.arange(f0 * ch, f1 * ch, dtype=np.int64)
+                spill.scatter(positions, residual.reshape(-1))
+
+            def write_block(block_id: int) -> None:
+                resid_comp, ext = _encode_residual_pieces(
+                    lambda: spill.block_pieces(block_id, piece_len),
+                    residual_transform,
+                    codec_id,
+                    level,
+                )
+                data = _pack_audio_chunk(
+                    ch,
+                    sr,
+                    n_frames,
+                    block_count,
+                    block_id,
+                    coarse_len,
+                    chunk_coarse,
+                    resid_comp,
+                    codec_id,
+                    _residual_ext(ext, content_id),
+                )
+                sink.write(coarse_copies + block_id, data)
+
+            _run_parallel(write_block, range(block_count), workers)
+            for i in range(coarse_copies):
+                copy_ext = _coarse_copy_ext(content_id, i)
+                data = _pack_audio_chunk(
+                    ch,
+                    sr,
+                    n_frames,
+                    block_count,
+                    i,
+                    coarse_len,
+                    coarse_comp,
+                    b"",
+                    codec_id,
+                    copy_ext,
+                )
+                sink.write(i, data)
+            sink.close()
+        finally:
+            spill.close()
 
-    idx = np.linspace(0, n_frames - 1, coarse_len, dtype=np.int64)
-    coarse = audio[idx]
 
-    t = np.linspace(0, coarse_len - 1, n_frames, dtype=np.float64)
-    k0 = np.floor(t).astype(np.int64)
-    k1 = np.clip(k0 + 1, 0, coarse_len - 1)
-    alpha = (t - k0).astype(np.float64)
-    coarse_f = coarse.astype(np.float64)
-    coarse_up = (1.0 - alpha)[:, None] * coarse_f[k0] + alpha[:, None] * coarse_f[k1]
-    coarse_up = np.round(coarse_up).astype(np.int16)
+def _parse_audio_chunk(data: bytes, path: str) -> dict | None:
+    """
+    Parse an audio chunk.
 
-    residual = (audio.astype(np.int32) - coarse_up.astype(np.int32)).astype(np.int16)
-    residual_flat = residual.reshape(-1)
+    Returns None when the magic does not match (not an audio chunk), else a
+    dict with the header fields plus the raw 'coarse' and 'resid' payloads
+    ('coarse_off' is where the coarse payload starts in data).
+    """
+    if data[:4] != MAGIC_AUD:
+        return None
+    version = data[4]
+    if version not in (1, 2, VERSION_AUD):
+        raise ValueError(f"Unsupported audio chunk version {version} in {path}")
+
+    (
+        ch,
+        sampwidth,
+        _pad,
+        sr,
+        n_frames,
+        block_count,
+        block_id,
+        coarse_len,
+        coarse_size,
+        resid_size,
+    ) = struct.unpack_from(">BBBIIIIIII", data, 5)
+    off = 5 + 31
+    codec_id, ext = CODEC_ZLIB, {}
+    if version >= 3:
+        codec_id, ext, off = _parse_v3_fields(data, off)
+    coarse_off = off
+    coarse = data[off: off + coarse_size]
+    off += coarse_size
+    resid = data[off: off + resid_size]
+    return {
+        "version": version,
+        "ch": ch,
+        "sampwidth": sampwidth,
+        "sr": sr,
+        "n_frames": n_frames,
+        "block_count": block_count,
+        "block_id": block_id,
+        "coarse_len": coarse_len,
+        "coarse": coarse,
+        "coarse_off": coarse_off,
+        "resid": resid,
+        "codec": codec_id,
+        "ext": ext,
+    }
+
+
+def _decode_audio_chunks(
+    chunk_files: list[str],
+    read_chunk,
+    source: str,
+    workers: int | None = 1,
+) -> tuple[np.ndarray, int]:
+    """Decode chunks (names + reader) to (samples, rate); source labels messages."""
+    first = None
+    for path in chunk_files:
+        first = _parse_audio_chunk(read_chunk(path), path)
+        if first is not None:
+            break
+    if first is None:
+        raise ValueError(f"No audio chunk found in {source}")
+
+    if first["sampwidth"] != 2:
+        raise ValueError("Audio chunk has unsupported sampwidth (expected 2 bytes)")
+    ch = first["ch"]
+    sr = first["sr"]
+    n_frames = first["n_frames"]
+    block_count = first["block_count"]
+    coarse_len = first["coarse_len"]
+    version_used = first["version"]
+
+    coarse_payload = _find_coarse(first, chunk_files, read_chunk, _parse_audio_chunk)
+    if coarse_payload is None:
+        print(f"[Holo] Warning: no coarse chunk survived in {source}, residual only")
+        coarse = np.zeros((coarse_len, ch), dtype=np.int16)
+    else:
+        coarse_bytes = zlib.decompress(coarse_payload)
+        coarse = np.frombuffer(coarse_bytes, dtype="<i2").astype(np.int16)
+        coarse = coarse.reshape(coarse_len, ch)
+    coarse_up = _audio_coarse_up(coarse, n_frames)
 
-    coarse_bytes = coarse.astype("<i2").tobytes()
-    coarse_comp = zlib.compress(coarse_bytes, level=9)
+    residual_flat = np.zeros(n_frames * ch, dtype=np.int16)
+    N = residual_flat.size
+    step = _golden_step(N)
+    tier_bits = _first_tier_bits(chunk_files, read_chunk, _parse_audio_chunk)
+    tiered = _TieredResidual(N, tier_bits) if tier_bits else None
+
+    def scatter_chunk(path: str) -> None:
+        info = _parse_audio_chunk(read_chunk(path), path)
+        if info is None:
+            return
+        if (
+            info["ch"],
+            info["sr"],
+            info["n_frames"],
+            info["block_count"],
+            info["coarse_len"],
+        ) != (ch, sr, n_frames, block_count, coarse_len):
+            raise ValueError(f"Inconsistent audio chunk: {path}")
+        if info["version"] != version_used:
+            raise ValueError(f"Mixed audio chunk versions in {source}")
+        if _is_coarse_copy(info):
+            return
+
+        block_id = info["block_id"]
+        layout = _transform_layout(info["ext"], path)
+        vals = _decode_residual(_decompress(info["resid"], info["codec"]), layout)
+
+        if tiered is not None:
+            tiered.add(info, vals, path)
+        elif EXT_TIER in info["ext"]:
+            raise ValueError(f"Mixed residual tiers in {source}")
+        elif version_used == 1 or block_count == 1:
+            positions = np.arange(
+                block_id,
+                block_id + len(vals) * block_count,
+                block_count,
+                dtype=np.int64,
+            )
+            positions = positions[positions < residual_flat.size]
+            residual_flat[positions] = vals[: len(positions)]
+        else:
+            idx_block = _golden_block_indices(
+                N, block_id, block_count, stop=len(vals), step=step
+            )
+            residual_flat[idx_block] = vals[: len(idx_block)]
 
-    if target_chunk_kb is not None:
-        residual_bytes_total = residual_flat.size * 2  # int16
-        try:
-            target_bytes = max(1, int(target_chunk_kb) * 1024)
-        except ValueError:
-            target_bytes = None
+    _run_parallel(scatter_chunk, chunk_files, workers)
+    if tiered is not None:
+        residual_flat = tiered.values()
 
-        if target_bytes is not None:
-            header_overhead = 64
-            overhead_approx = len(coarse_comp) + header_overhead
-            if target_bytes <= overhead_approx + 1:
-                block_count = 1
-            else:
-                useful_per_chunk = target_bytes - overhead_approx
-                block_count = int(np.ceil(residual_bytes_total / useful_per_chunk))
-                block_count = max(1, min(block_count, residual_flat.size))
+    residual = residual_flat.reshape(n_frames, ch)
+    recon_int = coarse_up.astype(np.int32) + residual.astype(np.int32)
+    recon_int = np.clip(recon_int, -32768, 32767).astype(np.int16)
+    return recon_int, sr
 
-    os.makedirs(out_dir, exist_ok=True)
 
-    N = residual_flat.size
-    perm = _golden_permutation(N) if block_count > 1 else None
+def decode_audio(
+    chunks,
+    max_chunks: int | None = None,
+    workers: int | None = 1,
+) -> tuple[np.ndarray, int]:
+    """
+    Decode audio from chunk payloads held in memory.
 
-    for block_id in range(block_count):
-        if block_count > 1:
-            idx_block = perm[block_id::block_count]
-            vals = residual_flat[idx_block]
-        else:
-            vals = residual_flat
-
-        vals_bytes = vals.astype("<i2").tobytes()
-        resid_comp = zlib.compress(vals_bytes, level=9)
-
-        header = bytearray()
-        header += MAGIC_AUD
-        header += struct.pack("B", VERSION_AUD)
-        header += struct.pack("B", ch)
-        header += struct.pack("B", 2)  # internal sampwidth
-        header += struct.pack("B", 0)  # padding
-        header += struct.pack(">I", sr)
-        header += struct.pack(">I", n_frames)
-        header += struct.pack(">I", block_count)
-        header += struct.pack(">I", block_id)
-        header += struct.pack(">I", coarse_len)
-        header += struct.pack(">I", len(coarse_comp))
-        header += struct.pack(">I", len(resid_comp))
-
-        data = bytes(header) + coarse_comp + resid_comp
-        fname = os.path.join(out_dir, f"chunk_{block_id:04d}.holo")
-        with open(fname, "wb") as f:
-            f.write(data)
+    Returns (int16 samples of shape (n_frames, channels), sample_rate).
+    max_chunks and workers are as in decode_audio_holo_dir.
+    """
+    chunk_files, read_chunk = _memory_reader(chunks, max_chunks)
+    return _decode_audio_chunks(chunk_files, read_chunk, "chunk list", workers)
 
 
 def decode_audio_holo_dir(
     in_dir: str,
     output_wav: str,
     max_chunks: int | None = None,
+    workers: int | None = 1,
 ) -> None:
     """
     Decode a WAV file from a holographic directory of chunks.
 
     If max_chunks is provided, only that many chunks are used.
+    workers has the same meaning as in decode_image_holo_dir.
 
-    Supports both v1 (modular stride) and v2 (golden permutation) layouts.
+    in_dir may also be a .holopack file.
+
+    Supports v1 (modular stride) and v2/v3 (golden permutation) layouts.
     """
-    chunk_files = sorted(glob.glob(os.path.join(in_dir, "chunk_*.holo")))
-    if not chunk_files:
-        raise FileNotFoundError(f"No chunk_*.holo found in {in_dir}")
+    chunk_files, read_chunk = _chunk_reader(in_dir, max_chunks)
+    recon, sr = _decode_audio_chunks(chunk_files, read_chunk, in_dir, workers)
+    _write_wav_int16(output_wav, recon, sr)
 
-    if max_chunks is not None:
-        chunk_files = chunk_files[:max_chunks]
 
-    first = True
-    sr = ch = n_frames = block_count = coarse_len = None
-    coarse_up = None
-    residual_flat = None
-    perm = None
-    version_used = None
+def decode_audio_holo_dir_streaming(
+    in_dir: str,
+    output_wav: str,
+    max_chunks: int | None = None,
+    memory_budget_mb: int = 64,
+    workers: int | None = 1,
+) -> None:
+    """
+    Decode a WAV file like decode_audio_holo_dir in fixed-size frame windows.
 
-    for path in chunk_files:
-        with open(path, "rb") as f:
-            data = f.read()
+    The output WAV is written with silent frames first and then memory-mapped.
+    Residual slices are decompressed piece by piece and scattered straight
+    into the mapped samples. A final pass over frame windows adds the
+    interpolated coarse track and clips. Peak memory does not depend on
+    track length, and the output matches decode_audio_holo_dir.
+    """
+    chunk_files, read_chunk = _chunk_reader(in_dir, max_chunks)
 
-        off = 0
-        magic = data[off: off + 4]
-        off += 4
-        if magic != MAGIC_AUD:
-            continue
-        version = data[off]
-        off += 1
-        if version not in (1, VERSION_AUD):
-            raise ValueError(f"Unsupported audio chunk version {version} in {path}")
-        ch_i = data[off]
-        off += 1
-        sampwidth = data[off]
-        off += 1
-        _pad = data[off]
-        off += 1
-        sr_i = struct.unpack(">I", data[off: off + 4])[0]
-        off += 4
-        n_frames_i = struct.unpack(">I", data[off: off + 4])[0]
-        off += 4
-        block_count_i = struct.unpack(">I", data[off: off + 4])[0]
-        off += 4
-        block_id = struct.unpack(">I", data[off: off + 4])[0]
-        off += 4
-        coarse_len_i = struct.unpack(">I", data[off: off + 4])[0]
-        off += 4
-        coarse_size = struct.unpack(">I", data[off: off + 4])[0]
-        off += 4
-        resid_size = struct.unpack(">I", data[off: off + 4])[0]
-        off += 4
-
-        coarse_comp = data[off: off + coarse_size]
-        off += coarse_size
-        resid_comp = data[off: off + resid_size]
-
-        if first:
-            if sampwidth != 2:
-                raise ValueError(
-                    "Audio chunk has unsupported sampwidth (expected 2 bytes)"
-                )
-            ch = ch_i
-            sr = sr_i
-            n_frames = n_frames_i
-            block_count = block_count_i
-            coarse_len = coarse_len_i
-
-            coarse_bytes = zlib.decompress(coarse_comp)
-            coarse = np.frombuffer(coarse_bytes, dtype="<i2").astype(np.int16)
-            coarse = coarse.reshape(coarse_len, ch)
-
-            t = np.linspace(0, coarse_len - 1, n_frames, dtype=np.float64)
-            k0 = np.floor(t).astype(np.int64)
-            k1 = np.clip(k0 + 1, 0, coarse_len - 1)
-            alpha = (t - k0).astype(np.float64)
-            coarse_f = coarse.astype(np.float64)
-            coarse_up = (
-                (1.0 - alpha)[:, None] * coarse_f[k0]
-                + alpha[:, None] * coarse_f[k1]
+    first = None
+    for path in chunk_files:
+        first = _parse_audio_chunk(read_chunk(path), path)
+        if first is not None:
+            break
+    if first is None:
+        raise ValueError(f"No audio chunk found in {in_dir}")
+
+    if first["sampwidth"] != 2:
+        raise ValueError("Audio chunk has unsupported sampwidth (expected 2 bytes)")
+    ch = first["ch"]
+    sr = first["sr"]
+    n_frames = first["n_frames"]
+    block_count = first["block_count"]
+    coarse_len = first["coarse_len"]
+    version_used = first["version"]
+
+    coarse_payload = _find_coarse(first, chunk_files, read_chunk, _parse_audio_chunk)
+    if coarse_payload is None:
+        print(f"[Holo] Warning: no coarse chunk survived in {in_dir}, residual only")
+        coarse = np.zeros((coarse_len, ch), dtype=np.int16)
+    else:
+        coarse_bytes = zlib.decompress(coarse_payload)
+        coarse = np.frombuffer(coarse_bytes, dtype="<i2").astype(np.int16)
+        coarse = coarse.reshape(coarse_len, ch)
+
+    window = _stream_window_frames(memory_budget_mb, ch)
+    silence = bytes(window * ch * 2)
+    with wave.open(output_wav, "wb") as wf:
+        wf.setnchannels(ch)
+        wf.setsampwidth(2)
+        wf.setframerate(sr)
+        for f0 in range(0, n_frames, window):
+            f1 = min(n_frames, f0 + window)
+            wf.writeframes(silence[: (f1 - f0) * ch * 2])
+
+    N = n_frames * ch
+    if N == 0:
+        return
+    data_offset = os.path.getsize(output_wav) - N * 2
+    out = np.memmap(output_wav, dtype="<i2", mode="r+", offset=data_offset, shape=(N,))
+    step = _golden_step(N)
+
+    def scatter_chunk(path: str) -> None:
+        info = _parse_audio_chunk(read_chunk(path), path)
+        if info is None:
+            return
+        if (
+            info["ch"],
+            info["sr"],
+            info["n_frames"],
+            info["block_count"],
+            info["coarse_len"],
+        ) != (ch, sr, n_frames, block_count, coarse_len):
+            raise ValueError(f"Inconsistent audio chunk: {path}")
+        if info["version"] != version_used:
+            raise ValueError(f"Mixed audio chunk versions in {in_dir}")
+        if _is_coarse_copy(info):
+            return
+        if EXT_TIER in info["ext"]:
+            raise ValueError(f"Tiered chunks need decode_audio_holo_dir: {path}")
+
+        block_id = info["block_id"]
+
+        def positions_for(k0: int, k1: int) -> np.ndarray:
+            if version_used == 1 or block_count == 1:
+                ks = np.arange(k0, k1, dtype=np.int64)
+                positions = block_id + ks * block_count
+                return positions[positions < N]
+            return _golden_block_indices(
+                N, block_id, block_count, start=k0, stop=k1, step=step
             )
-            coarse_up = np.round(coarse_up).astype(np.int16)
 
-            residual_flat = np.zeros(n_frames * ch, dtype=np.int16)
-            version_used = version
-            if version_used == VERSION_AUD and block_count > 1:
-                perm = _golden_permutation(residual_flat.size)
-            first = False
-        else:
-            if (ch_i, sr_i, n_frames_i, block_count_i, coarse_len_i) != (
-                ch,
-                sr,
-                n_frames,
-                block_count,
-                coarse_len,
-            ):
-                raise ValueError(f"Inconsistent audio chunk: {path}")
-            if version != version_used:
-                raise ValueError(f"Mixed audio chunk versions in {in_dir}")
+        _scatter_residual_pieces(
+            out,
+            info["resid"],
+            info["codec"],
+            _transform_layout(info["ext"], path),
+            _golden_block_size(N, block_id, block_count),
+            window * ch * 2,
+            positions_for,
+        )
 
-        vals_bytes = zlib.decompress(resid_comp)
-        vals = np.frombuffer(vals_bytes, dtype="<i2").astype(np.int16)
+    try:
+        _run_parallel(scatter_chunk, chunk_files, workers)
 
-        if version_used == 1 or block_count == 1:
-            positions = np.arange(
-                block_id,
-                block_id + len(vals) * block_count,
-                block_count,
-                dtype=np.int64,
-            )
-            positions = positions[positions < residual_flat.size]
-            residual_flat[positions] = vals[: len(positions)]
+        for f0 in range(0, n_frames, window):
+            f1 = min(n_frames, f0 + window)
+            view = out[f0 * ch: f1 * ch]
+            coarse_up = _audio_coarse_up(coarse, n_frames, f0, f1).reshape(-1)
+            recon_int = coarse_up.astype(np.int32) + view.astype(np.int32)
+            view[:] = np.clip(recon_int, -32768, 32767).astype(np.int16)
+    finally:
+        _release_memmap(out)
+
+
+# ===================== GENERIC BINARY =====================
+
+
+def _pack_binary_chunk(
+    L: int,
+    block_count: int,
+    block_id: int,
+    coarse_len: int,
+    coarse_comp: bytes,
+    comp_vals: bytes,
+    codec_id: int = CODEC_ZLIB,
+    ext: dict[int, bytes] | None = None,
+) -> bytes:
+    header = bytearray()
+    header += MAGIC_BIN
+    header += struct.pack("B", VERSION_BIN)
+    header += struct.pack(">Q", L)
+    header += struct.pack(">I", block_count)
+    header += struct.pack(">I", block_id)
+    header += struct.pack(">I", coarse_len)
+    header += struct.pack(">I", len(coarse_comp))
+    header += struct.pack(">I", len(comp_vals))
+    header += _pack_v3_fields(codec_id, ext)
+    return bytes(header) + coarse_comp + comp_vals
+
+
+def _encode_binary_chunks(
+    data: bytes,
+    out_path: str | None,
+    block_count: int = 32,
+    coarse_len: int = 1024,
+    target_chunk_kb: int | None = None,
+    compression: str = "default",
+    workers: int | None = 1,
+    coarse_copies: int = 0,
+) -> _ChunkSink:
+    """Encode bytes into out_path (None: memory); see encode_binary_holo_dir."""
+    codec_id, level = _resolve_compression(compression)
+
+    L = len(data)
+    if L == 0:
+        raise ValueError("Empty file, nothing to encode")
+
+    coarse_len = min(coarse_len, L)
+    coarse = data[:coarse_len]
+    rest = data[coarse_len:]
+    rest_arr = np.frombuffer(rest, dtype=np.uint8)
+
+    coarse_comp = zlib.compress(coarse, level=9)
+    chunk_coarse, content_id = _coarse_layout(coarse_comp, coarse_copies)
+
+    block_count = _block_count_for_target(
+        block_count,
+        target_chunk_kb,
+        residual_bytes_total=rest_arr.size,
+        overhead_bytes=len(chunk_coarse),
+        max_blocks=max(1, rest_arr.size),
+    )
+
+    sink = _ChunkSink(out_path)
+
+    N = rest_arr.size
+    step = _golden_step(N)
+
+    def write_block(block_id: int) -> None:
+        if block_count > 1:
+            idx = _golden_block_indices(N, block_id, block_count, step=step)
+            vals = rest_arr[idx]
         else:
-            idx_block = perm[block_id::block_count]
-            idx_block = idx_block[: len(vals)]
-            residual_flat[idx_block] = vals
+            vals = rest_arr
 
-    residual = residual_flat.reshape(n_frames, ch)
-    recon_int = coarse_up.astype(np.int32) + residual.astype(np.int32)
-    recon_int = np.clip(recon_int, -32768, 32767).astype(np.int16)
-    _write_wav_int16(output_wav, recon_int, sr)
+        vals_bytes = vals.tobytes()
+        comp_vals = _compress(vals_bytes, codec_id, level)
+        data_out = _pack_binary_chunk(
+            L,
+            block_count,
+            block_id,
+            coarse_len,
+            chunk_coarse,
+            comp_vals,
+            codec_id,
+            _residual_ext(None, content_id),
+        )
+        sink.write(coarse_copies + block_id, data_out)
+
+    _run_parallel(write_block, range(block_count), workers)
+    for i in range(coarse_copies):
+        copy_ext = _coarse_copy_ext(content_id, i)
+        data_out = _pack_binary_chunk(
+            L, block_count, i, coarse_len, coarse_comp, b"", codec_id, copy_ext
+        )
+        sink.write(i, data_out)
+    sink.close()
+    return sink
 
 
-# ===================== GENERIC BINARY =====================
+def encode_binary(
+    data: bytes,
+    block_count: int = 32,
+    coarse_len: int = 1024,
+    target_chunk_kb: int | None = None,
+    compression: str = "default",
+    workers: int | None = 1,
+    coarse_copies: int = 0,
+) -> list[bytes]:
+    """
+    Encode a bytes-like object into chunks held in memory.
+
+    Returns the chunk payloads in chunk order, byte-identical to the files
+    that encode_binary_holo_dir writes; the options are the same.
+    """
+    sink = _encode_binary_chunks(
+        bytes(data),
+        None,
+        block_count=block_count,
+        coarse_len=coarse_len,
+        target_chunk_kb=target_chunk_kb,
+        compression=compression,
+        workers=workers,
+        coarse_copies=coarse_copies,
+    )
+    return sink.chunk_list()
 
 
 def encode_binary_holo_dir(
@@ -591,6 +3248,9 @@ def encode_binary_holo_dir(
     block_count: int = 32,
     coarse_len: int = 1024,
     target_chunk_kb: int | None = None,
+    compression: str = "default",
+    workers: int | None = 1,
+    coarse_copies: int = 0,
 ) -> None:
     """
     Encode a generic binary file into a holographic directory.
@@ -599,159 +3259,692 @@ def encode_binary_holo_dir(
     are present; deleting chunks will typically corrupt the format.
 
     The residual payload is split via golden permutation in v2.
+    compression, workers and coarse_copies have the same meaning as in
+    encode_image_holo_dir.
     """
     with open(input_path, "rb") as f:
         data = f.read()
+    _encode_binary_chunks(
+        data,
+        out_dir,
+        block_count=block_count,
+        coarse_len=coarse_len,
+        target_chunk_kb=target_chunk_kb,
+        compression=compression,
+        workers=workers,
+        coarse_copies=coarse_copies,
+    )
+
+
+def encode_binary_holo_dir_streaming(
+    input_path: str,
+    out_dir: str,
+    block_count: int = 32,
+    coarse_len: int = 1024,
+    target_chunk_kb: int | None = None,
+    memory_budget_mb: int = 64,
+    compression: str = "default",
+    workers: int | None = 1,
+    coarse_copies: int = 0,
+) -> None:
+    """
+    Encode a binary file like encode_binary_holo_dir from a memory map.
 
-    L = len(data)
+    The source is np.memmap-ed rather than read, and every block is gathered
+    straight from the mapping in pieces sized by memory_budget_mb, then fed to
+    an incremental compressor. No copy of the file is held in RAM.
+    The chunks are byte-identical to encode_binary_holo_dir.
+    """
+    codec_id, level = _resolve_compression(compression)
+
+    L = os.path.getsize(input_path)
     if L == 0:
         raise ValueError("Empty file, nothing to encode")
 
     coarse_len = min(coarse_len, L)
-    coarse = data[:coarse_len]
-    rest = data[coarse_len:]
-    rest_arr = np.frombuffer(rest, dtype=np.uint8)
-
+    with open(input_path, "rb") as f:
+        coarse = f.read(coarse_len)
     coarse_comp = zlib.compress(coarse, level=9)
+    chunk_coarse, content_id = _coarse_layout(coarse_comp, coarse_copies)
 
-    if target_chunk_kb is not None:
-        residual_bytes_total = rest_arr.size
-        try:
-            target_bytes = max(1, int(target_chunk_kb) * 1024)
-        except ValueError:
-            target_bytes = None
+    N = L - coarse_len
+    block_count = _block_count_for_target(
+        block_count,
+        target_chunk_kb,
+        residual_bytes_total=N,
+        overhead_bytes=len(chunk_coarse),
+        max_blocks=max(1, N),
+    )
+
+    sink = _ChunkSink(out_dir)
 
-        if target_bytes is not None:
-            header_overhead = 64
-            overhead_approx = len(coarse_comp) + header_overhead
-            if target_bytes <= overhead_approx + 1:
-                block_count = 1
+    rest_arr = None
+    if N > 0:
+        rest_arr = np.memmap(
+            input_path, dtype=np.uint8, mode="r", offset=coarse_len, shape=(N,)
+        )
+    step = _golden_step(N)
+    budget = max(1, int(memory_budget_mb)) * 1024 * 1024
+    # index vector (int64) plus gathered bytes per piece, per worker
+    piece_len = max(1 << 16, budget // (16 * _resolve_workers(workers)))
+
+    def block_pieces(block_id: int):
+        size = _golden_block_size(N, block_id, block_count)
+        for k in range(0, size, piece_len):
+            if block_count > 1:
+                idx = _golden_block_indices(
+                    N, block_id, block_count, start=k, stop=k + piece_len, step=step
+                )
+                yield rest_arr[idx]
             else:
-                useful_per_chunk = target_bytes - overhead_approx
-                block_count = int(np.ceil(residual_bytes_total / useful_per_chunk))
-                max_blocks = max(1, residual_bytes_total)
-                block_count = max(1, min(block_count, max_blocks))
+                yield rest_arr[k: k + piece_len]
+
+    def write_block(block_id: int) -> None:
+        comp_vals = _compress_pieces(block_pieces(block_id), codec_id, level)
+        data_out = _pack_binary_chunk(
+            L,
+            block_count,
+            block_id,
+            coarse_len,
+            chunk_coarse,
+            comp_vals,
+            codec_id,
+            _residual_ext(None, content_id),
+        )
+        sink.write(coarse_copies + block_id, data_out)
+
+    try:
+        _run_parallel(write_block, range(block_count), workers)
+        for i in range(coarse_copies):
+            copy_ext = _coarse_copy_ext(content_id, i)
+            data_out = _pack_binary_chunk(
+                L, block_count, i, coarse_len, coarse_comp, b"", codec_id, copy_ext
+            )
+            sink.write(i, data_out)
+        sink.close()
+    finally:
+        _release_memmap(rest_arr)
 
-    os.makedirs(out_dir, exist_ok=True)
 
-    N = rest_arr.size
-    perm = _golden_permutation(N) if block_count > 1 else None
+def _parse_binary_chunk(data: bytes, path: str) -> dict | None:
+    """
+    Parse a binary chunk.
 
-    for block_id in range(block_count):
-        if block_count > 1:
-            idx = perm[block_id::block_count]
-            vals = rest_arr[idx]
+    Returns None when the magic does not match (not a binary chunk), else a
+    dict with the header fields plus the raw 'coarse' and 'resid' payloads
+    ('coarse_off' is where the coarse payload starts in data).
+    """
+    if data[:4] != MAGIC_BIN:
+        return None
+    version = data[4]
+    if version not in (1, 2, VERSION_BIN):
+        raise ValueError(f"Unsupported binary chunk version {version} in {path}")
+
+    L, block_count, block_id, coarse_len, coarse_size, resid_size = (
+        struct.unpack_from(">QIIIII", data, 5)
+    )
+    off = 5 + 28
+    codec_id, ext = CODEC_ZLIB, {}
+    if version >= 3:
+        codec_id, ext, off = _parse_v3_fields(data, off)
+    coarse_off = off
+    coarse = data[off: off + coarse_size]
+    off += coarse_size
+    resid = data[off: off + resid_size]
+    return {
+        "version": version,
+        "L": L,
+        "block_count": block_count,
+        "block_id": block_id,
+        "coarse_len": coarse_len,
+        "coarse": coarse,
+        "coarse_off": coarse_off,
+        "resid": resid,
+        "codec": codec_id,
+        "ext": ext,
+    }
+
+
+def _decode_binary_chunks(
+    chunk_files: list[str],
+    read_chunk,
+    source: str,
+    workers: int | None = 1,
+) -> bytes:
+    """Decode chunks (names + reader) to bytes; source labels messages."""
+    first = None
+    for path in chunk_files:
+        first = _parse_binary_chunk(read_chunk(path), path)
+        if first is not None:
+            break
+    if first is None:
+        raise ValueError(f"No binary chunk found in {source}")
+
+    L = first["L"]
+    block_count = first["block_count"]
+    coarse_len = first["coarse_len"]
+    version_used = first["version"]
+
+    coarse_payload = _find_coarse(first, chunk_files, read_chunk, _parse_binary_chunk)
+    if coarse_payload is None:
+        print(f"[Holo] Warning: no coarse chunk survived in {source}, residual only")
+        coarse = bytes(coarse_len)
+    else:
+        coarse = zlib.decompress(coarse_payload)
+    rest_len = L - coarse_len
+    rest_arr = np.zeros(rest_len, dtype=np.uint8)
+    step = _golden_step(rest_len)
+
+    def scatter_chunk(path: str) -> None:
+        info = _parse_binary_chunk(read_chunk(path), path)
+        if info is None:
+            return
+        if (info["L"], info["block_count"], info["coarse_len"]) != (
+            L,
+            block_count,
+            coarse_len,
+        ):
+            raise ValueError(f"Inconsistent binary chunk in {path}")
+        if info["version"] != version_used:
+            raise ValueError(f"Mixed binary chunk versions in {source}")
+        if _is_coarse_copy(info):
+            return
+
+        block_id = info["block_id"]
+        vals_bytes = _decompress(info["resid"], info["codec"])
+        vals = np.frombuffer(vals_bytes, dtype=np.uint8)
+        if vals.size == 0:
+            return
+
+        if version_used == 1 or block_count == 1:
+            rest_arr[block_id::block_count][: len(vals)] = vals
         else:
-            vals = rest_arr
+            idx = _golden_block_indices(
+                rest_len, block_id, block_count, stop=len(vals), step=step
+            )
+            rest_arr[idx] = vals[: len(idx)]
 
-        vals_bytes = vals.tobytes()
-        comp_vals = zlib.compress(vals_bytes, level=9)
+    _run_parallel(scatter_chunk, chunk_files, workers)
+
+    out = bytearray(L)
+    out[:coarse_len] = coarse[:coarse_len]
+    out[coarse_len:] = rest_arr.tobytes()
+    return bytes(out)
 
-        header = bytearray()
-        header += MAGIC_BIN
-        header += struct.pack("B", VERSION_BIN)
-        header += struct.pack(">Q", L)
-        header += struct.pack(">I", block_count)
-        header += struct.pack(">I", block_id)
-        header += struct.pack(">I", coarse_len)
-        header += struct.pack(">I", len(coarse_comp))
-        header += struct.pack(">I", len(comp_vals))
 
-        data_out = bytes(header) + coarse_comp + comp_vals
-        fname = os.path.join(out_dir, f"chunk_{block_id:04d}.holo")
-        with open(fname, "wb") as f:
-            f.write(data_out)
+def decode_binary(
+    chunks,
+    max_chunks: int | None = None,
+    workers: int | None = 1,
+) -> bytes:
+    """
+    Decode a binary object from chunk payloads held in memory.
+
+    All chunks are needed for a faithful result (see decode_binary_holo_dir).
+    max_chunks and workers are as in decode_binary_holo_dir.
+    """
+    chunk_files, read_chunk = _memory_reader(chunks, max_chunks)
+    return _decode_binary_chunks(chunk_files, read_chunk, "chunk list", workers)
 
 
 def decode_binary_holo_dir(
     in_dir: str,
     output_path: str,
     max_chunks: int | None = None,
+    workers: int | None = 1,
 ) -> None:
     """
     Decode a generic binary file from a holographic directory.
 
     This expects that all chunks are available for a valid reconstruction.
+    workers has the same meaning as in decode_image_holo_dir.
 
-    Supports both v1 (modular stride) and v2 (golden permutation) layouts.
+    in_dir may also be a .holopack file.
+
+    Supports v1 (modular stride) and v2/v3 (golden permutation) layouts.
     """
-    chunk_files = sorted(glob.glob(os.path.join(in_dir, "chunk_*.holo")))
-    if not chunk_files:
-        raise FileNotFoundError(f"No chunk_*.holo found in {in_dir}")
+    chunk_files, read_chunk = _chunk_reader(in_dir, max_chunks)
+    data = _decode_binary_chunks(chunk_files, read_chunk, in_dir, workers)
+    with open(output_path, "wb") as f:
+        f.write(data)
 
-    if max_chunks is not None:
-        chunk_files = chunk_files[:max_chunks]
 
-    first = True
-    L = block_count = coarse_len = None
-    coarse = None
-    rest_arr = None
-    perm = None
-    version_used = None
+def decode_binary_holo_dir_streaming(
+    in_dir: str,
+    output_path: str,
+    max_chunks: int | None = None,
+    memory_budget_mb: int = 64,
+    workers: int | None = 1,
+) -> None:
+    """
+    Decode a binary file like decode_binary_holo_dir into a memory map.
+
+    The output file is preallocated to its final size and np.memmap-ed.
+    Residual slices are inflated piece by piece and scattered directly into
+    the mapping, with no intermediate residual array or output copies.
+    """
+    chunk_files, read_chunk = _chunk_reader(in_dir, max_chunks)
 
+    first = None
     for path in chunk_files:
-        with open(path, "rb") as f:
-            data = f.read()
+        first = _parse_binary_chunk(read_chunk(path), path)
+        if first is not None:
+            break
+    if first is None:
+        raise ValueError(f"No binary chunk found in {in_dir}")
+
+    L = first["L"]
+    block_count = first["block_count"]
+    coarse_len = first["coarse_len"]
+    version_used = first["version"]
+    coarse_payload = _find_coarse(first, chunk_files, read_chunk, _parse_binary_chunk)
+    if coarse_payload is None:
+        print(f"[Holo] Warning: no coarse chunk survived in {in_dir}, residual only")
+        coarse = bytes(coarse_len)
+    else:
+        coarse = zlib.decompress(coarse_payload)
 
-        off = 0
-        magic = data[off: off + 4]
-        off += 4
-        if magic != MAGIC_BIN:
-            continue
-        version = data[off]
-        off += 1
-        if version not in (1, VERSION_BIN):
-            raise ValueError(f"Unsupported binary chunk version {version} in {path}")
-
-        L_i = struct.unpack(">Q", data[off: off + 8])[0]
-        off += 8
-        B_i = struct.unpack(">I", data[off: off + 4])[0]
-        off += 4
-        block_id = struct.unpack(">I", data[off: off + 4])[0]
-        off += 4
-        coarse_len_i = struct.unpack(">I", data[off: off + 4])[0]
-        off += 4
-        coarse_size = struct.unpack(">I", data[off: off + 4])[0]
-        off += 4
-        resid_size = struct.unpack(">I", data[off: off + 4])[0]
-        off += 4
-
-        coarse_comp = data[off: off + coarse_size]
-        off += coarse_size
-        resid_comp = data[off: off + resid_size]
-
-        if first:
-            L = L_i
-            block_count = B_i
-            coarse_len = coarse_len_i
-            coarse = zlib.decompress(coarse_comp)
-            rest_len = L - coarse_len
-            rest_arr = np.zeros(rest_len, dtype=np.uint8)
-            version_used = version
-            if version_used == VERSION_BIN and block_count > 1 and rest_len > 0:
-                perm = _golden_permutation(rest_len)
-            first = False
-        else:
-            if (L_i, B_i, coarse_len_i) != (L, block_count, coarse_len):
-                raise ValueError(f"Inconsistent binary chunk in {path}")
-            if version != version_used:
-                raise ValueError(f"Mixed binary chunk versions in {in_dir}")
+    with open(output_path, "wb") as f:
+        f.write(coarse[:coarse_len])
+        f.truncate(L)
+
+    rest_len = L - coarse_len
+    if rest_len <= 0:
+        return
+
+    out = np.memmap(
+        output_path, dtype=np.uint8, mode="r+", offset=coarse_len, shape=(rest_len,)
+    )
+    step = _golden_step(rest_len)
+    budget = max(1, int(memory_budget_mb)) * 1024 * 1024
+    piece_bytes = max(1 << 16, budget // (16 * _resolve_workers(workers)))
+
+    def scatter_chunk(path: str) -> None:
+        info = _parse_binary_chunk(read_chunk(path), path)
+        if info is None:
+            return
+        if (info["L"], info["block_count"], info["coarse_len"]) != (
+            L,
+            block_count,
+            coarse_len,
+        ):
+            raise ValueError(f"Inconsistent binary chunk in {path}")
+        if info["version"] != version_used:
+            raise ValueError(f"Mixed binary chunk versions in {in_dir}")
+        if _is_coarse_copy(info):
+            return
+
+        block_id = info["block_id"]
+        k = 0
+        pieces = _decompress_pieces(info["resid"], piece_bytes, info["codec"])
+        for piece in pieces:
+            vals = np.frombuffer(piece, dtype=np.uint8)
+            if version_used == 1 or block_count == 1:
+                ks = np.arange(k, k + len(vals), dtype=np.int64)
+                positions = block_id + ks * block_count
+                positions = positions[positions < rest_len]
+            else:
+                positions = _golden_block_indices(
+                    rest_len,
+                    block_id,
+                    block_count,
+                    start=k,
+                    stop=k + len(vals),
+                    step=step,
+                )
+            out[positions] = vals[: len(positions)]
+            k += len(vals)
 
-        vals_bytes = zlib.decompress(resid_comp)
-        vals = np.frombuffer(vals_bytes, dtype=np.uint8)
+    try:
+        _run_parallel(scatter_chunk, chunk_files, workers)
+    finally:
+        _release_memmap(out)
 
-        if version_used == 1 or block_count == 1:
-            rest_arr[block_id::block_count][: len(vals)] = vals
-        else:
-            idx = perm[block_id::block_count]
-            rest_arr[idx[: len(vals)]] = vals
 
-    out = bytearray(L)
-    out[:coarse_len] = coarse[:coarse_len]
-    out[coarse_len:] = rest_arr.tobytes()
+# ===================== PROGRESSIVE DECODING =====================
 
-    with open(output_path, "wb") as f:
-        f.write(out)
+
+def _block_positions(
+    n: int, block_id: int, block_count: int, n_vals: int, version: int, step: int
+) -> np.ndarray:
+    """Flat residual positions of the first n_vals samples of one block."""
+    if version == 1 or block_count == 1:
+        return np.arange(block_id, n, block_count, dtype=np.int64)[:n_vals]
+    return _golden_block_indices(n, block_id, block_count, stop=n_vals, step=step)
+
+
+class ProgressiveDecoder:
+    """
+    Stateful decoder that takes chunks one at a time, e.g. as they come off
+    the network, and can produce the current reconstruction at any point.
+
+    The coarse part is decoded and upsampled once, when the first chunk
+    carrying it arrives; add_chunk() then costs O(chunk size): decompress
+    one residual slice and scatter it into the residual buffer. snapshot()
+    returns an image array (h, w, 3) uint8, audio samples (n_frames,
+    channels) int16, or the bytes of a binary object.
+
+    With dirty_tracking (the default) the positions touched since the last
+    snapshot are remembered, and snapshot() re-adds and re-clips only those
+    instead of the whole signal.
+
+    Tiered chunks (tier_bits) update the affected residual values as either
+    tier arrives.
+
+    inpaint=True makes image snapshots fill the residual samples not yet
+    received as decode_image(inpaint=True) does. Until the last block
+    arrives a snapshot is then a full recompute, cached until the next
+    chunk that adds information.
+    """
+
+    def __init__(self, dirty_tracking: bool = True, inpaint: bool = False) -> None:
+        self.dirty_tracking = dirty_tracking
+        self.inpaint = inpaint
+        self.mode: str | None = None
+        self.block_count = 0
+        self.blocks: set[int] = set()
+        self.sample_rate: int | None = None
+        self._info = None
+        self._key = None
+        self._content_id = None
+        self._coarse_ready = False
+        self._coarse_up = None
+        self._residual = None
+        self._recon = None
+        self._tiers = None
+        self._pyramid = None
+        self._levels: list[np.ndarray] = []
+        self._coarse_img = None
+        self._level_imgs: list[Image.Image] = []
+        self._stale_level: int | None = None
+        self._known = None
+        self._level_known: list[np.ndarray] = []
+        self._inpainted = None
+        self._pending: list[np.ndarray] = []
+        self._pending_len = 0
+        self._all_dirty = True
+
+    @property
+    def progress(self) -> float:
+        """Fraction of residual blocks received so far."""
+        if not self.block_count:
+            return 0.0
+        return len(self.blocks) / float(self.block_count)
+
+    @property
+    def has_coarse(self) -> bool:
+        """True once a coarse copy has arrived (before that it counts as zero)."""
+        return self._coarse_ready
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the reconstruction buffers."""
+        total = self._pending_len * 8
+        for buf in (self._coarse_up, self._residual, self._recon):
+            if buf is not None:
+                total += buf.nbytes if isinstance(buf, np.ndarray) else len(buf)
+        if self._tiers is not None:
+            total += self._residual.size * 5
+        total += sum(level.nbytes for level in self._levels)
+        total += sum(img.width * img.height * 4 for img in self._level_imgs)
+        if self._known is not None:
+            total += self._known.nbytes
+            total += sum(known.nbytes for known in self._level_known)
+        if self._inpainted is not None:
+            total += self._inpainted.nbytes
+        return total
+
+    def add_chunk(self, data: bytes) -> bool:
+        """
+        Add one chunk payload. Returns True if it added information (a new
+        residual block or the first coarse copy), False for duplicates.
+        Raises ValueError for a chunk of a different object.
+        """
+        mode = detect_mode_from_data(data)
+        parse = {
+            "image": _parse_image_chunk,
+            "audio": _parse_audio_chunk,
+            "binary": _parse_binary_chunk,
+        }[mode]
+        info = parse(data, "<chunk>")
+        if self.mode is None:
+            self._start(mode, info)
+        elif (mode, info["version"]) + self._shape_key(mode, info) != self._key:
+            raise ValueError("Chunk belongs to a different object")
+
+        changed = False
+        if (
+            not self._coarse_ready
+            and info["coarse"]
+            and info["ext"].get(EXT_CONTENT_ID) == self._content_id
+        ):
+            self._set_coarse(info["coarse"])
+            changed = True
+
+        block_id = info["block_id"]
+        if _is_coarse_copy(info) or block_id in self.blocks:
+            return changed
+        fields = _tier_fields(info, "<chunk>")
+        if self._tiers is None and fields is not None:
+            if self.blocks:
+                raise ValueError("Mixed residual tiers")
+            self._tiers = _TieredResidual(self._residual.size, fields[1])
+        pyramid = _level_fields(info, "<chunk>") if mode == "image" else None
+        if self._pyramid is None and pyramid is not None:
+            if self.blocks:
+                raise ValueError("Mixed pyramid and single-level chunks")
+            self._start_pyramid(pyramid[1])
+        elif self._pyramid is not None and (
+            pyramid is None or pyramid[1] != self._pyramid
+        ):
+            raise ValueError("Mixed pyramid and single-level chunks")
+
+        vals_bytes = _decompress(info["resid"], info["codec"])
+        if mode == "binary":
+            vals = np.frombuffer(vals_bytes, dtype=np.uint8)
+        else:
+            layout = _transform_layout(info["ext"], "<chunk>")
+            vals = _decode_residual(vals_bytes, layout)
+        if pyramid is not None:
+            positions = self._place_level(pyramid[0] - 1, block_id, vals)
+        elif self._tiers is not None:
+            positions = self._tiers.add(info, vals, "<chunk>")
+            self._residual[positions] = self._tiers.values(positions)
+        else:
+            n = self._residual.size
+            positions = _block_positions(
+                n, block_id, self.block_count, len(vals), info["version"], self._step
+            )
+            self._residual[positions] = vals[: len(positions)]
+        if self._known is not None and pyramid is None:
+            self._known[positions] = True
+        self.blocks.add(block_id)
+        self._inpainted = None
+        if positions is not None:
+            self._mark_dirty(positions)
+        return True
+
+    def snapshot(self):
+        """Current reconstruction, or None before the first chunk."""
+        if self.mode is None:
+            return None
+        if self.mode == "binary":
+            return self._coarse_up + self._residual.tobytes()
+
+        if self._known is not None and len(self.blocks) < self.block_count:
+            return self._inpainted_snapshot()
+        lo, hi = (0, 255) if self.mode == "image" else (-32768, 32767)
+        if self._stale_level is not None:
+            self._coarse_up = self._rebuild_base().reshape(-1)
+            self._all_dirty = True
+        coarse_up = self._coarse_up
+        if coarse_up is None:
+            coarse_up = np.zeros(self._residual.size, dtype=np.int16)
+        if self._all_dirty or not self.dirty_tracking:
+            recon = coarse_up.astype(np.int32) + self._residual
+            self._recon[:] = np.clip(recon, lo, hi)
+        elif self._pending:
+            idx = np.concatenate(self._pending)
+            recon = coarse_up[idx].astype(np.int32) + self._residual[idx]
+            self._recon[idx] = np.clip(recon, lo, hi)
+        self._pending = []
+        self._pending_len = 0
+        self._all_dirty = False
+        return self._recon.reshape(self._shape).copy()
+
+    def _inpainted_snapshot(self) -> np.ndarray:
+        if self._inpainted is not None:
+            return self._inpainted.copy()
+        c = self._shape[2]
+        residual = self._residual.reshape(self._shape)
+        if self._pyramid is None:
+            base = self._coarse_up
+            if base is None:
+                base = np.zeros(self._residual.size, dtype=np.int16)
+            residual = _inpaint_residual(residual, self._known.reshape(self._shape))
+        else:
+            # as in _decode_image_chunks, the finest level is left as is
+            sizes = [(lh, lw) for lh, lw, _first, _count in self._pyramid]
+            levels = [
+                _inpaint_residual(level.reshape(lh, lw, c), known.reshape(lh, lw, c))
+                for level, known, (lh, lw) in zip(
+                    self._levels, self._level_known, sizes
+                )
+            ]
+            base = _pyramid_predict(self._coarse_img, sizes, levels)
+        recon = base.reshape(self._shape) + residual
+        # the buffered reconstruction has not followed; rebuild it next time
+        self._pending = []
+        self._pending_len = 0
+        self._all_dirty = True
+        self._inpainted = np.clip(recon, 0, 255).astype(np.uint8)
+        return self._inpainted.copy()
+
+    @staticmethod
+    def _shape_key(mode: str, info: dict) -> tuple:
+        if mode == "image":
+            return (info["h"], info["w"], info["c"], info["block_count"])
+        if mode == "audio":
+            return (
+                info["ch"],
+                info["sr"],
+                info["n_frames"],
+                info["block_count"],
+                info["coarse_len"],
+            )
+        return (info["L"], info["block_count"], info["coarse_len"])
+
+    def _start(self, mode: str, info: dict) -> None:
+        self.mode = mode
+        self._key = (mode, info["version"]) + self._shape_key(mode, info)
+        self._content_id = info["ext"].get(EXT_CONTENT_ID)
+        self.block_count = info["block_count"]
+        self._info = info
+        if mode == "image":
+            self._shape = (info["h"], info["w"], info["c"])
+            n = info["h"] * info["w"] * info["c"]
+            self._residual = np.zeros(n, dtype=np.int16)
+            self._recon = np.zeros(n, dtype=np.uint8)
+            if self.inpaint:
+                self._known = np.zeros(n, dtype=bool)
+        elif mode == "audio":
+            if info["sampwidth"] != 2:
+                raise ValueError("Audio chunk has unsupported sampwidth (expected 2)")
+            self._shape = (info["n_frames"], info["ch"])
+            n = info["n_frames"] * info["ch"]
+            self._residual = np.zeros(n, dtype=np.int16)
+            self._recon = np.zeros(n, dtype=np.int16)
+            self.sample_rate = info["sr"]
+        else:
+            n = info["L"] - info["coarse_len"]
+            self._residual = np.zeros(n, dtype=np.uint8)
+            # binary "coarse" is the verbatim prefix; zeros until it arrives
+            self._coarse_up = bytes(info["coarse_len"])
+        self._step = _golden_step(n)
+
+    def _set_coarse(self, payload: bytes) -> None:
+        info = self._info
+        self._coarse_ready = True
+        self._inpainted = None
+        if self.mode == "image":
+            h, w = info["h"], info["w"]
+            coarse_img = Image.open(BytesIO(payload)).convert("RGB")
+            self._coarse_img = coarse_img
+            if self._pyramid is not None:
+                self._stale_level = 0
+                return
+            coarse_up = np.asarray(coarse_img.resize((w, h), Image.BICUBIC))
+        elif self.mode == "audio":
+            coarse = np.frombuffer(zlib.decompress(payload), dtype="<i2")
+            coarse = coarse.reshape(info["coarse_len"], info["ch"])
+            coarse_up = _audio_coarse_up(coarse, info["n_frames"])
+        else:
+            self._coarse_up = zlib.decompress(payload)[: info["coarse_len"]]
+            return
+        self._coarse_up = coarse_up.astype(np.int16).reshape(-1)
+        self._all_dirty = True
+
+    def _start_pyramid(self, table: list) -> None:
+        self._pyramid = table
+        self._levels = [
+            np.zeros(lh * lw * 3, dtype=np.int16) for lh, lw, _f, _c in table[:-1]
+        ]
+        if self._known is not None:
+            self._level_known = [np.zeros(level.size, bool) for level in self._levels]
+        self._stale_level = 0
+
+    def _rebuild_base(self) -> np.ndarray:
+        """
+        Pyramid prediction of the full image. The reconstructed levels are
+        kept between calls, so only those from the lowest level changed
+        since the last rebuild are recomputed (with coarse-first ordering,
+        usually just the one being received), plus the final upsample.
+        """
+        sizes = [(lh, lw) for lh, lw, _first, _count in self._pyramid]
+        start = self._stale_level
+        self._stale_level = None
+        del self._level_imgs[start:]
+        cur = self._level_imgs[-1] if self._level_imgs else self._coarse_img
+        if cur is None:
+            cur = Image.new("RGB", (sizes[0][1], sizes[0][0]))
+        for size, res in zip(sizes[start:-1], self._levels[start:]):
+            cur = _pyramid_level(cur, size, res)
+            self._level_imgs.append(cur)
+        h, w = sizes[-1]
+        return np.asarray(cur.resize((w, h), Image.BICUBIC), dtype=np.int16)
+
+    def _place_level(self, level: int, block_id: int, vals: np.ndarray):
+        """
+        Scatter one pyramid slice. Returns its positions in the output for
+        the last level, None for a lower one (the whole base changes).
+        """
+        _lh, _lw, first, count = self._pyramid[level]
+        last = level == len(self._pyramid) - 1
+        out = self._residual if last else self._levels[level]
+        step = _golden_step(out.size)
+        positions = _golden_block_indices(
+            out.size, block_id - first, count, stop=len(vals), step=step
+        )
+        out[positions] = vals[: len(positions)]
+        if self._known is not None:
+            known = self._known if last else self._level_known[level]
+            known[positions] = True
+        if last:
+            return positions
+        if self._stale_level is None or level < self._stale_level:
+            self._stale_level = level
+        return None
+
+    def _mark_dirty(self, positions: np.ndarray) -> None:
+        if self._all_dirty or not self.dirty_tracking or self.mode == "binary":
+            return
+        self._pending.append(positions)
+        self._pending_len += len(positions)
+        if self._pending_len > self._residual.size // 4:
+            # cheaper to redo everything than to gather this many positions
+            self._all_dirty = True
+            self._pending = []
+            self._pending_len = 0
 
 
 # ===================== AUTOMATIC DISPATCH =====================
@@ -768,12 +3961,14 @@ def detect_mode_from_extension(path: str) -> str:
 
 
 def detect_mode_from_chunk(in_dir: str) -> str:
-    """Infer mode from the magic bytes of the first chunk in a .holo directory."""
-    chunk_files = sorted(glob.glob(os.path.join(in_dir, "chunk_*.holo")))
-    if not chunk_files:
-        raise FileNotFoundError(f"No chunk_*.holo found in {in_dir}")
-    with open(chunk_files[0], "rb") as f:
-        magic = f.read(4)
+    """Infer mode from the magic bytes of the first chunk of a .holo dir or pack."""
+    chunk_files, read_chunk = _chunk_reader(in_dir, max_chunks=1)
+    return detect_mode_from_data(read_chunk(chunk_files[0]))
+
+
+def detect_mode_from_data(chunk: bytes) -> str:
+    """Infer mode from the magic bytes of one chunk payload."""
+    magic = bytes(chunk[:4])
     if magic == MAGIC_IMG:
         return "image"
     if magic == MAGIC_AUD:
@@ -783,16 +3978,92 @@ def detect_mode_from_chunk(in_dir: str) -> str:
     raise ValueError("Unknown chunk type (unexpected magic bytes)")
 
 
+def _pop_option(args: list[str], name: str, default, cast=int):
+    """
+    Remove '--name VALUE' or '--name=VALUE' from args (in place) and
+    return cast(VALUE).
+
+    Returns default when the option is absent; exits with a message if the
+    value is missing or cannot be converted.
+    """
+    for i, arg in enumerate(args):
+        if arg == name:
+            if i + 1 >= len(args):
+                print(f"Missing value for {name}")
+                sys.exit(1)
+            raw = args[i + 1]
+            del args[i: i + 2]
+        elif arg.startswith(name + "="):
+            raw = arg[len(name) + 1:]
+            del args[i]
+        else:
+            continue
+        try:
+            return cast(raw)
+        except ValueError:
+            print(f"Invalid {name} value: {raw!r}")
+            sys.exit(1)
+    return default
+
+
+def _parse_box(text: str) -> tuple[int, int, int, int]:
+    """'left,top,right,bottom' -> tuple of ints (ValueError if malformed)."""
+    parts = text.split(",")
+    if len(parts) != 4:
+        raise ValueError(text)
+    return tuple(int(p) for p in parts)
+
+
+def _pop_flag(args: list[str], name: str) -> bool:
+    """Remove a boolean '--name' flag from args (in place); True if present."""
+    if name in args:
+        args.remove(name)
+        return True
+    return False
+
+
 def main() -> None:
+    args = sys.argv[1:]
+    pack = _pop_flag(args, "--pack")
+    unpack = _pop_flag(args, "--unpack")
+    pyramid = _pop_flag(args, "--pyramid")
+    inpaint = _pop_flag(args, "--inpaint")
+    workers = _pop_option(args, "--workers", 1)
+    memory_mb = _pop_option(args, "--memory-mb", None)
+    compression = _pop_option(args, "--compression", "default", str)
+    residual_transform = _pop_option(args, "--transform", "raw", str)
+    coarse_copies = _pop_option(args, "--coarse-copies", 0)
+    tier_bits = _pop_option(args, "--tier-bits", 0)
+    scale = _pop_option(args, "--scale", 1.0, float)
+    box = _pop_option(args, "--box", None, _parse_box)
+    try:
+        _resolve_compression(compression)
+        _check_transform(residual_transform)
+        _coarse_layout(b"", coarse_copies)
+        _check_tier_bits(tier_bits)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    if tier_bits and memory_mb is not None:
+        print("--tier-bits is not supported with --memory-mb")
+        sys.exit(1)
+    if pyramid and (tier_bits or memory_mb is not None):
+        print("--pyramid cannot be combined with --tier-bits or --memory-mb")
+        sys.exit(1)
+    region = box is not None or scale != 1.0
+    if region and inpaint:
+        print("--inpaint cannot be combined with --box or --scale")
+        sys.exit(1)
+
     # Special mode: stack multiple PNGs into one image, then encode holographically
-    if len(sys.argv) >= 4 and sys.argv[1] == "--stack":
+    if len(args) >= 3 and args[0] == "--stack":
         try:
-            chunk_kb = int(sys.argv[2])
+            chunk_kb = int(args[1])
         except ValueError:
             print("Usage: python3 holo.py --stack <chunk_kb> <frame1.png> [frame2.png ...]")
             sys.exit(1)
 
-        frame_paths = sys.argv[3:]
+        frame_paths = args[2:]
         if not frame_paths:
             print("Usage: python3 holo.py --stack <chunk_kb> <frame1.png> [frame2.png ...]")
             sys.exit(1)
@@ -800,7 +4071,7 @@ def main() -> None:
         first = frame_paths[0]
         base, _ = os.path.splitext(first)
         stacked_png = base + "_stack.png"
-        out_dir = stacked_png + ".holo"
+        out_dir = stacked_png + (PACK_SUFFIX if pack else ".holo")
 
         print(f"[Holo] Stacking frames into {stacked_png}")
         stack_images_average(frame_paths, stacked_png)
@@ -810,55 +4081,170 @@ def main() -> None:
             input_path=stacked_png,
             out_dir=out_dir,
             target_chunk_kb=chunk_kb,
+            compression=compression,
+            workers=workers,
+            residual_transform=residual_transform,
+            coarse_copies=coarse_copies,
+            tier_bits=tier_bits,
+            pyramid=pyramid,
         )
         sys.exit(0)
 
-    if len(sys.argv) not in (2, 3):
+    if len(args) not in (1, 2):
         print("Simple usage:")
         print("  python3 holo.py original_file [chunk_kb]      # creates original_file.holo (directory)")
         print("  python3 holo.py original_file.holo           # reconstructs original_file")
+        print("  python3 holo.py original_file.holopack       # reconstructs from a pack")
         print("  python3 holo.py --stack chunk_kb frame1.png [frame2.png ...]  # stack+encode")
+        print("Options:")
+        print("  --workers N    parallel threads for chunk encoding/decoding (0 = one per CPU)")
+        print("  --memory-mb N  streaming/memory-mapped encode and decode within N MB")
+        print("  --compression P  residual codec preset: default, fast, balanced, archive,")
+        print("                   or codec[:level] with codec zlib/lzma/bz2/zstd")
+        print("  --transform T  image/audio residual layout: raw (default) or planes")
+        print("  --coarse-copies N  send the coarse part in N dedicated chunks instead of")
+        print("                     repeating it in every chunk")
+        print("  --tier-bits N  image/audio: first chunks carry the residual >> N, later")
+        print("                 chunks the low N bits (default compression: zlib 6)")
+        print("  --pyramid      image: add intermediate resolution levels (256, 1024, ...)")
+        print("                 whose residuals fill the first chunks (default")
+        print("                 compression: zlib 6)")
+        print("  --inpaint      image decode: estimate the residual of missing chunks from")
+        print("                 the received ones instead of leaving it at zero")
+        print("  --box L,T,R,B  image decode: only this region (full-resolution pixels)")
+        print("  --scale F      image decode: output scaled by F (0 < F <= 1)")
+        print("  --pack         encode into one original_file.holopack instead of a directory;")
+        print("                 with a .holo directory, convert it to a .holopack")
+        print("  --unpack       convert a .holopack back to a .holo directory")
         sys.exit(1)
 
-    target = sys.argv[1]
+    target = args[0]
     chunk_kb: int | None = None
 
-    if len(sys.argv) == 3:
+    if len(args) == 2:
         try:
-            chunk_kb = int(sys.argv[2])
+            chunk_kb = int(args[1])
         except ValueError:
             print("Invalid chunk_kb value, must be an integer (KB).")
             sys.exit(1)
 
-    if os.path.isfile(target):
+    if unpack:
+        if not is_holo_pack(target):
+            print("Not a .holopack file:", target)
+            sys.exit(1)
+        out_dir = target[: -len(PACK_SUFFIX)] if target.endswith(PACK_SUFFIX) else target
+        out_dir += ".holo"
+        unpack_holo_pack(target, out_dir)
+        print(f"[Holo] Unpacked {target} -> {out_dir}")
+    elif pack and os.path.isdir(target):
+        in_dir = target.rstrip("/")
+        base = in_dir[:-5] if in_dir.endswith(".holo") else in_dir
+        pack_holo_dir(in_dir, base + PACK_SUFFIX)
+        print(f"[Holo] Packed {in_dir} -> {base + PACK_SUFFIX}")
+    elif os.path.isfile(target) and not is_holo_pack(target):
         # Encode
         input_path = target
-        out_dir = input_path + ".holo"
+        out_dir = input_path + (PACK_SUFFIX if pack else ".holo")
         mode = detect_mode_from_extension(input_path)
 
-        if mode == "image":
-            encode_image_holo_dir(input_path, out_dir, target_chunk_kb=chunk_kb)
+        if mode == "image" and memory_mb is not None:
+            encode_image_holo_dir_streaming(
+                input_path,
+                out_dir,
+                target_chunk_kb=chunk_kb,
+                compression=compression,
+                memory_budget_mb=memory_mb,
+                workers=workers,
+                coarse_copies=coarse_copies,
+                residual_transform=residual_transform,
+            )
+        elif mode == "image":
+            encode_image_holo_dir(
+                input_path,
+                out_dir,
+                target_chunk_kb=chunk_kb,
+                compression=compression,
+                workers=workers,
+                coarse_copies=coarse_copies,
+                residual_transform=residual_transform,
+                tier_bits=tier_bits,
+                pyramid=pyramid,
+            )
+        elif mode == "audio" and memory_mb is not None:
+            encode_audio_holo_dir_streaming(
+                input_path,
+                out_dir,
+                target_chunk_kb=chunk_kb,
+                compression=compression,
+                memory_budget_mb=memory_mb,
+                workers=workers,
+                coarse_copies=coarse_copies,
+                residual_transform=residual_transform,
+            )
         elif mode == "audio":
-            encode_audio_holo_dir(input_path, out_dir, target_chunk_kb=chunk_kb)
+            encode_audio_holo_dir(
+                input_path,
+                out_dir,
+                target_chunk_kb=chunk_kb,
+                compression=compression,
+                workers=workers,
+                coarse_copies=coarse_copies,
+                residual_transform=residual_transform,
+                tier_bits=tier_bits,
+            )
+        elif memory_mb is not None:
+            encode_binary_holo_dir_streaming(
+                input_path,
+                out_dir,
+                target_chunk_kb=chunk_kb,
+                compression=compression,
+                memory_budget_mb=memory_mb,
+                workers=workers,
+                coarse_copies=coarse_copies,
+            )
         else:
-            encode_binary_holo_dir(input_path, out_dir, target_chunk_kb=chunk_kb)
-
-    elif os.path.isdir(target):
-        # Decode
+            encode_binary_holo_dir(
+                input_path,
+                out_dir,
+                target_chunk_kb=chunk_kb,
+                compression=compression,
+                workers=workers,
+                coarse_copies=coarse_copies,
+            )
+    elif os.path.exists(target):
+        # Decode (.holo directory or .holopack file)
         in_dir = target.rstrip("/")
         if in_dir.endswith(".holo"):
             output_path = in_dir[:-5]  # strip ".holo" and restore original name
+        elif in_dir.endswith(PACK_SUFFIX):
+            output_path = in_dir[: -len(PACK_SUFFIX)]
         else:
             output_path = in_dir + "_dec"  # fallback
 
         mode = detect_mode_from_chunk(in_dir)
 
-        if mode == "image":
-            decode_image_holo_dir(in_dir, output_path)
+        if mode == "image" and region:
+            try:
+                decode_image_region_holo_dir(
+                    in_dir, output_path, box=box, scale=scale, workers=workers
+                )
+            except ValueError as e:
+                print(e)
+                sys.exit(1)
+        elif mode == "image":
+            decode_image_holo_dir(in_dir, output_path, workers=workers, inpaint=inpaint)
+        elif mode == "audio" and memory_mb is not None:
+            decode_audio_holo_dir_streaming(
+                in_dir, output_path, memory_budget_mb=memory_mb, workers=workers
+            )
         elif mode == "audio":
-            decode_audio_holo_dir(in_dir, output_path)
+            decode_audio_holo_dir(in_dir, output_path, workers=workers)
+        elif memory_mb is not None:
+            decode_binary_holo_dir_streaming(
+                in_dir, output_path, memory_budget_mb=memory_mb, workers=workers
+            )
         else:
-            decode_binary_holo_dir(in_dir, output_path)
+            decode_binary_holo_dir(in_dir, output_path, workers=workers)
     else:
         print("Path not found:", target)
         sys.exit(1)
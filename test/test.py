@@ -3,21 +3,26 @@
 Resilience test for Holo.Codec + golden permutation.
 
 Usage:
-    python3 test_resilience.py image.png \
-        --block-count 32 \
-        --trials 50
+    python3 test_resilience.py image.png [block_count] [trials] [tier_bits]
 
 Crea image.png.holo (se non esiste già), poi per k = 1..B:
   - sceglie 'trials' volte un sottoinsieme casuale di k chunk
   - decodifica solo con quei chunk
   - calcola MSE e PSNR rispetto all'immagine originale
+  - decodifica anche i primi k chunk (ordine di invio, trial "first")
 Scrive tutto in un CSV e stampa la media per ogni k.
+
+Con tier_bits > 0 i chunk sono a livelli (holo tier_bits): i primi
+portano il residuo >> tier_bits, gli altri i bit bassi. In quel caso
+controlla anche che la codifica a livelli non sia molto più lenta di
+quella normale.
 """
 
 import os
 import sys
 import csv
 import math
+import time
 import shutil
 import random
 import tempfile
@@ -48,34 +53,86 @@ def mse_psnr(orig: np.ndarray, recon: np.ndarray) -> tuple[float, float]:
     return mse, psnr
 
 
-def ensure_holo_dir(input_path: str, block_count: int | None) -> str:
+def ensure_holo_dir(
+    input_path: str, block_count: int | None, tier_bits: int = 0
+) -> str:
     """
     Se input_path.holo esiste lo riusa, altrimenti richiama encode_image_holo_dir.
-    Restituisce il path della directory .holo.
+    Restituisce il path della directory .holo (input_path.tN.holo con tier_bits).
     """
-    out_dir = input_path + ".holo"
+    suffix = f".t{tier_bits}" if tier_bits else ""
+    out_dir = input_path + suffix + ".holo"
     if not os.path.isdir(out_dir):
         os.makedirs(out_dir, exist_ok=True)
         holo.encode_image_holo_dir(
             input_path=input_path,
             out_dir=out_dir,
             block_count=block_count if block_count is not None else 32,
+            tier_bits=tier_bits,
         )
     return out_dir
 
 
+def encode_seconds(orig: np.ndarray, block_count: int, tier_bits: int) -> float:
+    """Tempo di una codifica in memoria (encode_image, opzioni di default)."""
+    start = time.perf_counter()
+    holo.encode_image(orig, block_count=block_count, tier_bits=tier_bits)
+    return time.perf_counter() - start
+
+
+def check_encode_time(
+    orig: np.ndarray, block_count: int, tier_bits: int, max_ratio: float = 2.0
+) -> bool:
+    """
+    Confronta il tempo di codifica con e senza livelli. Con le opzioni di
+    default la codifica a livelli non deve costare più di max_ratio volte
+    quella normale; altrimenti stampa un avviso e restituisce False.
+    """
+    plain = encode_seconds(orig, block_count, 0)
+    tiered = encode_seconds(orig, block_count, tier_bits)
+    ratio = tiered / plain if plain > 0 else 0.0
+    print(
+        f"[Check] encode: {plain:.2f} s without tiers, {tiered:.2f} s with "
+        f"tier_bits={tier_bits} ({ratio:.2f}x)"
+    )
+    if ratio > max_ratio:
+        print(f"[Warn] tiered encode is more than {max_ratio:.1f}x slower")
+        return False
+    return True
+
+
+def decode_subset(paths: list[str], k: int) -> np.ndarray:
+    """Decodifica solo i chunk in paths, copiati in una directory temporanea."""
+    tmp_dir = tempfile.mkdtemp(prefix="holo_k{}_".format(k))
+    try:
+        for src in paths:
+            dst = os.path.join(tmp_dir, os.path.basename(src))
+            shutil.copy2(src, dst)
+
+        recon_path = os.path.join(tmp_dir, "recon.png")
+        holo.decode_image_holo_dir(tmp_dir, recon_path)
+        return load_rgb(recon_path)
+    finally:
+        # pulizia della directory temporanea
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
 def run_resilience_test(
     image_path: str,
     block_count: int | None = None,
     trials: int = 50,
     seed: int = 1234,
+    tier_bits: int = 0,
 ) -> None:
     random.seed(seed)
 
     orig = load_rgb(image_path)
     h, w, _ = orig.shape
 
-    holo_dir = ensure_holo_dir(image_path, block_count)
+    if tier_bits:
+        check_encode_time(orig, block_count or 32, tier_bits)
+
+    holo_dir = ensure_holo_dir(image_path, block_count, tier_bits)
 
     chunk_files = sorted(
         f for f in os.listdir(holo_dir) if f.startswith("chunk_") and f.endswith(".holo")
@@ -91,7 +148,8 @@ def run_resilience_test(
     full_paths = [os.path.join(holo_dir, f) for f in chunk_files]
 
     base_name = os.path.splitext(os.path.basename(image_path))[0]
-    csv_path = f"resilience_{base_name}.csv"
+    suffix = f"_t{tier_bits}" if tier_bits else ""
+    csv_path = f"resilience_{base_name}{suffix}.csv"
 
     with open(csv_path, "w", newline="") as csvfile:
         writer = csv.writer(csvfile)
@@ -105,28 +163,19 @@ def run_resilience_test(
             for t in range(trials):
                 chosen = random.sample(full_paths, k)
 
-                # directory temporanea con solo i chunk scelti
-                tmp_dir = tempfile.mkdtemp(prefix="holo_k{}_".format(k))
-                try:
-                    for src in chosen:
-                        dst = os.path.join(tmp_dir, os.path.basename(src))
-                        shutil.copy2(src, dst)
-
-                    recon_path = os.path.join(tmp_dir, "recon.png")
-                    holo.decode_image_holo_dir(tmp_dir, recon_path)
-
-                    recon = load_rgb(recon_path)
-                    if recon.shape != orig.shape:
-                        print("[Warn] Shape mismatch, skipping one sample")
-                        continue
-
-                    mse, psnr = mse_psnr(orig, recon)
-                    mse_vals.append(mse)
-                    psnr_vals.append(psnr)
-                    writer.writerow([k, t, mse, psnr])
-                finally:
-                    # pulizia della directory temporanea
-                    shutil.rmtree(tmp_dir, ignore_errors=True)
+                recon = decode_subset(chosen, k)
+                if recon.shape != orig.shape:
+                    print("[Warn] Shape mismatch, skipping one sample")
+                    continue
+
+                mse, psnr = mse_psnr(orig, recon)
+                mse_vals.append(mse)
+                psnr_vals.append(psnr)
+                writer.writerow([k, t, mse, psnr])
+
+            # i primi k chunk: quello che arriva se la trasmissione si interrompe
+            first_mse, first_psnr = mse_psnr(orig, decode_subset(full_paths[:k], k))
+            writer.writerow([k, "first", first_mse, first_psnr])
 
             if mse_vals:
                 mse_mean = sum(mse_vals) / len(mse_vals)
@@ -137,13 +186,17 @@ def run_resilience_test(
                 )
             else:
                 print(f"[Result] k={k}  no valid samples")
+            print(f"[Result] k={k}  first-k PSNR={first_psnr:.2f} dB")
 
     print(f"[Test] Done. Results written to {csv_path}")
 
 
 def main() -> None:
     if len(sys.argv) < 2:
-        print("Usage: python3 test_resilience.py image.png [block_count] [trials]")
+        print(
+            "Usage: python3 test_resilience.py image.png "
+            "[block_count] [trials] [tier_bits]"
+        )
         sys.exit(1)
 
     image_path = sys.argv[1]
@@ -168,7 +221,17 @@ def main() -> None:
             print("trials must be integer")
             sys.exit(1)
 
-    run_resilience_test(image_path, block_count=block_count, trials=trials)
+    tier_bits = 0
+    if len(sys.argv) >= 5:
+        try:
+            tier_bits = int(sys.argv[4])
+        except ValueError:
+            print("tier_bits must be integer")
+            sys.exit(1)
+
+    run_resilience_test(
+        image_path, block_count=block_count, trials=trials, tier_bits=tier_bits
+    )
 
 
 if __name__ == "__main__":
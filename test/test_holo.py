@@ -0,0 +1,658 @@
+"""
+Unit checks for holo.py (run with pytest from the repo root).
+"""
+
+import os
+import math
+import sys
+
+import numpy as np
+import pytest
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import holo  # noqa: E402
+
+
+def _golden_permutation(n: int) -> np.ndarray:
+    """Reference layout: perm[i] = (i * step) mod n, built in full."""
+    if n <= 1:
+        return np.zeros(max(n, 0), dtype=np.int64)
+    return (np.arange(n, dtype=np.int64) * holo._golden_step(n)) % n
+
+
+def _test_image(path: str, h: int = 48, w: int = 64) -> np.ndarray:
+    rng = np.random.default_rng(h * w)
+    ramp = np.linspace(0, 200, w)[None, :, None]
+    arr = (rng.random((h, w, 3)) * 50 + ramp).astype(np.uint8)
+    Image.fromarray(arr, "RGB").save(path)
+    return arr
+
+
+@pytest.mark.parametrize("n", [1, 2, 7, 100, 1000, 4096, 12345])
+@pytest.mark.parametrize("block_count", [1, 3, 32])
+def test_golden_block_indices_match_the_permutation(n, block_count):
+    perm = _golden_permutation(n)
+    step = holo._golden_step(n)
+    for block_id in range(block_count):
+        expected = perm[block_id::block_count]
+        assert holo._golden_block_size(n, block_id, block_count) == len(expected)
+        got = holo._golden_block_indices(n, block_id, block_count, step=step)
+        np.testing.assert_array_equal(got, expected)
+        got = holo._golden_block_indices(n, block_id, block_count, start=2, stop=5)
+        np.testing.assert_array_equal(got, expected[2:5])
+
+
+def test_golden_permutation_is_a_permutation():
+    for n in (2, 10, 97, 1024, 9999):
+        assert sorted(_golden_permutation(n).tolist()) == list(range(n))
+
+
+def test_mulmod_past_int64_products():
+    n = 2**40 + 15
+    b = holo._golden_step(n)
+    a = np.array([0, 1, 12345, n // 3, n - 1], dtype=np.int64)
+    expected = [(int(x) * b) % n for x in a]
+    assert holo._mulmod(a, b, n).tolist() == expected
+
+
+def test_image_roundtrip_is_lossless(tmp_path):
+    arr = _test_image(str(tmp_path / "a.png"))
+    out_dir = str(tmp_path / "a.holo")
+    holo.encode_image_holo_dir(str(tmp_path / "a.png"), out_dir, block_count=8)
+    holo.decode_image_holo_dir(out_dir, str(tmp_path / "r.png"))
+    np.testing.assert_array_equal(holo.load_image(str(tmp_path / "r.png")), arr)
+
+
+def _dir_bytes(path: str) -> dict:
+    return {
+        name: open(os.path.join(path, name), "rb").read()
+        for name in sorted(os.listdir(path))
+    }
+
+
+@pytest.mark.parametrize("ext", [".png", ".ppm", ".bmp", ".tif"])
+def test_streaming_image_encoder_matches_encode_image(tmp_path, monkeypatch, ext):
+    src = str(tmp_path / ("a" + ext))
+    _test_image(src, h=96, w=130)
+    holo.encode_image_holo_dir(src, str(tmp_path / "ref"), block_count=7)
+
+    # Shrink the budget's unit so 1 MB means a dozen column strips and
+    # two-row bands: every strip and band boundary is exercised.
+    monkeypatch.setattr(holo, "_STREAM_BYTES_PER_SAMPLE", 300)
+    monkeypatch.setattr(holo, "_BAND_BYTES_PER_SAMPLE", 1300)
+    holo.encode_image_holo_dir_streaming(
+        src, str(tmp_path / "out"), block_count=7, memory_budget_mb=1, workers=2
+    )
+    assert _dir_bytes(str(tmp_path / "out")) == _dir_bytes(str(tmp_path / "ref"))
+
+
+def _test_wav(path: str, n_frames: int = 10007, ch: int = 2, sampwidth: int = 2):
+    import wave
+
+    rng = np.random.default_rng(n_frames)
+    t = np.arange(n_frames)[:, None]
+    tone = 8000 * np.sin(t * np.array([0.01, 0.013])[:ch])
+    data = (tone + rng.normal(0, 300, (n_frames, ch))).astype("<i4")
+    if sampwidth == 3:
+        raw = (data << 8).view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+    else:
+        raw = data.astype("<i2").tobytes()
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(ch)
+        wf.setsampwidth(sampwidth)
+        wf.setframerate(8000)
+        wf.writeframes(raw)
+
+
+@pytest.mark.parametrize("ch,sampwidth", [(1, 2), (2, 2), (2, 3)])
+def test_streaming_audio_matches_non_streaming(tmp_path, monkeypatch, ch, sampwidth):
+    src = str(tmp_path / "a.wav")
+    _test_wav(src, ch=ch, sampwidth=sampwidth)
+    holo.encode_audio_holo_dir(src, str(tmp_path / "ref"), block_count=5)
+
+    # about 1300-frame windows at 1 MB: several windows and a partial one
+    monkeypatch.setattr(holo, "_STREAM_BYTES_PER_SAMPLE", 400 // ch)
+    holo.encode_audio_holo_dir_streaming(
+        src, str(tmp_path / "out"), block_count=5, memory_budget_mb=1, workers=2
+    )
+    assert _dir_bytes(str(tmp_path / "out")) == _dir_bytes(str(tmp_path / "ref"))
+
+    for max_chunks in (None, 3):
+        ref, out = str(tmp_path / "ref.wav"), str(tmp_path / "out.wav")
+        holo.decode_audio_holo_dir(str(tmp_path / "ref"), ref, max_chunks=max_chunks)
+        holo.decode_audio_holo_dir_streaming(
+            str(tmp_path / "ref"), out, max_chunks=max_chunks, memory_budget_mb=1
+        )
+        assert open(out, "rb").read() == open(ref, "rb").read()
+
+
+def test_streaming_binary_matches_non_streaming(tmp_path):
+    src = str(tmp_path / "a.bin")
+    rng = np.random.default_rng(6)
+    # compressible bytes, long enough for several 64 KB pieces per block
+    data = (rng.integers(0, 16, 300_001) * 7).astype(np.uint8).tobytes()
+    open(src, "wb").write(data)
+    holo.encode_binary_holo_dir(src, str(tmp_path / "ref"), block_count=2)
+    holo.encode_binary_holo_dir_streaming(
+        src, str(tmp_path / "out"), block_count=2, memory_budget_mb=1, workers=2
+    )
+    assert _dir_bytes(str(tmp_path / "out")) == _dir_bytes(str(tmp_path / "ref"))
+
+    for max_chunks in (None, 1):
+        ref, out = str(tmp_path / "ref.bin"), str(tmp_path / "out.bin")
+        holo.decode_binary_holo_dir(str(tmp_path / "ref"), ref, max_chunks=max_chunks)
+        holo.decode_binary_holo_dir_streaming(
+            str(tmp_path / "ref"), out, max_chunks=max_chunks, memory_budget_mb=1
+        )
+        restored = open(out, "rb").read()
+        assert restored == open(ref, "rb").read()
+        assert (restored == data) == (max_chunks is None)
+
+
+COMPRESSIONS = sorted(holo.COMPRESSION_PRESETS) + sorted(holo._CODECS) + ["bz2:1"]
+
+
+def _restored(mode: str, path: str) -> bytes:
+    """Decoded content of an output file: pixels, PCM samples or raw bytes."""
+    if mode == "image":
+        return holo.load_image(path).tobytes()
+    if mode == "audio":
+        return holo._read_wav_int16(path)[0].tobytes()
+    return open(path, "rb").read()
+
+
+def _encode_decode(mode: str, tmp_path, **kw) -> tuple[bytes, bytes]:
+    """Encode a small sample of mode, decode all chunks; (source, restored) bytes."""
+    out_dir = str(tmp_path / f"{mode}.holo")
+    if mode == "image":
+        src, dst = str(tmp_path / "a.png"), str(tmp_path / "r.png")
+        arr = _test_image(src)
+        holo.encode_image_holo_dir(src, out_dir, block_count=5, **kw)
+        holo.decode_image_holo_dir(out_dir, dst)
+        return arr.tobytes(), _restored(mode, dst)
+    if mode == "audio":
+        src, dst = str(tmp_path / "a.wav"), str(tmp_path / "r.wav")
+        _test_wav(src, n_frames=3001)
+        holo.encode_audio_holo_dir(src, out_dir, block_count=5, **kw)
+        holo.decode_audio_holo_dir(out_dir, dst)
+        return _restored(mode, src), _restored(mode, dst)
+    src, dst = str(tmp_path / "a.bin"), str(tmp_path / "r.bin")
+    data = bytes(range(256)) * 40 + b"tail"
+    open(src, "wb").write(data)
+    holo.encode_binary_holo_dir(src, out_dir, block_count=5, coarse_len=100, **kw)
+    holo.decode_binary_holo_dir(out_dir, dst)
+    return data, _restored(mode, dst)
+
+
+_ENCODERS = {
+    "image": (holo.encode_image_holo_dir, holo.decode_image_holo_dir, "a.png"),
+    "audio": (holo.encode_audio_holo_dir, holo.decode_audio_holo_dir, "a.wav"),
+    "binary": (holo.encode_binary_holo_dir, holo.decode_binary_holo_dir, "a.bin"),
+}
+
+
+@pytest.mark.parametrize("mode", ["image", "audio", "binary"])
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+def test_roundtrip_per_codec_and_preset(tmp_path, mode, compression):
+    src, restored = _encode_decode(mode, tmp_path, compression=compression)
+    assert restored == src
+
+
+def test_unknown_compression_is_rejected():
+    with pytest.raises(ValueError):
+        holo._resolve_compression("snappy")
+
+
+def test_v3_fields_roundtrip_and_bounds():
+    ext = {1: b"abc", 7: b""}
+    data = b"xx" + holo._pack_v3_fields(holo.CODEC_LZMA, ext) + b"payload"
+    assert holo._parse_v3_fields(data, 2) == (holo.CODEC_LZMA, ext, len(data) - 7)
+
+    with pytest.raises(ValueError):  # header cut short
+        holo._parse_v3_fields(data[:4], 2)
+    with pytest.raises(ValueError):  # extension area past the end
+        holo._parse_v3_fields(data[:10], 2)
+    bad = bytearray(data)
+    bad[6] = 200  # length of field 1, now past the extension area
+    with pytest.raises(ValueError):
+        holo._parse_v3_fields(bytes(bad), 2)
+
+
+# fixed header length before the v3 fields, per magic
+_V2_HEADER_LEN = {holo.MAGIC_IMG: 30, holo.MAGIC_AUD: 36, holo.MAGIC_BIN: 33}
+
+
+def _as_v2_chunk(data: bytes) -> bytes:
+    """Rewrite a zlib v3 chunk in the v2 layout (no codec id or ext fields)."""
+    hdr = _V2_HEADER_LEN[data[:4]]
+    codec_id, _ext, off = holo._parse_v3_fields(data, hdr)
+    assert codec_id == holo.CODEC_ZLIB
+    return data[:4] + bytes([2]) + data[5:hdr] + data[off:]
+
+
+@pytest.mark.parametrize("mode", ["image", "audio", "binary"])
+def test_v2_chunks_still_decode(tmp_path, mode):
+    src, _ = _encode_decode(mode, tmp_path)
+    v3_dir, v2_dir = tmp_path / f"{mode}.holo", tmp_path / "v2.holo"
+    v2_dir.mkdir()
+    for name, data in _dir_bytes(str(v3_dir)).items():
+        (v2_dir / name).write_bytes(_as_v2_chunk(data))
+
+    _encode, decode, name = _ENCODERS[mode]
+    out = str(tmp_path / ("v2" + os.path.splitext(name)[1]))
+    decode(str(v2_dir), out)
+    assert _restored(mode, out) == src
+
+
+def test_zigzag_covers_int16():
+    vals = np.arange(-32768, 32768, dtype=np.int32).astype(np.int16)
+    z = holo._zigzag(vals)
+    assert sorted(z.tolist()) == list(range(65536))
+    np.testing.assert_array_equal(holo._unzigzag(z), vals)
+
+
+@pytest.mark.parametrize("bound,layout", [(100, 2), (3000, 1)])
+def test_residual_planes_roundtrip(bound, layout):
+    rng = np.random.default_rng(bound)
+    vals = rng.integers(-bound, bound, 5000).astype(np.int16)
+    comp, ext = holo._encode_residual(vals, "planes", holo.CODEC_ZLIB, 6)
+    assert holo._transform_layout(ext, "test") == layout
+
+    def pieces():
+        return (vals[k: k + 777] for k in range(0, len(vals), 777))
+
+    piecewise = holo._encode_residual_pieces(pieces, "planes", holo.CODEC_ZLIB, 6)
+    assert piecewise == (comp, ext)
+    np.testing.assert_array_equal(
+        holo._decode_residual(holo._decompress(comp), layout), vals
+    )
+
+    # piecewise scatter, with pieces that straddle the low/high plane boundary
+    out = np.zeros(len(vals), dtype=np.int16)
+    holo._scatter_residual_pieces(
+        out, comp, holo.CODEC_ZLIB, layout, len(vals), 999, lambda a, b: np.arange(a, b)
+    )
+    np.testing.assert_array_equal(out, vals)
+
+
+@pytest.mark.parametrize("mode", ["image", "audio"])
+@pytest.mark.parametrize("compression", ["default", "lzma"])
+def test_roundtrip_with_planes_transform(tmp_path, mode, compression):
+    src, restored = _encode_decode(
+        mode, tmp_path, compression=compression, residual_transform="planes"
+    )
+    assert restored == src
+
+
+def test_streaming_encoders_match_with_planes_transform(tmp_path, monkeypatch):
+    kw = dict(block_count=5, residual_transform="planes")
+    _test_image(str(tmp_path / "a.ppm"), h=60, w=90)
+    _test_wav(str(tmp_path / "a.wav"))
+    holo.encode_image_holo_dir(str(tmp_path / "a.ppm"), str(tmp_path / "i1"), **kw)
+    holo.encode_audio_holo_dir(str(tmp_path / "a.wav"), str(tmp_path / "a1"), **kw)
+
+    monkeypatch.setattr(holo, "_STREAM_BYTES_PER_SAMPLE", 200)
+    monkeypatch.setattr(holo, "_BAND_BYTES_PER_SAMPLE", 2000)
+    holo.encode_image_holo_dir_streaming(
+        str(tmp_path / "a.ppm"), str(tmp_path / "i2"), memory_budget_mb=1, **kw
+    )
+    holo.encode_audio_holo_dir_streaming(
+        str(tmp_path / "a.wav"), str(tmp_path / "a2"), memory_budget_mb=1, **kw
+    )
+    assert _dir_bytes(str(tmp_path / "i2")) == _dir_bytes(str(tmp_path / "i1"))
+    assert _dir_bytes(str(tmp_path / "a2")) == _dir_bytes(str(tmp_path / "a1"))
+
+    ref, out = str(tmp_path / "ref.wav"), str(tmp_path / "out.wav")
+    holo.decode_audio_holo_dir(str(tmp_path / "a1"), ref)
+    holo.decode_audio_holo_dir_streaming(str(tmp_path / "a1"), out, memory_budget_mb=1)
+    assert open(out, "rb").read() == open(ref, "rb").read()
+
+
+def _pack_chunks(pack_path: str) -> dict:
+    """Chunks of a pack, keyed like _dir_bytes."""
+    with holo.HoloPack(pack_path) as pack:
+        return {
+            f"chunk_{block_id:04d}.holo": pack.chunk(i)
+            for i, block_id in enumerate(pack.block_ids)
+        }
+
+
+@pytest.mark.parametrize("mode", ["image", "audio", "binary"])
+def test_pack_holds_the_directory_chunks(tmp_path, mode):
+    _encode_decode(mode, tmp_path)  # writes the source and <mode>.holo
+    encode, decode, name = _ENCODERS[mode]
+    src, holo_dir = str(tmp_path / name), str(tmp_path / f"{mode}.holo")
+    pack = str(tmp_path / "a.holopack")
+    kw = {"coarse_len": 100} if mode == "binary" else {}
+    encode(src, pack, block_count=5, **kw)
+
+    chunks = _dir_bytes(holo_dir)
+    assert holo.is_holo_pack(pack) and not holo.is_holo_pack(holo_dir)
+    assert _pack_chunks(pack) == chunks
+    assert holo.detect_mode_from_chunk(pack) == mode
+    # the coarse payload is stored once, not in every chunk
+    assert os.path.getsize(pack) < sum(len(c) for c in chunks.values())
+
+    ext = os.path.splitext(name)[1]
+    from_dir, from_pack = tmp_path / ("d" + ext), tmp_path / ("p" + ext)
+    for max_chunks in (None, 2):
+        decode(holo_dir, str(from_dir), max_chunks=max_chunks)
+        decode(pack, str(from_pack), max_chunks=max_chunks)
+        assert from_pack.read_bytes() == from_dir.read_bytes()
+
+
+def test_pack_and_unpack_roundtrip(tmp_path):
+    _encode_decode("image", tmp_path)
+    pack = str(tmp_path / "a.holopack")
+    holo.pack_holo_dir(str(tmp_path / "image.holo"), pack)
+    holo.unpack_holo_pack(pack, str(tmp_path / "back.holo"))
+    assert _dir_bytes(str(tmp_path / "back.holo")) == _dir_bytes(
+        str(tmp_path / "image.holo")
+    )
+    with pytest.raises(ValueError):
+        holo.pack_holo_dir(str(tmp_path / "image.holo"), str(tmp_path / "a.pack"))
+
+
+def test_streaming_encoder_writes_packs(tmp_path):
+    _test_image(str(tmp_path / "a.ppm"), h=60, w=90)
+    holo.encode_image_holo_dir(str(tmp_path / "a.ppm"), str(tmp_path / "ref"))
+    pack = str(tmp_path / "a.holopack")
+    holo.encode_image_holo_dir_streaming(str(tmp_path / "a.ppm"), pack, workers=3)
+    assert _pack_chunks(pack) == _dir_bytes(str(tmp_path / "ref"))
+    assert sorted(os.listdir(tmp_path)) == ["a.holopack", "a.ppm", "ref"]
+
+
+def test_damaged_packs_are_rejected(tmp_path):
+    _encode_decode("binary", tmp_path)
+    pack = tmp_path / "a.holopack"
+    holo.pack_holo_dir(str(tmp_path / "binary.holo"), str(pack))
+    data = pack.read_bytes()
+
+    for damaged in (data[:10], data[:-5], b"NOPE" + data[4:]):
+        pack.write_bytes(damaged)
+        with pytest.raises(ValueError):
+            holo.HoloPack(str(pack))
+
+
+@pytest.mark.parametrize("mode", ["image", "audio", "binary"])
+def test_coarse_copies_roundtrip_and_survive_losses(tmp_path, mode):
+    src, restored = _encode_decode(mode, tmp_path, coarse_copies=2)
+    assert restored == src
+
+    _encode, decode, name = _ENCODERS[mode]
+    holo_dir = tmp_path / f"{mode}.holo"
+    names = sorted(os.listdir(holo_dir))
+    assert len(names) == 2 + 5  # coarse chunks first, then the residual
+
+    out = str(tmp_path / ("out" + os.path.splitext(name)[1]))
+    (holo_dir / names[0]).unlink()  # one coarse copy is enough
+    decode(str(holo_dir), out)
+    assert _restored(mode, out) == src
+
+    (holo_dir / names[1]).unlink()  # none left: residual only, still decodes
+    decode(str(holo_dir), out)
+    assert _restored(mode, out) != src
+
+
+def test_streaming_encoder_with_coarse_copies(tmp_path):
+    _test_image(str(tmp_path / "a.ppm"), h=60, w=90)
+    kw = dict(block_count=4, coarse_copies=3)
+    holo.encode_image_holo_dir(str(tmp_path / "a.ppm"), str(tmp_path / "ref"), **kw)
+    holo.encode_image_holo_dir_streaming(
+        str(tmp_path / "a.ppm"), str(tmp_path / "out"), **kw
+    )
+    assert len(os.listdir(tmp_path / "ref")) == 7
+    assert _dir_bytes(str(tmp_path / "out")) == _dir_bytes(str(tmp_path / "ref"))
+
+
+def test_in_memory_image_api(tmp_path):
+    arr = _test_image(str(tmp_path / "a.png"))
+    holo.encode_image_holo_dir(str(tmp_path / "a.png"), str(tmp_path / "a.holo"), 6)
+    chunks = holo.encode_image(arr, block_count=6)
+    assert chunks == list(_dir_bytes(str(tmp_path / "a.holo")).values())
+    assert holo.detect_mode_from_data(chunks[0]) == "image"
+    np.testing.assert_array_equal(holo.decode_image(chunks), arr)
+
+    # any order, any subset: same as decoding the same files from disk
+    subset = [chunks[4], chunks[1], chunks[3]]
+    for i in (0, 2, 5):
+        os.remove(tmp_path / "a.holo" / f"chunk_{i:04d}.holo")
+    holo.decode_image_holo_dir(str(tmp_path / "a.holo"), str(tmp_path / "r.png"))
+    np.testing.assert_array_equal(
+        holo.decode_image(subset), holo.load_image(str(tmp_path / "r.png"))
+    )
+
+    with pytest.raises(ValueError):
+        holo.encode_image(arr[:, :, 0])
+    with pytest.raises(ValueError):
+        holo.decode_image([])
+
+
+def test_in_memory_audio_api(tmp_path):
+    _test_wav(str(tmp_path / "a.wav"), n_frames=4000)
+    audio, sr = holo.load_wav(str(tmp_path / "a.wav"))
+    assert audio.shape == (4000, 2) and sr == 8000
+    holo.encode_audio_holo_dir(str(tmp_path / "a.wav"), str(tmp_path / "a.holo"), 4)
+    chunks = holo.encode_audio(audio, sr, block_count=4)
+    assert chunks == list(_dir_bytes(str(tmp_path / "a.holo")).values())
+    assert holo.detect_mode_from_data(chunks[0]) == "audio"
+
+    restored, restored_sr = holo.decode_audio(chunks[::-1])
+    np.testing.assert_array_equal(restored, audio)
+    assert restored_sr == sr
+    holo.save_wav(restored, str(tmp_path / "r.wav"), sr)
+    assert (tmp_path / "r.wav").read_bytes() == (tmp_path / "a.wav").read_bytes()
+
+
+def test_in_memory_binary_api(tmp_path):
+    data = bytes(range(256)) * 30
+    (tmp_path / "a.bin").write_bytes(data)
+    holo.encode_binary_holo_dir(str(tmp_path / "a.bin"), str(tmp_path / "a.holo"), 3)
+    chunks = holo.encode_binary(data, block_count=3)
+    assert chunks == list(_dir_bytes(str(tmp_path / "a.holo")).values())
+    assert holo.detect_mode_from_data(chunks[0]) == "binary"
+    assert holo.decode_binary(chunks) == data
+    assert holo.decode_binary(chunks, max_chunks=2) != data
+    with pytest.raises(ValueError):
+        holo.detect_mode_from_data(b"nope")
+
+
+def _memory_chunks(mode: str, tmp_path, **kw) -> tuple[list[bytes], object]:
+    """(chunks, decode) of a small sample of mode, encoded in memory."""
+    if mode == "image":
+        arr = _test_image(str(tmp_path / "a.png"))
+        return holo.encode_image(arr, block_count=6, **kw), holo.decode_image
+    if mode == "audio":
+        _test_wav(str(tmp_path / "a.wav"), n_frames=3001)
+        audio, sr = holo.load_wav(str(tmp_path / "a.wav"))
+        chunks = holo.encode_audio(audio, sr, block_count=6, **kw)
+        return chunks, lambda chunks: holo.decode_audio(chunks)[0]
+    data = bytes(range(256)) * 30
+    return holo.encode_binary(data, block_count=6, **kw), holo.decode_binary
+
+
+@pytest.mark.parametrize("mode", ["image", "audio", "binary"])
+@pytest.mark.parametrize("coarse_copies", [0, 2])
+@pytest.mark.parametrize("dirty_tracking", [True, False])
+def test_progressive_snapshots_match_decode(
+    tmp_path, mode, coarse_copies, dirty_tracking
+):
+    chunks, decode = _memory_chunks(mode, tmp_path, coarse_copies=coarse_copies)
+    order = np.random.default_rng(12).permutation(len(chunks))
+    dec = holo.ProgressiveDecoder(dirty_tracking=dirty_tracking)
+    assert dec.snapshot() is None
+
+    received = []
+    for i in order:
+        # chunks [0, coarse_copies) are coarse copies: only the first counts
+        redundant = i < coarse_copies and dec.has_coarse
+        assert dec.add_chunk(chunks[i]) != redundant
+        assert not dec.add_chunk(chunks[i])  # duplicate
+        received.append(chunks[i])
+        got, expected = dec.snapshot(), decode(received)
+        if mode == "binary":
+            assert got == expected
+        else:
+            np.testing.assert_array_equal(got, expected)
+    assert dec.progress == 1.0 and dec.has_coarse
+
+
+def test_progressive_decoder_rejects_other_objects(tmp_path):
+    chunks, _decode = _memory_chunks("image", tmp_path)
+    other = holo.encode_image(np.zeros((8, 8, 3), np.uint8), block_count=2)
+    dec = holo.ProgressiveDecoder()
+    dec.add_chunk(chunks[0])
+    with pytest.raises(ValueError):
+        dec.add_chunk(other[0])
+
+
+def test_chunk_priority(tmp_path):
+    # big enough that the coarse thumbnail leaves a residual
+    arr = _test_image(str(tmp_path / "a.png"), h=120, w=160)
+    chunks = holo.encode_image(arr, block_count=6, coarse_copies=2)
+    priorities = [holo.chunk_priority(c) for c in chunks]
+    assert priorities[:2] == [math.inf, math.inf]
+    assert all(0 < p < math.inf for p in priorities[2:])
+    # the stored energy is the RMS of the chunk's residual slice
+    info = holo._parse_image_chunk(chunks[2], "<chunk>")
+    vals = holo._decode_residual(
+        holo._decompress(info["resid"], info["codec"]), holo.TRANSFORM_RAW
+    )
+    assert priorities[2] == pytest.approx(np.sqrt(np.mean(vals.astype(float) ** 2)))
+
+    binary, _decode = _memory_chunks("binary", tmp_path)
+    assert {holo.chunk_priority(c) for c in binary} == {0.0}
+    with pytest.raises(ValueError):
+        holo.chunk_priority(b"nope")
+
+
+@pytest.mark.parametrize("mode", ["image", "audio"])
+def test_tiered_roundtrip_and_default_compression(tmp_path, mode):
+    chunks, decode = _memory_chunks(mode, tmp_path, tier_bits=3)
+    balanced, _decode = _memory_chunks(
+        mode, tmp_path, tier_bits=3, compression="balanced"
+    )
+    assert chunks == balanced  # "default" is zlib 6 for tiered encodes
+    untiered, _decode = _memory_chunks(mode, tmp_path)
+    np.testing.assert_array_equal(decode(chunks[::-1]), decode(untiered))
+
+
+def test_pyramid_roundtrip_and_default_compression(tmp_path):
+    arr = _test_image(str(tmp_path / "a.png"), h=300, w=400)
+    chunks = holo.encode_image(arr, block_count=8, pyramid=True)
+    balanced = holo.encode_image(
+        arr, block_count=8, pyramid=True, compression="balanced"
+    )
+    assert chunks == balanced  # "default" is zlib 6 for pyramid encodes
+    np.testing.assert_array_equal(holo.decode_image(chunks[::-1]), arr)
+    with pytest.raises(ValueError):
+        holo.encode_image(arr, block_count=8, pyramid=True, tier_bits=2)
+
+
+@pytest.mark.parametrize("cpus", [1, 4])
+def test_inpaint_residual(monkeypatch, cpus):
+    monkeypatch.setattr(holo.os, "cpu_count", lambda: cpus)
+    rng = np.random.default_rng(24)
+    residual = np.tile(np.arange(-30, 30, dtype=np.int16), (45, 1))
+    residual = np.stack([residual, -residual, residual // 2], axis=2)
+    known = rng.random(residual.shape) < 0.2
+    known[:20, :20] = False  # a hole wider than the 3x3 window
+
+    out = holo._inpaint_residual(residual, known)
+    np.testing.assert_array_equal(out[known], residual[known])
+    assert np.abs(out - residual)[~known].mean() < 2  # a ramp is easy to guess
+    np.testing.assert_array_equal(holo._inpaint_residual(residual, known, 3), out)
+    assert holo._inpaint_residual(residual, np.ones_like(known)) is residual
+
+
+def test_inpaint_decode(tmp_path):
+    # smooth detail finer than the thumbnail, which neighbours predict well
+    y, x = np.mgrid[:120, :160]
+    wave = 100 + 60 * np.sin(x / 1.5) * np.cos(y / 1.5)
+    arr = np.stack([wave, wave[::-1], 255 - wave], axis=2).astype(np.uint8)
+    chunks = holo.encode_image(arr, block_count=8)
+    np.testing.assert_array_equal(holo.decode_image(chunks, inpaint=True), arr)
+    few = chunks[:3]
+    err = [
+        np.abs(holo.decode_image(few, inpaint=flag).astype(int) - arr).mean()
+        for flag in (False, True)
+    ]
+    assert err[1] < err[0]
+
+
+@pytest.mark.parametrize("n, block_count", [(1000, 7), (4096, 32), (12345, 5)])
+def test_golden_block_lookup_inverts_the_layout(n, block_count):
+    step = holo._golden_step(n)
+    positions = np.random.default_rng(n).choice(n, size=300, replace=False)
+    lookup = holo._golden_block_lookup(positions, n, block_count, step)
+    for block_id in range(block_count):
+        idx = holo._golden_block_indices(n, block_id, block_count, step=step)
+        sel, offsets = lookup(block_id)
+        np.testing.assert_array_equal(idx[offsets], positions[sel])
+        assert np.isin(positions, idx).sum() == len(sel)
+
+
+def _region_sample() -> np.ndarray:
+    y, x = np.mgrid[:300, :400]
+    wave = 120 + 60 * np.sin(x / 7.0) * np.cos(y / 5.0)
+    noise = np.random.default_rng(25).integers(0, 30, size=(300, 400, 3))
+    return (wave[:, :, None] + noise).astype(np.uint8)
+
+
+@pytest.mark.parametrize(
+    "kw", [{}, {"tier_bits": 3}, {"pyramid": True}, {"block_count": 1}]
+)
+def test_region_matches_cropped_full_decode(kw):
+    arr = _region_sample()
+    chunks = holo.encode_image(arr, **{"block_count": 8, **kw})
+    subsets = [chunks, chunks[1::2]] if len(chunks) > 1 else [chunks]
+    box = (37, 120, 301, 251)
+    for subset in subsets:
+        full = holo.decode_image(subset)[120:251, 37:301].astype(int)
+        region = holo.decode_image_region(subset, box=box).astype(int)
+        assert region.shape == full.shape
+        assert np.abs(region - full).max() <= 2  # bicubic rounding only
+        assert (region == full).mean() > 0.95
+
+
+def test_region_preview_skips_fine_chunks(monkeypatch):
+    arr = _region_sample()
+    chunks = holo.encode_image(arr, block_count=8, pyramid=True)
+    calls = []
+    decompress = holo._decompress
+    monkeypatch.setattr(
+        holo, "_decompress", lambda *a: calls.append(1) or decompress(*a)
+    )
+    preview = holo.decode_image_region(chunks, scale=0.25)
+    assert preview.shape == (75, 100, 3)
+    assert 0 < len(calls) < len(chunks)  # the full-resolution level is skipped
+    # the thumbnail alone is enough for a small preview
+    calls.clear()
+    thumb = holo.decode_image_region(chunks, scale=0.1)
+    assert thumb.shape == (30, 40, 3) and not calls
+    assert np.abs(thumb.astype(int) - arr[5::10, 5::10]).mean() < 20
+
+
+def test_region_holo_dir_and_argument_checks(tmp_path):
+    arr = _region_sample()
+    holo.save_image(arr, str(tmp_path / "a.png"))
+    holo.encode_image_holo_dir(str(tmp_path / "a.png"), str(tmp_path / "a.holo"), 6)
+    out = str(tmp_path / "r.png")
+    holo.decode_image_region_holo_dir(
+        str(tmp_path / "a.holo"), out, box=(0, 0, 50, 40)
+    )
+    chunks = holo.encode_image(arr, block_count=6)
+    np.testing.assert_array_equal(
+        holo.load_image(out), holo.decode_image_region(chunks, box=(0, 0, 50, 40))
+    )
+    for kw in (
+        {"scale": 0},
+        {"scale": 1.5},
+        {"box": (0, 0, 401, 10)},
+        {"box": (5, 5, 5, 9)},
+    ):
+        with pytest.raises(ValueError):
+            holo.decode_image_region(chunks, **kw)
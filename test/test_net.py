@@ -0,0 +1,478 @@
+"""
+Socket-free checks for holo.net.py (run with pytest from the repo root).
+"""
+
+import os
+import sys
+import math
+import asyncio
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import holo  # noqa: E402
+
+_spec = importlib.util.spec_from_file_location(
+    "holo_net", os.path.join(ROOT, "holo.net.py")
+)
+holo_net = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(holo_net)
+
+
+def _datagrams(chunks, transfer_id, name="a.bin", seg=100):
+    """META packet plus the DATA packets of chunks, in send order."""
+    header = holo_net.HEADER_STRUCT
+    out = [
+        header.pack(
+            holo_net.MAGIC,
+            holo_net.VERSION,
+            holo_net.PKT_META,
+            transfer_id,
+            len(chunks),
+            0,
+            0,
+            0,
+        )
+        + name.encode()
+    ]
+    for chunk_idx, chunk in enumerate(chunks):
+        total = -(-len(chunk) // seg)
+        for seg_idx in range(total):
+            out.append(
+                header.pack(
+                    holo_net.MAGIC,
+                    holo_net.VERSION,
+                    holo_net.PKT_DATA,
+                    transfer_id,
+                    len(chunks),
+                    chunk_idx,
+                    seg_idx,
+                    total,
+                )
+                + chunk[seg_idx * seg: (seg_idx + 1) * seg]
+            )
+    return out
+
+
+def _table(tmp_path, **kw):
+    writer = ThreadPoolExecutor(max_workers=1)
+    return holo_net.TransferTable(str(tmp_path), "best", writer=writer, **kw), writer
+
+
+def test_concurrent_transfers_from_two_senders(tmp_path):
+    data_a, data_b = bytes(range(256)) * 20, bytes(range(255, -1, -1)) * 30
+    a = _datagrams(holo.encode_binary(data_a, block_count=4), 7)
+    b = _datagrams(holo.encode_binary(data_b, block_count=3), 7)
+    table, writer = _table(tmp_path)
+    # same transfer id and file name, different sources, interleaved
+    for i in range(max(len(a), len(b))):
+        for packets, addr in ((a, ("10.0.0.1", 1)), (b, ("10.0.0.2", 1))):
+            if i < len(packets):
+                table.handle_datagram(packets[i], addr, now=1.0)
+    writer.shutdown(wait=True)
+
+    assert table.finished_count == 2 and not table.active
+    outputs = sorted(os.listdir(tmp_path))
+    assert outputs == ["a.bin", "a_7.bin"]
+    restored = {(tmp_path / name).read_bytes() for name in outputs}
+    assert restored == {data_a, data_b}
+
+
+def test_idle_transfers_are_finalised_with_what_arrived(tmp_path):
+    data = bytes(range(256)) * 20
+    packets = _datagrams(holo.encode_binary(data, block_count=4), 3)
+    table, writer = _table(tmp_path, idle_timeout=5.0)
+    for packet in packets[: len(packets) // 2]:
+        table.handle_datagram(packet, ("10.0.0.1", 1), now=1.0)
+    table.expire(now=3.0)
+    assert len(table.active) == 1
+    table.expire(now=10.0)
+    writer.shutdown(wait=True)
+
+    assert table.finished_count == 1 and not table.active
+    restored = (tmp_path / "a.bin").read_bytes()
+    assert len(restored) == len(data) and restored != data
+
+
+def test_no_new_transfers_once_closed(tmp_path):
+    data = bytes(range(256)) * 20
+    first = _datagrams(holo.encode_binary(data, block_count=4), 1)
+    second = _datagrams(holo.encode_binary(data, block_count=4), 2, name="b.bin")
+    table, writer = _table(tmp_path)
+    table.handle_datagram(first[0], ("10.0.0.1", 1))
+    table.accept_new = False  # what receive() does once --count is reached
+
+    assert table.handle_datagram(second[0], ("10.0.0.2", 1)) is None
+    for packet in first[1:]:
+        table.handle_datagram(packet, ("10.0.0.1", 1))
+    writer.shutdown(wait=True)
+    assert table.finished_count == 1
+    assert os.listdir(tmp_path) == ["a.bin"]
+    assert (tmp_path / "a.bin").read_bytes() == data
+
+
+class _FakeClock:
+    """time.monotonic / asyncio.sleep stand-ins: sleeping advances the clock."""
+
+    def __init__(self) -> None:
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+def _run(coro):
+    """Run a coroutine that never really suspends (no event loop)."""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise AssertionError("coroutine suspended on something real")
+
+
+def _paced(monkeypatch, rate, burst, sizes, tick=0.01):
+    """Drive a TokenBucket the way send_chunks_async does, one burst per budget."""
+    clock = _FakeClock()
+    monkeypatch.setattr(holo_net.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(holo_net.asyncio, "sleep", clock.sleep)
+    bucket = holo_net.TokenBucket(rate, burst, tick=tick)
+    pos = 0
+    while pos < len(sizes):
+        budget = _run(bucket.acquire())
+        sent = 0
+        while pos < len(sizes) and sent < budget:
+            sent += sizes[pos]
+            pos += 1
+        bucket.spend(sent)
+    return clock
+
+
+def test_token_bucket_holds_the_rate(monkeypatch):
+    clock = _paced(monkeypatch, rate=1_000_000, burst=1000, sizes=[1000] * 500)
+    # 500 kB at 1 MB/s; the bucket starts full with one 10 ms tick (10 kB)
+    elapsed = clock.now - 100.0
+    assert 0.48 <= elapsed <= 0.50
+    # waits are whole ticks, so datagrams leave in bursts of about ten
+    assert min(clock.sleeps) >= 0.01
+    assert len(clock.sleeps) <= 50
+
+
+def test_token_bucket_bursts_up_to_capacity(monkeypatch):
+    clock = _paced(monkeypatch, rate=1_000_000, burst=1000, sizes=[1000] * 10)
+    assert clock.sleeps == []
+    clock = _paced(monkeypatch, rate=1_000_000, burst=1000, sizes=[1000] * 11)
+    assert clock.sleeps == [0.01]
+
+
+def test_token_bucket_slow_link_sends_one_per_wait(monkeypatch):
+    # 1000-byte datagrams at 100 B/s: after the initial burst and one tick,
+    # every datagram waits out the previous one's 10 s debt
+    clock = _paced(monkeypatch, rate=100, burst=1000, sizes=[1000] * 5)
+    assert len(clock.sleeps) == 4
+    assert all(abs(d - 10.0) < 1e-6 for d in clock.sleeps[1:])
+
+
+class _FakeSocket:
+    def __init__(self) -> None:
+        self.sent = []
+
+    def sendto(self, data, addr) -> None:
+        self.sent.append((bytes(data), addr))
+
+    def close(self) -> None:
+        pass
+
+
+class _FakeTransport(_FakeSocket):
+    pass
+
+
+class _ProactorLikeLoop:
+    """Stand-in for an event loop that cannot wait on raw sockets."""
+
+    def __init__(self) -> None:
+        self.transport = _FakeTransport()
+
+    def add_writer(self, fd, callback) -> None:
+        raise NotImplementedError
+
+    async def create_datagram_endpoint(self, protocol_factory, sock=None):
+        sock.close()
+        return self.transport, protocol_factory()
+
+
+def _frames():
+    chunks = [bytes(range(200)), bytes(50)]
+    frames = [seg for segs in holo_net._chunk_frames(chunks, 5, 100) for seg in segs]
+    return frames, [header + bytes(payload) for header, payload in frames]
+
+
+def test_sender_falls_back_to_sendto_without_sendmsg(monkeypatch):
+    monkeypatch.setattr(holo_net, "_HAVE_SENDMSG", False)
+    sock = _FakeSocket()
+    sender = holo_net._DatagramSender(None, sock)
+    frames, packets = _frames()
+    nxt, nbytes = _run(sender.send(frames, 0, float("inf"), ("10.0.0.1", 1)))
+    assert nxt == len(frames)
+    assert [data for data, _ in sock.sent] == packets
+    assert nbytes == sum(len(p) for p in packets) + len(packets) * holo_net._UDP_OVERHEAD
+
+
+def test_sender_uses_a_transport_where_sockets_cannot_be_watched():
+    loop = _ProactorLikeLoop()
+    sender = _run(holo_net._DatagramSender.open(loop))
+    assert sender.transport is loop.transport
+    frames, packets = _frames()
+    nxt, _ = _run(sender.send(frames, 0, 1, ("10.0.0.1", 1)))
+    assert nxt == 1  # the budget is used up by the first datagram
+    _run(sender.send(frames, nxt, float("inf"), ("10.0.0.1", 1)))
+    assert [data for data, _ in loop.transport.sent] == packets
+    sender.close()
+
+
+def _segments(data, seg):
+    return [data[i:i + seg] for i in range(0, len(data), seg)]
+
+
+def test_chunk_assembly_out_of_order_with_duplicates():
+    data = bytes(range(256)) * 4 + b"tail"
+    segs = _segments(data, 100)
+    order = [len(segs) - 1, 3, 0, 3, 7, len(segs) - 1] + list(range(len(segs)))
+    chunk = holo_net.ChunkAssembly(len(segs))
+    completed = [chunk.add_segment(i, len(segs), memoryview(segs[i])) for i in order]
+    assert completed.count(True) == 1  # duplicates never count twice
+    assert chunk.complete and chunk.received == len(segs)
+    assert chunk.build() == data
+
+
+def test_chunk_assembly_final_segment_first():
+    data = bytes(range(250))
+    segs = _segments(data, 100)
+    chunk = holo_net.ChunkAssembly(3)
+    assert not chunk.add_segment(2, 3, segs[2])  # held until the size is known
+    assert chunk.buf is None and chunk.nbytes == 50
+    assert not chunk.add_segment(0, 3, segs[0])
+    assert chunk.add_segment(1, 3, segs[1])
+    assert chunk.build() == data
+
+
+def test_chunk_assembly_rejects_truncated_and_inconsistent_segments():
+    segs = _segments(bytes(range(250)), 100)
+    chunk = holo_net.ChunkAssembly(3)
+    assert not chunk.add_segment(0, 3, segs[0])
+    assert not chunk.add_segment(1, 3, segs[1][:60])  # short non-final segment
+    assert not chunk.add_segment(2, 3, segs[2] + bytes(60))  # longer than a segment
+    assert not chunk.add_segment(3, 3, segs[2])  # index out of range
+    assert not chunk.add_segment(1, 4, segs[1])  # different segment count
+    assert chunk.received == 1 and not chunk.complete
+    assert chunk.add_segment(2, 3, segs[2]) is False
+    assert chunk.add_segment(1, 3, segs[1])
+    assert chunk.build() == bytes(range(250))
+
+
+def test_truncated_datagrams_are_ignored(tmp_path):
+    data = bytes(range(256)) * 20
+    packets = _datagrams(holo.encode_binary(data, block_count=4), 9)
+    table, writer = _table(tmp_path)
+    size = holo_net.HEADER_STRUCT.size
+    for packet in packets:
+        assert table.handle_datagram(packet[: size - 1], ("10.0.0.1", 1)) is None
+    for packet in packets:
+        table.handle_datagram(memoryview(bytearray(packet)), ("10.0.0.1", 1))
+    writer.shutdown(wait=True)
+    assert table.finished_count == 1
+    assert (tmp_path / "a.bin").read_bytes() == data
+
+
+def test_fec_recovers_any_erasures_up_to_r():
+    rng = np.random.default_rng(19)
+    for k, r in ((1, 1), (5, 2), (20, 5), (200, 56)):
+        rows = rng.integers(0, 256, size=(k, 33), dtype=np.uint8)
+        parity = holo_net.fec_encode(rows, r)
+        assert parity.shape == (r, 33)
+        for _ in range(10):
+            n_lost = int(rng.integers(1, r + 1))
+            lost = rng.choice(k + r, size=n_lost, replace=False)
+            missing = sorted(int(i) for i in lost if i < k)
+            if not missing:
+                continue
+            repairs = {
+                i: parity[i].tobytes() for i in range(r) if k + i not in lost
+            }
+            damaged = rows.copy()
+            damaged[missing] = 0
+            holo_net.fec_recover(damaged, missing, repairs)
+            assert np.array_equal(damaged, rows)
+
+
+def test_fec_recovers_a_chunk_from_repairs_only():
+    rows = np.arange(4 * 8, dtype=np.uint8).reshape(4, 8)
+    parity = holo_net.fec_encode(rows, 4)
+    damaged = np.zeros_like(rows)
+    holo_net.fec_recover(damaged, [0, 1, 2, 3], dict(enumerate(map(bytes, parity))))
+    assert np.array_equal(damaged, rows)
+
+
+def test_fec_repair_count_at_256_segments():
+    assert holo_net.fec_repair_count(100, 0.25) == 25
+    assert holo_net.fec_repair_count(250, 0.25) == 6  # k + r capped at 256
+    assert holo_net.fec_repair_count(255, 0.25) == 1
+    assert holo_net.fec_repair_count(256, 0.25) == 0
+    assert holo_net.fec_repair_count(1000, 0.25) == 0
+
+    assert not holo_net.fec_capped(100, 0.25)
+    assert holo_net.fec_capped(250, 0.25)
+    assert holo_net.fec_capped(256, 0.25)
+    assert not holo_net.fec_capped(256, 0.0)
+
+
+def test_chunk_frames_past_256_segments_have_no_repair():
+    seg = 16
+    small, big = bytes(200 * seg), bytes(300 * seg)
+    frames = holo_net._chunk_frames([small, big], 1, seg, fec=0.25)
+    assert len(frames[0]) == 200 + 50
+    assert len(frames[1]) == 300
+
+
+def test_sender_warns_when_fec_is_capped(monkeypatch, capsys):
+    sock = _FakeSocket()
+
+    async def fake_open(loop):
+        return holo_net._DatagramSender(loop, sock)
+
+    monkeypatch.setattr(holo_net, "_HAVE_SENDMSG", False)
+    monkeypatch.setattr(holo_net._DatagramSender, "open", fake_open)
+    max_payload = 64
+    seg = max_payload - holo_net.HEADER_STRUCT.size - holo_net.REPAIR_STRUCT.size
+    chunks = [bytes(10 * seg), bytes(300 * seg)]
+    asyncio.run(
+        holo_net.send_chunks_async(
+            chunks,
+            "x.bin",
+            "127.0.0.1",
+            9,
+            loops=1,
+            max_payload=max_payload,
+            fec=0.25,
+            order="random",  # the chunks are not holo chunks
+        )
+    )
+    out = capsys.readouterr().out
+    assert "capped for 1 of 2 chunks (1 get no repair at all)" in out
+    assert len(sock.sent) == 1 + (10 + 3) + 300
+
+
+def test_chunks_are_rebuilt_from_repair_datagrams(tmp_path):
+    data = bytes(range(256)) * 40
+    chunks = holo.encode_binary(data, block_count=3)
+    frames = holo_net._chunk_frames(chunks, 4, 100, fec=0.5)
+    packets = _datagrams(chunks, 4)[:1]
+    for segs in frames:
+        k = holo_net.HEADER_STRUCT.unpack(segs[0][0])[-1]  # data segments
+        # lose every other data segment, keep enough repairs
+        packets += [h + bytes(p) for i, (h, p) in enumerate(segs) if i >= k or i % 2]
+    table, writer = _table(tmp_path)
+    for packet in packets:
+        table.handle_datagram(packet, ("10.0.0.1", 1))
+    writer.shutdown(wait=True)
+    assert table.finished_count == 1
+    assert (tmp_path / "a.bin").read_bytes() == data
+
+
+
+def _assembly(total_segments, have, seg=10):
+    chunk = holo_net.ChunkAssembly(total_segments)
+    for seg_idx in have:
+        chunk.add_segment(seg_idx, total_segments, bytes(seg))
+    return chunk
+
+
+def _status_of(transfer):
+    datagram = holo_net.encode_status(transfer)
+    fields = holo_net.HEADER_STRUCT.unpack_from(datagram)
+    assert fields[2] == holo_net.PKT_STATUS and fields[3] == transfer.transfer_id
+    payload = datagram[holo_net.HEADER_STRUCT.size:]
+    return datagram, holo_net.parse_status(payload, transfer.total_chunks)
+
+
+def test_status_round_trip():
+    transfer = holo_net.TransferState(transfer_id=5, total_chunks=20)
+    transfer.chunks = {
+        0: _assembly(4, range(4)),
+        3: _assembly(12, [0, 5, 11]),
+        9: _assembly(3, []),  # nothing arrived: not reported
+        19: _assembly(2, range(2)),
+    }
+    _, (done, complete, partial) = _status_of(transfer)
+    assert not done
+    assert [i for i in range(20) if holo_net._has_bit(complete, i)] == [0, 19]
+    assert list(partial) == [3]
+    assert [i for i in range(12) if holo_net._has_bit(partial[3], i)] == [0, 5, 11]
+
+
+def test_status_drops_partial_chunks_to_fit(monkeypatch):
+    transfer = holo_net.TransferState(transfer_id=5, total_chunks=4000)
+    rng = np.random.default_rng(20)
+    transfer.chunks = {
+        i: _assembly(200, np.flatnonzero(rng.random(200) < 0.5)) for i in range(400)
+    }
+    transfer.chunks.update({i: _assembly(1, [0]) for i in range(3000, 4000, 3)})
+    datagram, (_, complete, partial) = _status_of(transfer)
+    assert len(datagram) <= holo_net.STATUS_MAX_PAYLOAD
+    assert 0 < len(partial) < 400
+    for idx, bitmap in partial.items():
+        assert bitmap == bytes(transfer.chunks[idx].bitmap)
+    reported = [i for i in range(4000) if holo_net._has_bit(complete, i)]
+    assert reported == list(range(3000, 4000, 3))  # complete chunks always fit
+
+
+def test_status_done_flag_and_sender_view():
+    frames_by_chunk = holo_net._chunk_frames([bytes(250)] * 3, 5, 100, fec=0.5)
+    transfer = holo_net.TransferState(transfer_id=5, total_chunks=3)
+    transfer.chunks = {0: _assembly(3, range(3)), 1: _assembly(3, [0, 2])}
+    datagram, (done, _, _) = _status_of(transfer)
+    assert not done
+
+    feedback = holo_net._SenderFeedback(5, 3)
+    feedback.datagram_received(datagram, ("10.0.0.1", 1))
+    pending = feedback.pending_frames(frames_by_chunk, [0, 1, 2])
+    # chunk 0 is skipped, chunk 1 resends its missing data segment only
+    assert pending == [frames_by_chunk[1][1]] + frames_by_chunk[2]
+
+    assert not feedback.done
+    other = holo_net._SenderFeedback(6, 3)
+    other.datagram_received(datagram, ("10.0.0.1", 1))  # another transfer's
+    assert not any(other.complete)
+
+    transfer.chunks[1].add_segment(1, 3, bytes(10))
+    transfer.complete_chunks = 3
+    datagram, (done, _, _) = _status_of(transfer)
+    assert done
+    feedback.datagram_received(datagram, ("10.0.0.1", 1))
+    assert feedback.done
+
+
+def test_schedule_chunks_order():
+    priorities = [0.5, math.inf, 2.0, 0.0, 2.0, math.inf]
+    order = holo_net.schedule_chunks(priorities, [0] * 6)
+    assert sorted(order[:2]) == [1, 5]  # coarse copies first
+    assert sorted(order[2:4]) == [2, 4]  # then by residual energy
+    assert order[4:] == [0, 3]
+
+    # later loops: chunks sent less often go first, whatever their priority
+    order = holo_net.schedule_chunks(priorities, [2, 2, 1, 2, 2, 1])
+    assert order == [5, 2, 1, 4, 0, 3]
+
+    # ties are broken at random, so equal chunks do not always go in index order
+    orders = {tuple(holo_net.schedule_chunks([1.0] * 4, [0] * 4)) for _ in range(50)}
+    assert len(orders) > 1
+